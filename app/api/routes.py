@@ -4,14 +4,27 @@ import io
 import json
 from flask import Blueprint, abort, jsonify, render_template, request, session
 import re
-import unicodedata
 from datetime import datetime
 
-from app.services.financeiro import analisar_financeiro
-from app.services.cub import obter_cub_cuiaba
+from app.services.amortizacao import (
+    PRAZO_MAXIMO,
+    PRAZO_MINIMO,
+    limitar_prazo,
+)
+from app.services.financeiro import analisar_financeiro, custo_m2_metodologia
+from app.services.capacidade import resolver_capacidade, serializar_capacidade
+from app.services.cet import versao_bancos
+from app.services.cub import obter_cub_cuiaba, versao_cub
 from app.services.graficos import gerar_grafico_financeiro, gerar_grafico_score
-from app.services.loader import carregar_bairros
-from app.services.mercado_m2 import obter_contexto_m2
+from app.services.indice_bairros import resolver_bairro, sugerir_bairros
+from app.services.loader import carregar_store_bairros, obter_snapshot_bairros
+from app.services.memo import MemoLRU, chave_canonica
+from app.services.mercado_m2 import (
+    CACHE_M2,
+    FILA_M2,
+    VOO_M2,
+    obter_contexto_m2,
+)
 from app.services.pagamentos_mp import (
     carregar_pagamentos,
     confirmar_pagamento,
@@ -32,7 +45,16 @@ from app.services.piloto_teste import (
     token_piloto_valido,
 )
 from app.services.pdf import gerar_pdf
+from app.services.pesos_score import versao_pesos
+from app.services.ranking import ranquear_bairros
+from app.services.relatorios_salvos import carregar_relatorio, salvar_relatorio
+from app.services.scraping.cliente_http import CLIENTE as CLIENTE_SCRAPING
 from app.services.score_urbano import calcular_score_urbano
+from app.services.sensibilidade import (
+    LIMITES_EIXOS,
+    calcular_grade,
+    faixa_valores,
+)
 from app.services.sugestoes import gerar_sugestoes
 from app.services.textos_dinamicos import (
     texto_compatibilidade,
@@ -45,34 +67,10 @@ from app.utils.formatacao import float_para_moeda, moeda_para_float
 router = Blueprint("router", __name__)
 
 
-def _corrigir_mojibake(texto):
-    if not isinstance(texto, str):
-        return texto
-    try:
-        return texto.encode("latin1").decode("utf-8")
-    except Exception:
-        return texto
-
-
-def _normalizar_nome_bairro(texto):
-    texto = _corrigir_mojibake(str(texto or "")).strip().lower()
-    texto = "".join(
-        c for c in unicodedata.normalize("NFKD", texto)
-        if not unicodedata.combining(c)
-    )
-    return " ".join(texto.split())
-
-
-def _obter_dados_bairro(df, nome_bairro):
+def _obter_dados_bairro(nome_bairro):
     if not nome_bairro:
         return {}
-
-    alvo = _normalizar_nome_bairro(nome_bairro)
-    serie_normalizada = df["bairro"].astype(str).map(_normalizar_nome_bairro)
-    filtro = serie_normalizada == alvo
-    if filtro.any():
-        return df[filtro].iloc[0].to_dict()
-    return {}
+    return resolver_bairro(nome_bairro) or {}
 
 
 def _parse_financiar(valor):
@@ -82,10 +80,20 @@ def _parse_financiar(valor):
 def _parse_prazo_meses(valor):
     txt = str(valor or "").lower()
     digitos = "".join(ch for ch in txt if ch.isdigit())
-    try:
-        return int(digitos) if digitos else 360
-    except Exception:
-        return 360
+    return limitar_prazo(digitos) if digitos else 360
+
+
+def _validar_prazo_meses(valor):
+    """
+    Como _parse_prazo_meses, mas levanta ValueError para prazo informado
+    fora de PRAZO_MINIMO..PRAZO_MAXIMO (APIs respondem 400).
+    """
+    digitos = "".join(ch for ch in str(valor or "") if ch.isdigit())
+    if digitos and not PRAZO_MINIMO <= int(digitos) <= PRAZO_MAXIMO:
+        raise ValueError(
+            f"prazo deve estar entre {PRAZO_MINIMO} e {PRAZO_MAXIMO} meses"
+        )
+    return _parse_prazo_meses(valor)
 
 
 def _formatar_data_iso_br(valor):
@@ -229,50 +237,10 @@ def _somar_meses(ano, mes, delta):
     return novo_ano, novo_mes
 
 
-def _custo_m2_metodologia(cub, padrao):
-    padrao_txt = str(padrao or "").strip().lower()
-    steel_ref = {
-        "economico": 2951.0,
-        "medio": 4368.0,
-        "alto": 5904.0,
-    }
-    steel_padrao = steel_ref.get(padrao_txt, 4368.0)
-
-    convencional = cub if cub > 0 else 3000.0
-    estrutural = convencional * 0.92
-    steel = max(convencional * 1.18, steel_padrao)
-    eps = convencional * 1.06
-
-    return [
-        {
-            "metodologia": "Alvenaria convencional",
-            "m2": convencional,
-            "faixa_prazo": "8 a 14 meses",
-            "fonte_preco": "Base Lokáo (referencia CUB/SINAPI)",
-        },
-        {
-            "metodologia": "Alvenaria estrutural",
-            "m2": estrutural,
-            "faixa_prazo": "7 a 12 meses",
-            "fonte_preco": "Base Lokáo (ganho de racionalizacao)",
-        },
-        {
-            "metodologia": "Steel Frame",
-            "m2": steel,
-            "faixa_prazo": "5 a 9 meses",
-            "fonte_preco": "Benchmark setorial (Centro-Oeste)",
-        },
-        {
-            "metodologia": "Painel EPS (isopor) + concreto",
-            "m2": eps,
-            "faixa_prazo": "6 a 10 meses",
-            "fonte_preco": "Base Lokáo (mercado regional)",
-        },
-    ]
-
-
-def _montar_contexto_relatorio(token_forcado="", liberar_sem_pagamento=False):
-    token = token_forcado or request.values.get("token", "")
+def _entradas_relatorio(token):
+    """
+    Dados brutos do formulario, com fallback para os salvos no token.
+    """
     dados_salvos = {}
     if token:
         dados_salvos = (
@@ -285,8 +253,6 @@ def _montar_contexto_relatorio(token_forcado="", liberar_sem_pagamento=False):
         "tipo_imovel",
         dados_salvos.get("tipo_imovel", ""),
     )
-    tipo_imovel_txt = str(tipo_imovel or "").strip().lower()
-    is_apartamento = "apartamento" in tipo_imovel_txt
     padrao = request.values.get("padrao", dados_salvos.get("padrao", ""))
 
     orcamento_raw = request.values.get(
@@ -308,6 +274,46 @@ def _montar_contexto_relatorio(token_forcado="", liberar_sem_pagamento=False):
     )
     prazo = request.values.get("prazo", dados_salvos.get("prazo", ""))
     renda_raw = request.values.get("renda", dados_salvos.get("renda", ""))
+    estresse_raw = request.values.get(
+        "estresse",
+        dados_salvos.get("estresse", ""),
+    )
+
+    return {
+        "nome": nome,
+        "bairro": bairro,
+        "tipo_imovel": tipo_imovel,
+        "padrao": padrao,
+        "orcamento": orcamento_raw,
+        "valor_imovel": valor_imovel_raw,
+        "area": area_raw,
+        "financiar": financiar_raw,
+        "tipo_financiamento": tipo_financiamento,
+        "prazo": prazo,
+        "renda": renda_raw,
+        "estresse": estresse_raw,
+    }
+
+
+def _calcular_relatorio(entradas):
+    """
+    Parte pura do relatorio (sem token/pagamento): depende so das
+    entradas e das versoes das bases, por isso pode ser memorizada.
+    """
+    nome = entradas["nome"]
+    bairro = entradas["bairro"]
+    tipo_imovel = entradas["tipo_imovel"]
+    tipo_imovel_txt = str(tipo_imovel or "").strip().lower()
+    is_apartamento = "apartamento" in tipo_imovel_txt
+    padrao = entradas["padrao"]
+    orcamento_raw = entradas["orcamento"]
+    valor_imovel_raw = entradas["valor_imovel"]
+    area_raw = entradas["area"]
+    financiar_raw = entradas["financiar"]
+    tipo_financiamento = entradas["tipo_financiamento"]
+    prazo = entradas["prazo"]
+    renda_raw = entradas["renda"]
+    estresse = _parse_financiar(entradas.get("estresse", ""))
 
     orcamento = moeda_para_float(orcamento_raw)
     valor_imovel = moeda_para_float(valor_imovel_raw)
@@ -315,12 +321,17 @@ def _montar_contexto_relatorio(token_forcado="", liberar_sem_pagamento=False):
     renda = moeda_para_float(renda_raw)
     financiar = _parse_financiar(financiar_raw)
 
-    df = carregar_bairros()
-    dados_bairro = _obter_dados_bairro(df, bairro) or {
-        "bairro": bairro,
-        "padrao_predominante": padrao,
-        "valor_m2_medio": 0,
-    }
+    store = carregar_store_bairros()
+    dados_bairro = _obter_dados_bairro(bairro)
+    bairro_na_base = bool(dados_bairro)
+    if bairro_na_base:
+        bairro = dados_bairro.get("bairro") or bairro
+    else:
+        dados_bairro = {
+            "bairro": bairro,
+            "padrao_predominante": padrao,
+            "valor_m2_medio": 0,
+        }
 
     score = calcular_score_urbano(
         dados_bairro=dados_bairro,
@@ -332,7 +343,7 @@ def _montar_contexto_relatorio(token_forcado="", liberar_sem_pagamento=False):
     )
 
     sugestoes = gerar_sugestoes(
-        df=df,
+        store=store,
         dados_bairro=dados_bairro,
         score=score,
         orcamento=orcamento,
@@ -345,7 +356,7 @@ def _montar_contexto_relatorio(token_forcado="", liberar_sem_pagamento=False):
         dados_bairro=dados_bairro,
         bairro=bairro,
         tipo_imovel=tipo_imovel,
-        usar_coleta_externa=True,
+        usar_coleta_externa=bairro_na_base,
         cache_horas=168,
     )
     valor_m2_compra = contexto_m2.get("valor", 0)
@@ -366,9 +377,6 @@ def _montar_contexto_relatorio(token_forcado="", liberar_sem_pagamento=False):
     entrada_estimada = (
         valor_imovel * 0.2 if financiar and valor_imovel > 0 else 0
     )
-    parcela_estimada = (
-        (valor_imovel * 0.8) / 360 if financiar and valor_imovel > 0 else 0
-    )
 
     financeiro = analisar_financeiro(
         orcamento=orcamento,
@@ -378,57 +386,11 @@ def _montar_contexto_relatorio(token_forcado="", liberar_sem_pagamento=False):
         renda=renda,
         financiar=financiar,
         prazo_meses=_parse_prazo_meses(prazo),
+        sistema=tipo_financiamento,
+        simular_estresse=estresse,
     )
+    parcela_estimada = financeiro.get("parcela_estimada", 0)
 
-    grafico_score_url = gerar_grafico_score(
-        bairro=bairro or "bairro",
-        score=score.get("valor", 0),
-        media_cidade=55,
-    )
-    grafico_financeiro_url = gerar_grafico_financeiro(
-        bairro=bairro or "bairro",
-        orcamento=orcamento,
-        valor_imovel=valor_imovel,
-    )
-
-    dados_relatorio = {
-        "nome": nome,
-        "bairro": bairro,
-        "tipo_imovel": tipo_imovel,
-        "padrao": padrao,
-        "orcamento": orcamento_raw,
-        "valor_imovel": valor_imovel_raw,
-        "area": area_raw,
-        "financiar": financiar_raw,
-        "tipo_financiamento": tipo_financiamento,
-        "prazo": prazo,
-        "renda": renda_raw,
-    }
-
-    if liberar_sem_pagamento:
-        if token:
-            registrar_pagamento_pendente(
-                token,
-                dados_relatorio=dados_relatorio,
-            )
-            confirmar_pagamento(token)
-        else:
-            _, token = criar_pagamento(
-                0,
-                dados_relatorio=dados_relatorio,
-            )
-            confirmar_pagamento(token)
-    else:
-        if token:
-            registrar_pagamento_pendente(
-                token,
-                dados_relatorio=dados_relatorio,
-            )
-        else:
-            _, token = criar_pagamento(3990, dados_relatorio=dados_relatorio)
-
-    pago = True if liberar_sem_pagamento else status_pagamento(token) == "pago"
-    link_pagamento = f"/pagar?token={token}"
     score_valor = score.get("valor", 0)
     resumo_decisao = _resumo_decisao(score_valor)
 
@@ -586,12 +548,16 @@ def _montar_contexto_relatorio(token_forcado="", liberar_sem_pagamento=False):
     ]
 
     area_ref = area if area > 0 else 180.0
-    metodologias = _custo_m2_metodologia(cub, padrao)
+    metodologias = custo_m2_metodologia(cub, padrao)
+    capacidade = resolver_capacidade(orcamento, [], cub=cub, padrao=padrao)
+    cenario_base = capacidade["cenarios_construcao"].index("Base")
     tabela_metodologias = []
-    for linha in metodologias:
+    for m, linha in enumerate(metodologias):
         custo_total = linha["m2"] * area_ref
         percentual = (custo_total / orcamento * 100) if orcamento > 0 else 0
-        area_max = (orcamento / linha["m2"]) if linha["m2"] > 0 else 0
+        # Area que cabe no orcamento ja com projetos, aprovacoes,
+        # infraestrutura e contingencia do cenario base.
+        area_max = float(capacidade["area_maxima_construcao"][m, cenario_base])
         tabela_metodologias.append(
             {
                 "metodologia": linha["metodologia"],
@@ -830,17 +796,54 @@ def _montar_contexto_relatorio(token_forcado="", liberar_sem_pagamento=False):
             }
         )
 
-    feedback_form_url = _texto_limpo(
-        os.getenv("LOKAO_FEEDBACK_FORM_URL", ""),
-        600,
-    )
-    if liberar_sem_pagamento:
-        if feedback_form_url:
-            piloto_feedback_url = feedback_form_url
-        else:
-            piloto_feedback_url = f"/piloto/feedback?token={token}"
-    else:
-        piloto_feedback_url = ""
+    tabela_amortizacao = []
+    for linha in financeiro.get("amortizacao", []):
+        tabela_amortizacao.append(
+            {
+                "sistema": linha["sistema"],
+                "taxa_anual": linha["taxa_anual"] * 100,
+                "prazo_meses": linha["prazo_meses"],
+                "primeira_parcela": float_para_moeda(linha["primeira_parcela"]),
+                "ultima_parcela": float_para_moeda(linha["ultima_parcela"]),
+                "juros_totais": float_para_moeda(linha["juros_totais"]),
+                "total_pago": float_para_moeda(linha["total_pago"]),
+                "comprometimento_inicial": linha.get("comprometimento_inicial"),
+                "meses_acima_limite": linha.get("meses_acima_limite"),
+            }
+        )
+
+    comparativo_bancos = []
+    for linha in financeiro.get("bancos", []):
+        comparativo_bancos.append(
+            {
+                "instituicao": linha["instituicao"],
+                "sistema": linha["sistema"],
+                "prazo_meses": linha["prazo_meses"],
+                "taxa_anual": linha["taxa_anual"] * 100,
+                "cet_anual": linha["cet_anual"] * 100,
+                "primeira_parcela": float_para_moeda(linha["primeira_parcela"]),
+                "total_pago": float_para_moeda(linha["total_pago"]),
+                "comprometimento_inicial": linha["comprometimento_inicial"],
+                "dentro_limite": linha["dentro_limite"],
+            }
+        )
+
+    tabela_estresse = []
+    estresse_resultado = financeiro.get("estresse") or {}
+    for linha in estresse_resultado.get("cenarios", []):
+        prob = linha.get("prob_acima_limite")
+        tabela_estresse.append(
+            {
+                "indexador": linha["indexador"],
+                "juros_fixos": linha["juros_fixos"] * 100,
+                "parcela_p50": float_para_moeda(linha["parcela_maxima"]["p50"]),
+                "parcela_p95": float_para_moeda(linha["parcela_maxima"]["p95"]),
+                "total_p5": float_para_moeda(linha["total_pago"]["p5"]),
+                "total_p50": float_para_moeda(linha["total_pago"]["p50"]),
+                "total_p95": float_para_moeda(linha["total_pago"]["p95"]),
+                "prob_acima_limite": prob * 100 if prob is not None else None,
+            }
+        )
 
     return {
         "nome": nome,
@@ -857,6 +860,8 @@ def _montar_contexto_relatorio(token_forcado="", liberar_sem_pagamento=False):
         "parcela_estimada": (
             float_para_moeda(parcela_estimada) if parcela_estimada else None
         ),
+        "parcela_sistema": financeiro.get("parcela_sistema", ""),
+        "parcela_taxa_anual": financeiro.get("parcela_taxa_anual", 0) * 100,
         "cub": float_para_moeda(cub) if cub else "Não informado",
         "cub_competencia": contexto_cub.get("competencia_br", ""),
         "cub_competencia_curta": _formatar_competencia_curta(
@@ -890,8 +895,10 @@ def _montar_contexto_relatorio(token_forcado="", liberar_sem_pagamento=False):
         ),
         "projecoes_compra": projecoes_compra,
         "projecoes_construcao": projecoes_construcao,
-        "grafico_score_url": grafico_score_url,
-        "grafico_financeiro_url": grafico_financeiro_url,
+        "tabela_amortizacao": tabela_amortizacao,
+        "tabela_estresse": tabela_estresse,
+        "estresse_sistema": estresse_resultado.get("sistema", ""),
+        "estresse_caminhos": estresse_resultado.get("caminhos", 0),
         "insight_score_grafico": _insight_score(score.get("valor", 0)),
         "insight_financeiro_grafico": _insight_financeiro(
             orcamento,
@@ -900,6 +907,7 @@ def _montar_contexto_relatorio(token_forcado="", liberar_sem_pagamento=False):
         "resumo_decisao": resumo_decisao,
         "tabela_indices": tabela_indices,
         "tabela_bancos": tabela_bancos,
+        "comparativo_bancos": comparativo_bancos,
         "tabela_compra_taxas": tabela_compra_taxas,
         "tabela_urbanismo": tabela_urbanismo,
         "tabela_construcao_taxas": tabela_construcao_taxas,
@@ -923,12 +931,6 @@ def _montar_contexto_relatorio(token_forcado="", liberar_sem_pagamento=False):
             float_para_moeda(renda) if renda > 0 else "Não informado"
         ),
         "sugestoes": sugestoes,
-        "modo_teste": liberar_sem_pagamento,
-        "piloto_feedback_url": piloto_feedback_url,
-        "pago": pago,
-        "liberado": pago,
-        "token": token,
-        "link_pagamento": link_pagamento,
         "is_pdf": False,
         "report_version": "Lokáo 1.0.1",
         "generated_at": datetime.now().strftime("%d/%m/%Y %H:%M"),
@@ -958,12 +960,129 @@ def _montar_contexto_relatorio(token_forcado="", liberar_sem_pagamento=False):
     }
 
 
+_MEMO_RELATORIO = MemoLRU(
+    max_itens=int(os.getenv("LOKAO_MEMO_RELATORIO_ITENS", "128")),
+    ttl_segundos=float(os.getenv("LOKAO_MEMO_RELATORIO_TTL", "900")),
+)
+
+
+def _versoes_relatorio():
+    return {
+        "bairros": obter_snapshot_bairros().versao,
+        "cub": versao_cub(),
+        "pesos": versao_pesos(),
+        "bancos": versao_bancos(),
+    }
+
+
+def _calcular_relatorio_memo(entradas, versoes):
+    chave = chave_canonica(entradas, versoes)
+    return _MEMO_RELATORIO.obter_ou_calcular(
+        chave,
+        lambda: _calcular_relatorio(entradas),
+    )
+
+
+def _com_graficos(contexto):
+    """
+    Copia do contexto com as URLs dos graficos. Os PNGs ficam em static/
+    e podem ser apagados pela limpeza (MAX_GRAFICOS), entao nao entram no
+    memo nem no snapshot: a cada uso sao recriados ou so tocados.
+    """
+    return {
+        **contexto,
+        "grafico_score_url": gerar_grafico_score(
+            score=contexto["score"].get("valor", 0),
+            media_cidade=55,
+        ),
+        "grafico_financeiro_url": gerar_grafico_financeiro(
+            orcamento=moeda_para_float(contexto.get("orcamento")),
+            valor_imovel=moeda_para_float(contexto.get("valor_imovel")),
+        ),
+    }
+
+
+def _contexto_com_token(calculado, token, pago, liberar_sem_pagamento):
+    feedback_form_url = _texto_limpo(
+        os.getenv("LOKAO_FEEDBACK_FORM_URL", ""),
+        600,
+    )
+    if liberar_sem_pagamento:
+        if feedback_form_url:
+            piloto_feedback_url = feedback_form_url
+        else:
+            piloto_feedback_url = f"/piloto/feedback?token={token}"
+    else:
+        piloto_feedback_url = ""
+
+    return {
+        **calculado,
+        "modo_teste": liberar_sem_pagamento,
+        "piloto_feedback_url": piloto_feedback_url,
+        "pago": pago,
+        "liberado": pago,
+        "token": token,
+        "link_pagamento": f"/pagar?token={token}",
+    }
+
+
+def _montar_contexto_relatorio(token_forcado="", liberar_sem_pagamento=False):
+    token = token_forcado or request.values.get("token", "")
+
+    # Relatorio pago e imutavel: serve o snapshot gravado no pagamento.
+    if token and status_pagamento(token) == "pago":
+        salvo = carregar_relatorio(token)
+        if salvo is not None:
+            return _contexto_com_token(
+                _com_graficos(salvo),
+                token,
+                True,
+                liberar_sem_pagamento,
+            )
+
+    entradas = _entradas_relatorio(token)
+    versoes = _versoes_relatorio()
+    calculado = _calcular_relatorio_memo(entradas, versoes)
+
+    dados_relatorio = {**entradas, "bairro": calculado["bairro"]}
+
+    if liberar_sem_pagamento:
+        if token:
+            registrar_pagamento_pendente(
+                token,
+                dados_relatorio=dados_relatorio,
+            )
+            confirmar_pagamento(token)
+        else:
+            _, token = criar_pagamento(
+                0,
+                dados_relatorio=dados_relatorio,
+            )
+            confirmar_pagamento(token)
+    else:
+        if token:
+            registrar_pagamento_pendente(
+                token,
+                dados_relatorio=dados_relatorio,
+            )
+        else:
+            _, token = criar_pagamento(3990, dados_relatorio=dados_relatorio)
+
+    pago = True if liberar_sem_pagamento else status_pagamento(token) == "pago"
+    if pago:
+        salvar_relatorio(token, calculado, versoes)
+
+    return _contexto_com_token(
+        _com_graficos(calculado),
+        token,
+        pago,
+        liberar_sem_pagamento,
+    )
+
+
 @router.route("/")
 def index():
-    df = carregar_bairros()
-    lista_bairros = sorted(
-        df["bairro"].dropna().astype(str).str.strip().unique().tolist()
-    )
+    lista_bairros = list(carregar_store_bairros().nomes_ordenados)
     if os.getenv("LOKAO_PILOTO_HOME", "0") == "1":
         janela = obter_janela_teste()
         return render_template(
@@ -982,10 +1101,7 @@ def index():
 
 @router.route("/oficial")
 def index_oficial():
-    df = carregar_bairros()
-    lista_bairros = sorted(
-        df["bairro"].dropna().astype(str).str.strip().unique().tolist()
-    )
+    lista_bairros = list(carregar_store_bairros().nomes_ordenados)
     return render_template(
         "index.html",
         bairros=lista_bairros,
@@ -1005,6 +1121,135 @@ def _texto_limpo(texto, limite=1000):
     return str(texto or "").strip().replace("\x00", "")[:limite]
 
 
+@router.route("/api/bairros")
+def api_bairros():
+    termo = _texto_limpo(request.args.get("q", ""), 80)
+    try:
+        limite = max(1, min(20, int(request.args.get("limite", 8))))
+    except ValueError:
+        limite = 8
+    return jsonify({"q": termo, "bairros": sugerir_bairros(termo, limite)})
+
+
+@router.route("/api/ranking")
+def api_ranking():
+    try:
+        limite = max(1, min(50, int(request.args.get("limite", 10))))
+    except ValueError:
+        limite = 10
+    padrao = _texto_limpo(request.args.get("padrao", ""), 20)
+    ranking = ranquear_bairros(
+        carregar_store_bairros(),
+        moeda_para_float(request.args.get("orcamento")),
+        valor_imovel=moeda_para_float(request.args.get("valor_imovel")),
+        area=moeda_para_float(request.args.get("area")),
+        padrao_desejado=padrao,
+        financia=_parse_financiar(request.args.get("financiar", "")),
+        limite=limite,
+    )
+    return jsonify({"ranking": ranking})
+
+
+@router.route("/api/sensibilidade")
+def api_sensibilidade():
+    """
+    Grade orcamento x area x prazo para o bairro informado, calculada em
+    lote (sem graficos nem coleta externa).
+    Eixos: lista "a,b,c" ou faixa "inicio:fim:passo".
+    """
+    try:
+        orcamentos = faixa_valores(
+            request.args.get("orcamento", ""),
+            limites=LIMITES_EIXOS["orcamento"],
+        )
+        areas = faixa_valores(
+            request.args.get("area", "") or "0",
+            limites=LIMITES_EIXOS["area"],
+        )
+        prazos = faixa_valores(
+            request.args.get("prazo", "") or "360,420",
+            limites=LIMITES_EIXOS["prazo"],
+        )
+    except ValueError as exc:
+        return jsonify({"ok": False, "erro": str(exc)}), 400
+
+    bairro = _texto_limpo(request.args.get("bairro", ""), 120)
+    padrao = _texto_limpo(request.args.get("padrao", ""), 20)
+    tipo_imovel = _texto_limpo(request.args.get("tipo_imovel", ""), 40)
+    dados_bairro = _obter_dados_bairro(bairro) or {
+        "bairro": bairro,
+        "padrao_predominante": padrao,
+        "valor_m2_medio": 0,
+    }
+    cub = 0.0
+    if "apartamento" not in tipo_imovel.lower():
+        cub = obter_cub_cuiaba(padrao=padrao).get("valor", 0)
+
+    grade = calcular_grade(
+        dados_bairro,
+        orcamentos,
+        areas,
+        prazos,
+        valor_imovel=moeda_para_float(request.args.get("valor_imovel")),
+        padrao_desejado=padrao,
+        financia=_parse_financiar(request.args.get("financiar", "")),
+        renda=moeda_para_float(request.args.get("renda")),
+        sistema=request.args.get("tipo_financiamento", ""),
+        cub=cub,
+    )
+    return jsonify({"ok": True, "bairro": dados_bairro.get("bairro"), **grade})
+
+
+@router.route("/api/capacidade")
+def api_capacidade():
+    """
+    Maior ticket/area que cabe no orcamento por cenario e bairro (compra)
+    e por metodologia e cenario (construcao).
+    """
+    orcamento = moeda_para_float(request.args.get("orcamento"))
+    if orcamento <= 0:
+        return jsonify({"ok": False, "erro": "orcamento obrigatorio"}), 400
+    if orcamento > LIMITES_EIXOS["orcamento"][1]:
+        return jsonify({"ok": False, "erro": "orcamento fora da faixa"}), 400
+    try:
+        prazo_meses = _validar_prazo_meses(request.args.get("prazo", ""))
+    except ValueError as exc:
+        return jsonify({"ok": False, "erro": str(exc)}), 400
+
+    padrao = _texto_limpo(request.args.get("padrao", ""), 20)
+    regiao = _texto_limpo(request.args.get("regiao", ""), 60).lower()
+    tipo_imovel = _texto_limpo(request.args.get("tipo_imovel", ""), 40)
+    cub = 0.0
+    if "apartamento" not in tipo_imovel.lower():
+        cub = obter_cub_cuiaba(padrao=padrao).get("valor", 0)
+
+    store = carregar_store_bairros()
+    posicoes = [
+        i
+        for i, registro in enumerate(store.registros)
+        if not regiao
+        or str(registro.get("regiao") or "").strip().lower() == regiao
+    ]
+    capacidade = resolver_capacidade(
+        orcamento,
+        [store.valor_m2_medio[i] for i in posicoes],
+        cub=cub,
+        padrao=padrao,
+        financia=_parse_financiar(request.args.get("financiar", "")),
+        renda=moeda_para_float(request.args.get("renda")),
+        prazo_meses=prazo_meses,
+        sistema=request.args.get("tipo_financiamento", ""),
+    )
+    return jsonify(
+        {
+            "ok": True,
+            "orcamento": orcamento,
+            "bairros": [store.registros[i].get("bairro") for i in posicoes],
+            **serializar_capacidade(capacidade),
+        }
+    )
+
+
 @router.route("/piloto")
 def piloto():
     registrar_evento_publico(
@@ -1012,10 +1257,7 @@ def piloto():
         ip=_ip_cliente(),
         ua=request.headers.get("User-Agent", ""),
     )
-    df = carregar_bairros()
-    lista_bairros = sorted(
-        df["bairro"].dropna().astype(str).str.strip().unique().tolist()
-    )
+    lista_bairros = list(carregar_store_bairros().nomes_ordenados)
     janela = obter_janela_teste()
     return render_template(
         "index.html",
@@ -1291,6 +1533,20 @@ def piloto_admin_export_csv():
     )
 
 
+@router.route("/piloto/admin/cache")
+def piloto_admin_cache():
+    _validar_chave_admin()
+    return jsonify(
+        {
+            "relatorio": _MEMO_RELATORIO.estatisticas(),
+            "fila_m2": FILA_M2.estatisticas(),
+            "cache_m2": CACHE_M2.estatisticas(),
+            "voo_m2": VOO_M2.estatisticas(),
+            "scraping": CLIENTE_SCRAPING.metricas(),
+        }
+    )
+
+
 @router.route("/relatorio", methods=["GET", "POST"])
 def relatorio():
     token = _texto_limpo(request.values.get("token", ""), 120)
@@ -0,0 +1,152 @@
+import numpy as np
+
+
+SISTEMAS = ("SAC", "PRICE")
+
+# Taxas efetivas anuais orientativas (faixa de mercado habitacional),
+# usadas quando o chamador nao informa as taxas.
+TAXAS_REFERENCIA = (0.0999, 0.1149, 0.1299)
+
+# Limite usual de comprometimento de renda na aprovacao de credito.
+LIMITE_COMPROMETIMENTO = 30.0
+
+# Faixa de prazos aceita, em meses: 420 e o maior prazo habitacional da
+# tabela de bancos. Prazos maiores nao existem e dimensionariam arrays
+# enormes nos cronogramas.
+PRAZO_MINIMO = 1
+PRAZO_MAXIMO = 420
+
+
+def limitar_prazo(prazo_meses, padrao=360):
+    """
+    Prazo inteiro dentro de PRAZO_MINIMO..PRAZO_MAXIMO; padrao se vazio
+    ou invalido.
+    """
+    try:
+        prazo = int(float(prazo_meses))
+    except (TypeError, ValueError, OverflowError):
+        return padrao
+    if prazo <= 0:
+        return padrao
+    return min(max(prazo, PRAZO_MINIMO), PRAZO_MAXIMO)
+
+
+def taxa_mensal(taxa_anual):
+    """
+    Taxa efetiva mensal equivalente (aceita escalar ou array).
+    """
+    return np.power(1 + np.asarray(taxa_anual, dtype=np.float64), 1 / 12) - 1
+
+
+def calcular_cronogramas(principal, taxas_anuais, prazos_meses, renda=0.0):
+    """
+    Cronogramas SAC e PRICE completos para todas as combinacoes de taxa
+    e prazo, sem laco por mes.
+
+    Os arrays de saida tem forma (sistema, taxa, prazo, mes), com o eixo
+    de meses ate o maior prazo; meses alem do prazo de cada combinacao
+    ficam zerados. `comprometimento` (% da renda) so existe com renda > 0.
+    """
+    principal = float(principal)
+    taxas = np.atleast_1d(np.asarray(taxas_anuais, dtype=np.float64))
+    prazos = np.atleast_1d(np.asarray(prazos_meses, dtype=np.int64))
+    prazos = np.maximum(prazos, 1)
+    if prazos.max() > PRAZO_MAXIMO:
+        raise ValueError(f"prazo acima de {PRAZO_MAXIMO} meses")
+
+    i = taxa_mensal(taxas)[:, None, None]
+    n = prazos[None, :, None].astype(np.float64)
+    meses = np.arange(1, int(prazos.max()) + 1, dtype=np.float64)
+    ativo = meses[None, None, :] <= n
+    decorridos = meses - 1
+
+    # SAC: amortizacao constante, juros sobre o saldo devedor.
+    amortizacao_sac = principal / n
+    saldo_sac = principal - decorridos * amortizacao_sac
+    parcelas_sac = amortizacao_sac + i * saldo_sac
+
+    # PRICE: parcela constante.
+    fator = 1 + i
+    com_juros = i > 0
+    i_seguro = np.where(com_juros, i, 1.0)
+    desconto = np.where(com_juros, 1 - np.power(fator, -n), 1.0)
+    pmt = np.where(com_juros, principal * i_seguro / desconto, principal / n)
+    crescimento = np.power(fator, decorridos)
+    saldo_price = principal * crescimento - pmt * np.where(
+        com_juros,
+        (crescimento - 1) / i_seguro,
+        decorridos,
+    )
+    parcelas_price = np.broadcast_to(pmt, saldo_price.shape)
+
+    parcelas = np.where(ativo, np.stack([parcelas_sac, parcelas_price]), 0.0)
+    saldos = np.where(
+        ativo,
+        np.stack(np.broadcast_arrays(saldo_sac, saldo_price)),
+        0.0,
+    )
+    juros = np.where(ativo, np.stack([i * saldo_sac, i * saldo_price]), 0.0)
+
+    ultimo_mes = np.broadcast_to(
+        prazos[None, None, :, None] - 1,
+        parcelas.shape[:3] + (1,),
+    )
+    resultado = {
+        "sistemas": SISTEMAS,
+        "taxas_anuais": taxas,
+        "prazos_meses": prazos,
+        "parcelas": parcelas,
+        # Saldo devedor no inicio de cada mes (base dos juros e do MIP).
+        "saldo_devedor": saldos,
+        "primeira_parcela": parcelas[..., 0],
+        "ultima_parcela": np.take_along_axis(
+            parcelas,
+            ultimo_mes,
+            axis=-1,
+        )[..., 0],
+        "juros_totais": juros.sum(axis=-1),
+        "total_pago": parcelas.sum(axis=-1),
+        "comprometimento": None,
+    }
+    if renda > 0:
+        resultado["comprometimento"] = parcelas / renda * 100
+    return resultado
+
+
+def resumir_cronogramas(principal, taxas_anuais, prazos_meses, renda=0.0):
+    """
+    Uma linha por (sistema, taxa, prazo) com primeira/ultima parcela,
+    juros totais e leitura da curva de comprometimento de renda.
+    """
+    cron = calcular_cronogramas(principal, taxas_anuais, prazos_meses, renda)
+    comprometimento = cron["comprometimento"]
+    if comprometimento is not None:
+        inicial = comprometimento[..., 0]
+        maximo = comprometimento.max(axis=-1)
+        meses_acima = (comprometimento > LIMITE_COMPROMETIMENTO).sum(axis=-1)
+
+    linhas = []
+    for s, sistema in enumerate(cron["sistemas"]):
+        for t, taxa in enumerate(cron["taxas_anuais"]):
+            for p, prazo in enumerate(cron["prazos_meses"]):
+                linha = {
+                    "sistema": sistema,
+                    "taxa_anual": float(taxa),
+                    "prazo_meses": int(prazo),
+                    "primeira_parcela": float(
+                        cron["primeira_parcela"][s, t, p]
+                    ),
+                    "ultima_parcela": float(cron["ultima_parcela"][s, t, p]),
+                    "juros_totais": float(cron["juros_totais"][s, t, p]),
+                    "total_pago": float(cron["total_pago"][s, t, p]),
+                }
+                if comprometimento is not None:
+                    linha.update(
+                        {
+                            "comprometimento_inicial": float(inicial[s, t, p]),
+                            "comprometimento_maximo": float(maximo[s, t, p]),
+                            "meses_acima_limite": int(meses_acima[s, t, p]),
+                        }
+                    )
+                linhas.append(linha)
+    return linhas
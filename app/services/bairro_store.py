@@ -0,0 +1,155 @@
+from array import array
+
+from app.utils.formatacao import moeda_para_float
+
+
+# Colunas do contrato da base (loader); outras ficam em _extras.
+COLUNAS_BAIRRO = (
+    "bairro",
+    "regiao",
+    "municipio",
+    "ativo",
+    "padrao_predominante",
+    "categoria_urbana",
+    "perfil_socioeconomico",
+    "valor_m2_medio",
+    "faixa_valor_min",
+    "faixa_valor_max",
+    "origem_valor",
+    "potencial_valorizacao",
+    "liquidez_mercado",
+    "custo_vida_indireto",
+    "risco_urbanistico",
+    "percepcao_seguranca",
+    "observacoes",
+    "perfil_urbano",
+    "uso_predominante",
+    "infraestrutura",
+    "nivel_ruido",
+    "padrao",
+)
+_SLOTS = frozenset(COLUNAS_BAIRRO)
+_FALTANTE = object()
+
+
+class BairroRegistro:
+    """
+    Linha da base de bairros com __slots__.
+    Se comporta como um mapping somente leitura: get(), [] e dict(registro).
+    """
+
+    __slots__ = ("_colunas", "_extras") + COLUNAS_BAIRRO
+
+    def __init__(self, colunas, valores):
+        self._colunas = colunas
+        self._extras = None
+        for nome, valor in zip(colunas, valores):
+            if nome in _SLOTS:
+                setattr(self, nome, valor)
+            else:
+                if self._extras is None:
+                    self._extras = {}
+                self._extras[nome] = valor
+
+    def get(self, campo, padrao=None):
+        if campo in _SLOTS:
+            return getattr(self, campo, padrao)
+        if self._extras is None:
+            return padrao
+        return self._extras.get(campo, padrao)
+
+    def __getitem__(self, campo):
+        valor = self.get(campo, _FALTANTE)
+        if valor is _FALTANTE:
+            raise KeyError(campo)
+        return valor
+
+    def __contains__(self, campo):
+        return self.get(campo, _FALTANTE) is not _FALTANTE
+
+    def keys(self):
+        return self._colunas
+
+    def as_dict(self):
+        return {coluna: self[coluna] for coluna in self._colunas}
+
+    def __repr__(self):
+        return f"BairroRegistro({self.get('bairro')!r})"
+
+
+def _coluna_numerica(registros, campo):
+    return array("d", (moeda_para_float(r.get(campo)) for r in registros))
+
+
+class BairroStore:
+    """
+    Base de bairros em memoria sem pandas: registros com __slots__ e
+    colunas numericas paralelas (array de doubles) para filtros rapidos.
+    Valores numericos ausentes viram 0.0 nas colunas paralelas.
+    """
+
+    __slots__ = (
+        "colunas",
+        "registros",
+        "valor_m2_medio",
+        "faixa_valor_min",
+        "faixa_valor_max",
+        "nomes_ordenados",
+        "_derivados",
+    )
+
+    def __init__(self, colunas, linhas):
+        self.colunas = tuple(colunas)
+        self.registros = tuple(
+            BairroRegistro(self.colunas, linha) for linha in linhas
+        )
+        self.valor_m2_medio = _coluna_numerica(self.registros, "valor_m2_medio")
+        self.faixa_valor_min = _coluna_numerica(
+            self.registros,
+            "faixa_valor_min",
+        )
+        self.faixa_valor_max = _coluna_numerica(
+            self.registros,
+            "faixa_valor_max",
+        )
+        self.nomes_ordenados = tuple(
+            sorted(
+                {
+                    str(r.get("bairro")).strip()
+                    for r in self.registros
+                    if r.get("bairro") is not None
+                }
+            )
+        )
+        self._derivados = {}
+
+    @classmethod
+    def de_registros(cls, registros):
+        """
+        Monta a partir de dicts (ex.: DataFrame.to_dict("records")).
+        """
+        registros = list(registros)
+        colunas = list(registros[0].keys()) if registros else []
+        return cls(
+            colunas,
+            ([r.get(c) for c in colunas] for r in registros),
+        )
+
+    def derivado(self, nome, construtor):
+        """
+        Estrutura derivada (colunas preparadas, indices) calculada uma
+        unica vez por store.
+        """
+        try:
+            return self._derivados[nome]
+        except KeyError:
+            return self._derivados.setdefault(nome, construtor(self))
+
+    def __len__(self):
+        return len(self.registros)
+
+    def __iter__(self):
+        return iter(self.registros)
+
+    def coluna(self, campo):
+        return [r.get(campo) for r in self.registros]
@@ -1,3 +1,10 @@
+from app.services.indice_bairros import (
+    IndiceTrigramas,
+    chave_busca,
+    obter_indice_bairros,
+)
+
+
 MAPA_BAIRROS = {
     "Centro": "Urbano Consolidado Central",
     "Araés": "Urbano Consolidado Central",
@@ -25,5 +32,19 @@ MAPA_BAIRROS = {
 
 PERFIL_PADRAO = "Residencial Tradicional Consolidado"
 
+_MAPA_NORMALIZADO = {
+    chave_busca(nome): perfil
+    for nome, perfil in MAPA_BAIRROS.items()
+}
+_INDICE_MAPA = IndiceTrigramas((nome, nome) for nome in MAPA_BAIRROS)
+
+
 def obter_perfil_lokao(bairro: str) -> str:
-    return MAPA_BAIRROS.get(bairro, PERFIL_PADRAO)
+    perfil = _MAPA_NORMALIZADO.get(chave_busca(bairro))
+    if perfil is None:
+        # Apelidos e erros de digitacao resolvem para o nome oficial.
+        oficial = obter_indice_bairros().nome_oficial(bairro)
+        perfil = _MAPA_NORMALIZADO.get(chave_busca(oficial))
+    if perfil is None:
+        perfil = MAPA_BAIRROS.get(_INDICE_MAPA.melhor(bairro))
+    return perfil or PERFIL_PADRAO
@@ -0,0 +1,282 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+
+# Versao do esquema em PRAGMA user_version; o JSON antigo e importado uma
+# unica vez, na criacao da tabela (versao 0 -> atual).
+VERSAO_ESQUEMA = 2
+
+_COLUNAS = (
+    "bairro",
+    "tipo",
+    "valor",
+    "status",
+    "fonte",
+    "coletado_em",
+    "falha_em",
+    "cooldown_horas",
+    "expira_em",
+)
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS m2_cache (
+    bairro TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    valor REAL,
+    status TEXT,
+    fonte TEXT,
+    coletado_em TEXT,
+    falha_em TEXT,
+    cooldown_horas REAL,
+    expira_em TEXT,
+    PRIMARY KEY (bairro, tipo)
+);
+CREATE INDEX IF NOT EXISTS m2_cache_expira ON m2_cache (expira_em);
+CREATE TABLE IF NOT EXISTS m2_lease (
+    bairro TEXT NOT NULL,
+    tipo TEXT NOT NULL,
+    dono TEXT NOT NULL,
+    expira_em REAL NOT NULL,
+    PRIMARY KEY (bairro, tipo)
+);
+"""
+
+# Lease de coleta entre workers: so assume quem nao tem lease ou cujo
+# lease venceu (dono morto no meio da coleta).
+_ADQUIRIR_LEASE = """
+INSERT INTO m2_lease (bairro, tipo, dono, expira_em) VALUES (?, ?, ?, ?)
+ON CONFLICT (bairro, tipo) DO UPDATE SET
+    dono = excluded.dono,
+    expira_em = excluded.expira_em
+WHERE m2_lease.expira_em < ?
+"""
+
+# Sucesso substitui a linha; falha so marca falha_em/cooldown e mantem o
+# ultimo valor coletado (segue servido como vencido). Um unico comando,
+# entao workers concorrentes nao perdem atualizacoes uns dos outros.
+_UPSERT_SUCESSO = """
+INSERT INTO m2_cache (
+    bairro, tipo, valor, status, fonte, coletado_em,
+    falha_em, cooldown_horas, expira_em
+) VALUES (?, ?, ?, NULL, ?, ?, NULL, NULL, ?)
+ON CONFLICT (bairro, tipo) DO UPDATE SET
+    valor = excluded.valor,
+    status = NULL,
+    fonte = excluded.fonte,
+    coletado_em = excluded.coletado_em,
+    falha_em = NULL,
+    cooldown_horas = NULL,
+    expira_em = excluded.expira_em
+"""
+
+_UPSERT_FALHA = """
+INSERT INTO m2_cache (
+    bairro, tipo, valor, status, fonte, coletado_em,
+    falha_em, cooldown_horas, expira_em
+) VALUES (?, ?, NULL, 'falha', ?, ?, ?, ?, ?)
+ON CONFLICT (bairro, tipo) DO UPDATE SET
+    status = 'falha',
+    falha_em = excluded.falha_em,
+    cooldown_horas = excluded.cooldown_horas,
+    fonte = CASE WHEN m2_cache.valor > 0
+        THEN m2_cache.fonte ELSE excluded.fonte END,
+    coletado_em = CASE WHEN m2_cache.valor > 0
+        THEN m2_cache.coletado_em ELSE excluded.coletado_em END,
+    expira_em = CASE WHEN m2_cache.valor > 0
+        THEN m2_cache.expira_em ELSE excluded.expira_em END
+"""
+
+
+def _somar_horas(iso, horas):
+    return (
+        datetime.fromisoformat(iso) + timedelta(hours=float(horas))
+    ).isoformat(timespec="seconds")
+
+
+class CacheM2:
+    """
+    Cache de m2 em SQLite (WAL), uma linha por (bairro, tipo). Cada
+    thread abre a propria conexao, recriada apos fork do gunicorn.
+    """
+
+    def __init__(self, caminho, json_legado=None, validade_horas=168):
+        self.caminho = Path(caminho)
+        self.json_legado = Path(json_legado) if json_legado else None
+        self.validade_horas = validade_horas
+        self._local = threading.local()
+
+    def _conexao(self):
+        conexao = getattr(self._local, "conexao", None)
+        if conexao is not None and self._local.pid == os.getpid():
+            return conexao
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        conexao = sqlite3.connect(self.caminho, timeout=5)
+        conexao.row_factory = sqlite3.Row
+        conexao.execute("PRAGMA journal_mode=WAL")
+        conexao.execute("PRAGMA synchronous=NORMAL")
+        self._preparar(conexao)
+        self._local.conexao = conexao
+        self._local.pid = os.getpid()
+        return conexao
+
+    def _preparar(self, conexao):
+        if conexao.execute("PRAGMA user_version").fetchone()[0] >= VERSAO_ESQUEMA:
+            return
+        # BEGIN IMMEDIATE: so um worker cria o esquema e migra o JSON.
+        with conexao:
+            conexao.execute("BEGIN IMMEDIATE")
+            versao = conexao.execute("PRAGMA user_version").fetchone()[0]
+            if versao >= VERSAO_ESQUEMA:
+                return
+            for comando in _ESQUEMA.split(";"):
+                if comando.strip():
+                    conexao.execute(comando)
+            if versao == 0:
+                conexao.executemany(
+                    f"INSERT OR IGNORE INTO m2_cache ({', '.join(_COLUNAS)}) "
+                    f"VALUES ({', '.join('?' * len(_COLUNAS))})",
+                    self._linhas_legado(),
+                )
+            conexao.execute(f"PRAGMA user_version = {VERSAO_ESQUEMA}")
+
+    def _linhas_legado(self):
+        """
+        Registros do antigo mercado_m2_cache.json ("bairro|tipo" -> dict).
+        """
+        if self.json_legado is None or not self.json_legado.exists():
+            return []
+        try:
+            cache = json.loads(self.json_legado.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return []
+
+        linhas = []
+        for chave, registro in (cache or {}).items():
+            if "|" not in str(chave) or not isinstance(registro, dict):
+                continue
+            bairro, tipo = str(chave).split("|", 1)
+            coletado_em = str(registro.get("coletado_em") or "") or None
+            falha = registro.get("status") == "falha"
+            falha_em = registro.get("falha_em") or (coletado_em if falha else None)
+            try:
+                valor = float(registro.get("valor") or 0) or None
+                if valor and coletado_em:
+                    expira_em = _somar_horas(coletado_em, self.validade_horas)
+                elif falha_em:
+                    expira_em = _somar_horas(
+                        falha_em,
+                        registro.get("cooldown_horas") or 0,
+                    )
+                else:
+                    expira_em = None
+            except (TypeError, ValueError):
+                continue
+            linhas.append(
+                (
+                    bairro,
+                    tipo,
+                    valor,
+                    "falha" if falha else None,
+                    registro.get("fonte"),
+                    coletado_em,
+                    falha_em,
+                    registro.get("cooldown_horas"),
+                    expira_em,
+                )
+            )
+        return linhas
+
+    def obter(self, bairro, tipo):
+        """
+        Registro de (bairro, tipo) como dict, ou {} se nao houver.
+        """
+        linha = self._conexao().execute(
+            "SELECT * FROM m2_cache WHERE bairro = ? AND tipo = ?",
+            (bairro, tipo),
+        ).fetchone()
+        if linha is None:
+            return {}
+        return {k: linha[k] for k in linha.keys() if linha[k] is not None}
+
+    def gravar_sucesso(self, bairro, tipo, valor, fonte, coletado_em):
+        with self._conexao() as conexao:
+            conexao.execute(
+                _UPSERT_SUCESSO,
+                (
+                    bairro,
+                    tipo,
+                    float(valor),
+                    fonte,
+                    coletado_em,
+                    _somar_horas(coletado_em, self.validade_horas),
+                ),
+            )
+
+    def gravar_falha(self, bairro, tipo, fonte, falha_em, cooldown_horas):
+        with self._conexao() as conexao:
+            conexao.execute(
+                _UPSERT_FALHA,
+                (
+                    bairro,
+                    tipo,
+                    fonte,
+                    falha_em,
+                    falha_em,
+                    cooldown_horas,
+                    _somar_horas(falha_em, cooldown_horas),
+                ),
+            )
+
+    def adquirir_lease(self, bairro, tipo, dono, segundos):
+        """
+        Reserva a coleta de (bairro, tipo) por alguns segundos. Retorna
+        False se outro dono tiver lease valido.
+        """
+        agora = time.time()
+        with self._conexao() as conexao:
+            cursor = conexao.execute(
+                _ADQUIRIR_LEASE,
+                (bairro, tipo, dono, agora + float(segundos), agora),
+            )
+        return cursor.rowcount == 1
+
+    def liberar_lease(self, bairro, tipo, dono):
+        with self._conexao() as conexao:
+            conexao.execute(
+                "DELETE FROM m2_lease WHERE bairro = ? AND tipo = ? AND dono = ?",
+                (bairro, tipo, dono),
+            )
+
+    def lease_ativo(self, bairro, tipo):
+        linha = self._conexao().execute(
+            "SELECT 1 FROM m2_lease WHERE bairro = ? AND tipo = ? "
+            "AND expira_em >= ?",
+            (bairro, tipo, time.time()),
+        ).fetchone()
+        return linha is not None
+
+    def vencidos(self, limite=100, agora=None):
+        """
+        (bairro, tipo) com expira_em no passado, mais antigos primeiro
+        (usa o indice de expiracao).
+        """
+        agora = agora or datetime.now().isoformat(timespec="seconds")
+        linhas = self._conexao().execute(
+            "SELECT bairro, tipo FROM m2_cache WHERE expira_em <= ? "
+            "ORDER BY expira_em LIMIT ?",
+            (agora, int(limite)),
+        ).fetchall()
+        return [(l["bairro"], l["tipo"]) for l in linhas]
+
+    def estatisticas(self):
+        conexao = self._conexao()
+        total = conexao.execute("SELECT COUNT(*) FROM m2_cache").fetchone()[0]
+        falhas = conexao.execute(
+            "SELECT COUNT(*) FROM m2_cache WHERE status = 'falha'"
+        ).fetchone()[0]
+        return {"caminho": str(self.caminho), "registros": total, "falhas": falhas}
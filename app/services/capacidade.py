@@ -0,0 +1,136 @@
+import numpy as np
+
+from app.services.amortizacao import (
+    LIMITE_COMPROMETIMENTO,
+    TAXAS_REFERENCIA,
+    calcular_cronogramas,
+    limitar_prazo,
+)
+from app.services.financeiro import (
+    CENARIOS_COMPRA,
+    CENARIOS_CONSTRUCAO,
+    ENTRADA_MINIMA,
+    custo_m2_metodologia,
+    tarifa_bancaria,
+)
+
+
+def _fatores_compra(financia):
+    """
+    (fator, tarifa) por cenario de compra: o desembolso no cenario e
+    ticket x fator + tarifa. Financiando, o ticket entra so pela entrada.
+    """
+    base = ENTRADA_MINIMA if financia else 1.0
+    fatores = np.array(
+        [
+            base + p["itbi"] + p["cartorio"] + p["adequacoes"] + p["reserva"]
+            for p in CENARIOS_COMPRA.values()
+        ]
+    )
+    tarifas = np.array(
+        [tarifa_bancaria(p, financia) for p in CENARIOS_COMPRA.values()],
+        dtype=np.float64,
+    )
+    return fatores, tarifas
+
+
+def _fatores_construcao():
+    return np.array(
+        [1 + sum(p.values()) for p in CENARIOS_CONSTRUCAO.values()]
+    )
+
+
+def ticket_maximo_renda(renda, prazo_meses=360, sistema="SAC"):
+    """
+    Maior ticket cuja primeira parcela (taxa de referencia intermediaria)
+    cabe em 30% da renda; infinito sem renda informada. O prazo e limitado
+    a PRAZO_MAXIMO.
+    """
+    if renda <= 0:
+        return np.inf
+    s = 1 if str(sistema or "").upper() == "PRICE" else 0
+    unitario = calcular_cronogramas(
+        1.0,
+        [TAXAS_REFERENCIA[1]],
+        [limitar_prazo(prazo_meses)],
+    )["primeira_parcela"][s, 0, 0]
+    saldo_max = renda * LIMITE_COMPROMETIMENTO / 100 / unitario
+    return saldo_max / (1 - ENTRADA_MINIMA)
+
+
+def resolver_capacidade(
+    orcamento,
+    valores_m2,
+    cub=0.0,
+    padrao="",
+    financia=False,
+    renda=0.0,
+    prazo_meses=360,
+    sistema="SAC",
+):
+    """
+    Solucao fechada de "quanto cabe no orcamento", considerando todas as
+    camadas de custo dos cenarios de analisar_financeiro.
+
+    Compra (cenario x bairro): maior ticket com ticket x fator + tarifa
+    <= orcamento (financiando, so a entrada sai do orcamento e o ticket
+    tambem fica limitado pela parcela frente a renda); a area e o ticket
+    sobre o valor_m2 de cada bairro (NaN sem valor).
+    Construcao (metodologia x cenario): maior area com custo_m2 x area x
+    (1 + projetos + aprovacoes + infraestrutura + contingencia) <= orcamento.
+    O custo de obra nao varia por bairro na base, entao o cubo
+    metodologia x cenario x bairro se separa nessas duas tabelas.
+    """
+    orcamento = max(float(orcamento or 0), 0.0)
+    valores_m2 = np.asarray(valores_m2, dtype=np.float64)
+
+    fatores, tarifas = _fatores_compra(financia)
+    ticket = np.maximum(orcamento - tarifas, 0.0) / fatores
+    if financia:
+        ticket = np.minimum(
+            ticket,
+            ticket_maximo_renda(renda, prazo_meses, sistema),
+        )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        area_compra = np.where(
+            valores_m2[None, :] > 0,
+            ticket[:, None] / valores_m2[None, :],
+            np.nan,
+        )
+
+    metodologias = custo_m2_metodologia(cub, padrao)
+    custo_m2 = np.array([m["m2"] for m in metodologias])
+    custo_efetivo = custo_m2[:, None] * _fatores_construcao()[None, :]
+    area_construcao = orcamento / custo_efetivo
+
+    return {
+        "cenarios": list(CENARIOS_COMPRA),
+        "ticket_maximo": ticket,
+        "area_maxima_compra": area_compra,
+        "metodologias": [m["metodologia"] for m in metodologias],
+        "cenarios_construcao": list(CENARIOS_CONSTRUCAO),
+        "custo_m2_efetivo": custo_efetivo,
+        "area_maxima_construcao": area_construcao,
+    }
+
+
+def serializar_capacidade(capacidade):
+    """
+    Resultado de resolver_capacidade em listas JSON (areas sem valor de
+    m2 viram None).
+    """
+    area_compra = np.round(capacidade["area_maxima_compra"], 1)
+    return {
+        "cenarios": capacidade["cenarios"],
+        "ticket_maximo": np.round(capacidade["ticket_maximo"], 2).tolist(),
+        "area_maxima_compra": [
+            [None if np.isnan(v) else float(v) for v in linha]
+            for linha in area_compra
+        ],
+        "metodologias": capacidade["metodologias"],
+        "cenarios_construcao": capacidade["cenarios_construcao"],
+        "custo_m2_efetivo": np.round(capacidade["custo_m2_efetivo"], 2).tolist(),
+        "area_maxima_construcao": np.round(
+            capacidade["area_maxima_construcao"], 1
+        ).tolist(),
+    }
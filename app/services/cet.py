@@ -0,0 +1,286 @@
+import json
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+
+from app.services.amortizacao import (
+    LIMITE_COMPROMETIMENTO,
+    SISTEMAS,
+    calcular_cronogramas,
+)
+from app.services.memo import MemoLRU, chave_canonica
+
+
+_BANCOS_PATH = (
+    Path(__file__).resolve().parents[1] / "data" / "taxas_bancos.json"
+)
+
+PRAZOS_PADRAO = (360, 420)
+
+_MEMO_CET = MemoLRU(max_itens=512, ttl_segundos=24 * 3600)
+
+
+@dataclass(frozen=True)
+class TabelaBancos:
+    """
+    Condicoes por banco em arrays alinhados (uma posicao por banco).
+    Seguros mensais: MIP sobre o saldo devedor, DFI sobre o valor do
+    imovel; tarifas_iniciais saem do valor liberado.
+    """
+
+    instituicoes: tuple
+    observacoes: tuple
+    taxa_anual: np.ndarray
+    prazo_maximo: np.ndarray
+    # (banco, sistema) na ordem de amortizacao.SISTEMAS.
+    sistemas: np.ndarray
+    seguro_mip: np.ndarray
+    seguro_dfi: np.ndarray
+    tarifa_mensal: np.ndarray
+    tarifas_iniciais: np.ndarray
+    fonte: str = ""
+    referencia: str = ""
+
+    def __len__(self):
+        return len(self.instituicoes)
+
+
+def compilar_bancos(texto):
+    """
+    Le o JSON de taxas e valida cada banco; levanta ValueError se algo
+    estiver ausente ou fora de faixa.
+    """
+    try:
+        dados = json.loads(texto)
+        bancos = dados["bancos"]
+    except (ValueError, KeyError, TypeError) as exc:
+        raise ValueError(f"taxas_bancos invalido: {exc}") from exc
+    if not bancos:
+        raise ValueError("taxas_bancos sem bancos")
+
+    colunas = {
+        "taxa_anual": [],
+        "prazo_maximo": [],
+        "seguro_mip_mensal": [],
+        "seguro_dfi_mensal": [],
+        "tarifa_mensal": [],
+        "tarifas_iniciais": [],
+    }
+    instituicoes, observacoes, sistemas = [], [], []
+    for banco in bancos:
+        try:
+            instituicoes.append(str(banco["instituicao"]).strip())
+            observacoes.append(str(banco.get("observacao") or "").strip())
+            for campo, valores in colunas.items():
+                valores.append(float(banco.get(campo, 0) or 0))
+            aceitos = {str(s).upper() for s in banco.get("sistemas", SISTEMAS)}
+        except (KeyError, TypeError, ValueError) as exc:
+            raise ValueError(f"banco invalido: {banco!r}") from exc
+        sistemas.append([s in aceitos for s in SISTEMAS])
+
+    taxa = np.array(colunas["taxa_anual"])
+    if np.any(taxa <= 0) or np.any(taxa >= 1):
+        raise ValueError("taxa_anual deve estar entre 0 e 1")
+    for campo, valores in colunas.items():
+        if any(v < 0 for v in valores):
+            raise ValueError(f"{campo} negativo")
+
+    return TabelaBancos(
+        instituicoes=tuple(instituicoes),
+        observacoes=tuple(observacoes),
+        taxa_anual=taxa,
+        prazo_maximo=np.array(colunas["prazo_maximo"], dtype=np.int64),
+        sistemas=np.array(sistemas, dtype=bool),
+        seguro_mip=np.array(colunas["seguro_mip_mensal"]),
+        seguro_dfi=np.array(colunas["seguro_dfi_mensal"]),
+        tarifa_mensal=np.array(colunas["tarifa_mensal"]),
+        tarifas_iniciais=np.array(colunas["tarifas_iniciais"]),
+        fonte=str(dados.get("fonte", "")),
+        referencia=str(dados.get("referencia", "")),
+    )
+
+
+class CatalogoBancos:
+    """
+    Tabela de bancos por processo, relida quando mtime ou tamanho do JSON
+    mudam. Se a nova versao for invalida, mantem a anterior.
+    """
+
+    def __init__(self, caminho):
+        self._caminho = Path(caminho)
+        self._lock = threading.Lock()
+        self._assinatura = None
+        self._tabela = None
+
+    def _assinatura_atual(self):
+        try:
+            stat = self._caminho.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def tabela(self):
+        assinatura = self._assinatura_atual()
+        tabela = self._tabela
+        if tabela is not None and assinatura == self._assinatura:
+            return tabela
+
+        with self._lock:
+            if assinatura != self._assinatura or self._tabela is None:
+                try:
+                    texto = self._caminho.read_text(encoding="utf-8-sig")
+                    self._tabela = compilar_bancos(texto)
+                except (OSError, ValueError):
+                    pass
+                self._assinatura = assinatura
+            return self._tabela
+
+    def versao(self):
+        """
+        Assinatura (mtime, tamanho) do arquivo da tabela em uso.
+        """
+        self.tabela()
+        return self._assinatura
+
+
+_CATALOGO = CatalogoBancos(_BANCOS_PATH)
+
+
+def obter_tabela_bancos():
+    """
+    Tabela de bancos em uso, ou None se nunca houve arquivo valido.
+    """
+    return _CATALOGO.tabela()
+
+
+def versao_bancos():
+    return _CATALOGO.versao()
+
+
+def _fluxos(tabela, principal, valor_imovel, prazos):
+    """
+    Pagamentos mensais (banco, sistema, prazo, mes): parcela + MIP sobre
+    o saldo + DFI sobre o imovel + tarifa mensal, zerados apos o prazo.
+    """
+    cron = calcular_cronogramas(principal, tabela.taxa_anual, prazos)
+    # (sistema, banco, prazo, mes) -> (banco, sistema, prazo, mes)
+    parcelas = cron["parcelas"].transpose(1, 0, 2, 3)
+    saldos = cron["saldo_devedor"].transpose(1, 0, 2, 3)
+    ativo = parcelas > 0
+
+    por_banco = (slice(None), None, None, None)
+    return (
+        parcelas
+        + saldos * tabela.seguro_mip[por_banco]
+        + ativo * (
+            valor_imovel * tabela.seguro_dfi[por_banco]
+            + tabela.tarifa_mensal[por_banco]
+        )
+    )
+
+
+def _cet_mensal(fluxos, liquido, chute, iteracoes=30, tolerancia=1e-12):
+    """
+    Taxa mensal que iguala o valor presente dos pagamentos ao valor
+    liberado, por Newton em todas as combinacoes de uma vez.
+    """
+    t = np.arange(1, fluxos.shape[-1] + 1, dtype=np.float64)
+    taxa = np.array(chute, dtype=np.float64)
+    for _ in range(iteracoes):
+        desconto = np.power(1 + taxa[..., None], -t)
+        valor = (fluxos * desconto).sum(axis=-1) - liquido
+        derivada = -(fluxos * t * desconto).sum(axis=-1) / (1 + taxa)
+        passo = valor / derivada
+        taxa = np.maximum(taxa - passo, -0.99)
+        if np.max(np.abs(passo)) < tolerancia:
+            break
+    return taxa
+
+
+def _cet_anual(tabela, fluxos, principal, valor_imovel, prazos):
+    """
+    CET anual (banco, sistema, prazo) para o valor exato (centavos),
+    memorizado por valores, prazos e versao da tabela. As tarifas iniciais
+    sao fixas em reais, entao faixas de valor distorceriam o CET de
+    financiamentos pequenos.
+    """
+    chave = chave_canonica(
+        "cet",
+        round(principal, 2),
+        round(valor_imovel, 2),
+        [int(p) for p in prazos],
+        versao_bancos(),
+    )
+
+    def calcular():
+        liquido = principal - tabela.tarifas_iniciais[:, None, None]
+        chute = np.broadcast_to(
+            (np.power(1 + tabela.taxa_anual, 1 / 12) - 1)[:, None, None],
+            liquido.shape[:1] + fluxos.shape[1:3],
+        )
+        mensal = _cet_mensal(fluxos, liquido, chute)
+        return np.power(1 + mensal, 12) - 1
+
+    return _MEMO_CET.obter_ou_calcular(chave, calcular)
+
+
+def comparar_bancos(
+    valor_financiado,
+    valor_imovel=0.0,
+    renda=0.0,
+    prazos=PRAZOS_PADRAO,
+    limite=None,
+):
+    """
+    Ranking de banco x SAC/PRICE x prazo pelo CET (juros, seguros MIP e
+    DFI e tarifas), com primeira parcela e total pago exatos para o valor
+    informado. Combinacoes fora do prazo maximo ou dos sistemas do banco
+    ficam de fora; empate no CET desempata pelo total pago.
+    """
+    tabela = obter_tabela_bancos()
+    principal = float(valor_financiado or 0)
+    if tabela is None or not len(tabela) or principal <= 0:
+        return []
+    valor_imovel = float(valor_imovel or 0) or principal
+    renda = float(renda or 0)
+    prazos = np.maximum(np.atleast_1d(np.asarray(prazos, dtype=np.int64)), 1)
+
+    fluxos = _fluxos(tabela, principal, valor_imovel, prazos)
+    primeira = fluxos[..., 0]
+    total = fluxos.sum(axis=-1) + tabela.tarifas_iniciais[:, None, None]
+    cet = _cet_anual(tabela, fluxos, principal, valor_imovel, prazos)
+
+    disponivel = (
+        tabela.sistemas[:, :, None]
+        & (prazos[None, None, :] <= tabela.prazo_maximo[:, None, None])
+    )
+    b, s, p = np.nonzero(disponivel)
+    ordem = np.lexsort((total[b, s, p], cet[b, s, p]))
+    if limite:
+        ordem = ordem[:limite]
+
+    linhas = []
+    for k in ordem:
+        i, j, m = b[k], s[k], p[k]
+        linha = {
+            "instituicao": tabela.instituicoes[i],
+            "observacao": tabela.observacoes[i],
+            "sistema": SISTEMAS[j],
+            "prazo_meses": int(prazos[m]),
+            "taxa_anual": float(tabela.taxa_anual[i]),
+            "cet_anual": float(cet[i, j, m]),
+            "primeira_parcela": float(primeira[i, j, m]),
+            "total_pago": float(total[i, j, m]),
+            "comprometimento_inicial": None,
+            "dentro_limite": None,
+        }
+        if renda > 0:
+            comprometimento = primeira[i, j, m] / renda * 100
+            linha["comprometimento_inicial"] = float(comprometimento)
+            linha["dentro_limite"] = bool(
+                comprometimento <= LIMITE_COMPROMETIMENTO
+            )
+        linhas.append(linha)
+    return linhas
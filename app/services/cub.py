@@ -1,4 +1,7 @@
 ﻿import json
+import threading
+from array import array
+from bisect import bisect_right
 from datetime import datetime
 from pathlib import Path
 
@@ -36,63 +39,211 @@ def _formatar_competencia_br(competencia):
     return f"{mes}/{ano}"
 
 
-def _carregar_serie():
-    if not _CUB_PATH.exists():
-        return {
-            "cidade": "Cuiaba-MT",
-            "fonte": "Base referencial Lokao",
-            "series": [],
-        }
+PADROES_CUB = ("economico", "medio", "alto")
+_CIDADE_PADRAO = "Cuiaba-MT"
+_FONTE_PADRAO = "Base referencial Lokao"
+
+
+def _valor_cub(valor):
     try:
-        return json.loads(_CUB_PATH.read_text(encoding="utf-8"))
-    except Exception:
-        return {
-            "cidade": "Cuiaba-MT",
-            "fonte": "Base referencial Lokao",
-            "series": [],
-        }
+        valor = float(valor or 0)
+    except (TypeError, ValueError):
+        return 0.0
+    return valor if valor > 0 else 0.0
 
 
-def obter_cub_cuiaba(padrao, competencia=None):
+class SerieCub:
     """
-    Retorna CUB referencia por competencia e padrao.
-    Se nao houver a competencia solicitada, usa a ultima disponivel.
+    Serie de CUB ordenada por competencia em arrays paralelos: uma lista
+    de competencias ("AAAA-MM") e uma coluna array('d') por padrao.
+    Valor ausente (ou zero) num item nao conta como dado: a consulta usa
+    o ultimo valor conhecido daquele padrao.
     """
 
-    alvo_padrao = _normalizar_padrao(padrao)
-    comp = competencia or _competencia_referencia()
-    base = _carregar_serie()
-    serie = sorted(
-        base.get("series", []),
-        key=lambda x: x.get("competencia", ""),
+    __slots__ = (
+        "competencias",
+        "colunas",
+        "origens",
+        "conhecidos",
+        "cidade",
+        "fonte",
     )
 
-    if not serie:
-        return {
-            "valor": 0.0,
-            "padrao": alvo_padrao,
-            "competencia": "",
-            "competencia_br": "",
-            "cidade": base.get("cidade", "Cuiaba-MT"),
-            "fonte": base.get("fonte", "Base referencial Lokao"),
-            "metodo": "sem_base",
+    def __init__(self, base):
+        itens = sorted(
+            base.get("series", []),
+            key=lambda x: x.get("competencia", ""),
+        )
+        self.competencias = [item.get("competencia", "") for item in itens]
+        self.colunas = {
+            padrao: array(
+                "d",
+                (_valor_cub(item.get(padrao)) for item in itens),
+            )
+            for padrao in PADROES_CUB
+        }
+        # Indices com valor, por padrao (ordenados, para bisect).
+        self.conhecidos = {
+            padrao: [i for i, v in enumerate(coluna) if v > 0]
+            for padrao, coluna in self.colunas.items()
+        }
+        # Procedencia por valor (manual, importado, interpolado); itens
+        # sem o campo sao os mantidos a mao.
+        self.origens = {
+            padrao: [
+                (item.get("origem") or {}).get(padrao, "manual")
+                for item in itens
+            ]
+            for padrao in PADROES_CUB
         }
+        self.cidade = base.get("cidade", _CIDADE_PADRAO)
+        self.fonte = base.get("fonte", _FONTE_PADRAO)
+
+    def __len__(self):
+        return len(self.competencias)
+
+    def posicao(self, competencia):
+        """
+        Indice da ultima competencia <= a pedida; sem nenhuma anterior,
+        a mais recente da serie.
+        """
+        i = bisect_right(self.competencias, competencia) - 1
+        return i if i >= 0 else len(self.competencias) - 1
+
+    def valores(self, competencias, padroes):
+        """
+        Consulta em lote: pares (competencia, padrao) -> lista de
+        (valor, competencia aplicada, origem). Um escalar em qualquer dos
+        lados vale para todos os itens do outro.
+        """
+        if isinstance(competencias, str):
+            competencias = [competencias] * (
+                1 if isinstance(padroes, str) else len(padroes)
+            )
+        if isinstance(padroes, str):
+            padroes = [padroes] * len(competencias)
+        if not self.competencias:
+            return [(0.0, "", "") for _ in competencias]
+
+        cache = {}
+        resultado = []
+        for competencia, padrao in zip(competencias, padroes):
+            i = cache.get(competencia)
+            if i is None:
+                i = cache[competencia] = self.posicao(competencia)
+            padrao = _normalizar_padrao(padrao)
+            # Ultimo valor conhecido do padrao ate a posicao; sem nenhum,
+            # o padrao nao tem base.
+            conhecidos = self.conhecidos[padrao]
+            k = bisect_right(conhecidos, i) - 1
+            if k < 0:
+                resultado.append((0.0, "", ""))
+                continue
+            j = conhecidos[k]
+            resultado.append(
+                (
+                    self.colunas[padrao][j],
+                    self.competencias[j],
+                    self.origens[padrao][j],
+                )
+            )
+        return resultado
+
+
+class CatalogoCub:
+    """
+    Serie de CUB por processo, relida quando mtime ou tamanho do JSON
+    mudam. Arquivo ausente ou invalido vira serie vazia.
+    """
 
-    candidatos = [
-        item for item in serie
-        if item.get("competencia", "") <= comp
-    ]
-    registro = candidatos[-1] if candidatos else serie[-1]
-    valor = float(registro.get(alvo_padrao, 0) or 0)
+    def __init__(self, caminho):
+        self._caminho = Path(caminho)
+        self._lock = threading.Lock()
+        self._assinatura = None
+        self._serie = None
+
+    def _assinatura_atual(self):
+        try:
+            stat = self._caminho.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def serie(self):
+        assinatura = self._assinatura_atual()
+        serie = self._serie
+        if serie is not None and assinatura == self._assinatura:
+            return serie
+
+        with self._lock:
+            if self._serie is None or assinatura != self._assinatura:
+                try:
+                    base = json.loads(self._caminho.read_text(encoding="utf-8"))
+                    self._serie = SerieCub(base)
+                except Exception:
+                    self._serie = SerieCub({})
+                self._assinatura = assinatura
+            return self._serie
+
+
+_CATALOGO = CatalogoCub(_CUB_PATH)
+
+
+def obter_serie_cub():
+    return _CATALOGO.serie()
 
+
+def versao_cub():
+    """
+    Identifica a base de CUB em uso (arquivo + competencia de referencia),
+    para chaves de cache.
+    """
+    try:
+        stat = _CUB_PATH.stat()
+        arquivo = f"{stat.st_mtime_ns}-{stat.st_size}"
+    except OSError:
+        arquivo = "sem_base"
+    return f"{arquivo}:{_competencia_referencia()}"
+
+
+def _montar_resultado(serie, valor, padrao, competencia, origem):
     return {
         "valor": valor,
-        "padrao": alvo_padrao,
-        "competencia": registro.get("competencia", ""),
-        "competencia_br": _formatar_competencia_br(
-            registro.get("competencia", "")
-        ),
-        "cidade": base.get("cidade", "Cuiaba-MT"),
-        "fonte": base.get("fonte", "Base referencial Lokao"),
-        "metodo": "serie_mensal",
+        "padrao": padrao,
+        "competencia": competencia,
+        "competencia_br": _formatar_competencia_br(competencia),
+        "cidade": serie.cidade,
+        "fonte": serie.fonte,
+        "metodo": "serie_mensal" if competencia else "sem_base",
+        "origem": origem,
     }
+
+
+def obter_cub_cuiaba(padrao, competencia=None):
+    """
+    Retorna CUB referencia por competencia e padrao.
+    Se nao houver a competencia solicitada, usa a ultima disponivel.
+    """
+    alvo_padrao = _normalizar_padrao(padrao)
+    serie = obter_serie_cub()
+    comp = competencia or _competencia_referencia()
+    ((valor, aplicada, origem),) = serie.valores(comp, alvo_padrao)
+    return _montar_resultado(serie, valor, alvo_padrao, aplicada, origem)
+
+
+def obter_cub_lote(padroes, competencias=None):
+    """
+    Varias consultas de uma vez (mesmo formato de obter_cub_cuiaba).
+    Sem competencias, usa a competencia de referencia para todas.
+    """
+    padroes = [_normalizar_padrao(p) for p in padroes]
+    serie = obter_serie_cub()
+    if competencias is None:
+        competencias = _competencia_referencia()
+    return [
+        _montar_resultado(serie, valor, padrao, aplicada, origem)
+        for (valor, aplicada, origem), padrao in zip(
+            serie.valores(competencias, padroes),
+            padroes,
+        )
+    ]
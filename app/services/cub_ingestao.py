@@ -0,0 +1,410 @@
+import csv
+import io
+import json
+import os
+import re
+import shutil
+import subprocess
+import unicodedata
+from bisect import bisect_left
+from datetime import datetime
+from pathlib import Path
+
+from app.services.cub import _CUB_PATH, PADROES_CUB
+
+
+# Projetos-padrao da NBR 12721 usados como referencia de cada padrao:
+# residencial unifamiliar baixo (R1-B), normal (R1-N) e alto (R1-A).
+_ROTULOS_PADRAO = {
+    "economico": "economico",
+    "baixo": "economico",
+    "r1-b": "economico",
+    "r1b": "economico",
+    "medio": "medio",
+    "normal": "medio",
+    "r1-n": "medio",
+    "r1n": "medio",
+    "alto": "alto",
+    "r1-a": "alto",
+    "r1a": "alto",
+}
+_ROTULOS_COMPETENCIA = {"competencia", "mes", "mes_referencia", "referencia"}
+
+_MESES = {
+    "jan": 1, "fev": 2, "mar": 3, "abr": 4, "mai": 5, "jun": 6,
+    "jul": 7, "ago": 8, "set": 9, "out": 10, "nov": 11, "dez": 12,
+}
+
+# Faixa plausivel de CUB em R$/m2 e maior variacao mensal aceita sem aviso.
+VALOR_MINIMO = 500.0
+VALOR_MAXIMO = 30000.0
+VARIACAO_ALERTA = 0.15
+
+ORIGEM_MANUAL = "manual"
+ORIGEM_IMPORTADO = "importado"
+ORIGEM_INTERPOLADO = "interpolado"
+
+_RE_COMPETENCIA_ISO = re.compile(r"\b(\d{4})-(\d{1,2})\b")
+_RE_COMPETENCIA_BR = re.compile(r"\b(\d{1,2})/(\d{4})\b")
+_RE_COMPETENCIA_NOME = re.compile(
+    r"\b(jan|fev|mar|abr|mai|jun|jul|ago|set|out|nov|dez)[a-z]*"
+    r"\s*(?:/|de|-)?\s*(\d{4})\b"
+)
+_RE_NUMERO = re.compile(r"\d{1,3}(?:\.\d{3})*,\d{2}|\d+(?:[.,]\d+)?")
+_RE_LINHA_PROJETO = re.compile(r"\b(r1\s*-?\s*[bna])\b")
+
+
+def _normalizar(texto):
+    texto = unicodedata.normalize("NFKD", str(texto or ""))
+    texto = "".join(ch for ch in texto if not unicodedata.combining(ch))
+    return texto.strip().lower()
+
+
+def _rotulo_padrao(texto):
+    return _ROTULOS_PADRAO.get(re.sub(r"\s+", "", _normalizar(texto)))
+
+
+def parse_competencia(texto):
+    """
+    "2026-01", "01/2026", "jan/2026" ou "Janeiro de 2026" -> "2026-01".
+    """
+    txt = _normalizar(texto)
+    for regex, ordem in (
+        (_RE_COMPETENCIA_ISO, (1, 2)),
+        (_RE_COMPETENCIA_BR, (2, 1)),
+    ):
+        achado = regex.search(txt)
+        if achado:
+            ano, mes = int(achado.group(ordem[0])), int(achado.group(ordem[1]))
+            if 1 <= mes <= 12:
+                return f"{ano:04d}-{mes:02d}"
+    achado = _RE_COMPETENCIA_NOME.search(txt)
+    if achado:
+        return f"{int(achado.group(2)):04d}-{_MESES[achado.group(1)]:02d}"
+    return None
+
+
+def parse_valor(texto):
+    """
+    "2.340,55", "2340,55" ou "2340.55" -> 2340.55 (None se nao numerico).
+    """
+    if isinstance(texto, (int, float)):
+        return float(texto)
+    txt = str(texto or "").replace("R$", "").strip()
+    if not txt:
+        return None
+    if "," in txt:
+        txt = txt.replace(".", "").replace(",", ".")
+    try:
+        return float(txt)
+    except ValueError:
+        return None
+
+
+def _registros_tabela(linhas):
+    """
+    Linhas de planilha (lista de celulas) -> {competencia: {padrao: valor}}.
+    Aceita o formato largo (competencia + uma coluna por padrao/projeto)
+    e o longo (competencia, padrao, valor).
+    """
+    linhas = [list(l) for l in linhas if any(str(c or "").strip() for c in l)]
+    if not linhas:
+        return {}
+    cabecalho = [_normalizar(c) for c in linhas[0]]
+    try:
+        col_comp = next(
+            i for i, c in enumerate(cabecalho) if c in _ROTULOS_COMPETENCIA
+        )
+    except StopIteration as exc:
+        raise ValueError("coluna de competencia nao encontrada") from exc
+
+    registros = {}
+    colunas_padrao = {
+        i: _rotulo_padrao(c) for i, c in enumerate(cabecalho) if _rotulo_padrao(c)
+    }
+    if colunas_padrao:
+        for linha in linhas[1:]:
+            comp = parse_competencia(linha[col_comp])
+            if comp is None:
+                continue
+            for i, padrao in colunas_padrao.items():
+                valor = parse_valor(linha[i]) if i < len(linha) else None
+                if valor is not None:
+                    registros.setdefault(comp, {})[padrao] = valor
+        return registros
+
+    if "padrao" in cabecalho and "valor" in cabecalho:
+        col_padrao = cabecalho.index("padrao")
+        col_valor = cabecalho.index("valor")
+        for linha in linhas[1:]:
+            comp = parse_competencia(linha[col_comp])
+            padrao = _rotulo_padrao(linha[col_padrao])
+            valor = parse_valor(linha[col_valor])
+            if comp and padrao and valor is not None:
+                registros.setdefault(comp, {})[padrao] = valor
+        return registros
+
+    raise ValueError("colunas de padrao (economico/medio/alto ou R1-B/N/A) ausentes")
+
+
+def ler_csv(conteudo):
+    texto = conteudo.decode("utf-8-sig", errors="replace")
+    try:
+        dialeto = csv.Sniffer().sniff(texto[:4096], delimiters=";,\t")
+    except csv.Error:
+        dialeto = csv.excel
+    return _registros_tabela(csv.reader(io.StringIO(texto), dialeto))
+
+
+def ler_xlsx(caminho):
+    """
+    Primeira planilha do arquivo. Requer openpyxl (opcional).
+    """
+    try:
+        from openpyxl import load_workbook
+    except ImportError as exc:
+        raise ValueError(
+            "leitura de .xlsx requer openpyxl (pip install openpyxl)"
+        ) from exc
+    livro = load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        return _registros_tabela(livro.worksheets[0].iter_rows(values_only=True))
+    finally:
+        livro.close()
+
+
+def ler_texto(texto):
+    """
+    Texto extraido do PDF do SINDUSCON: a competencia vem do cabecalho e
+    os valores das linhas R1-B, R1-N e R1-A (ultimo numero da linha, o
+    custo por m2).
+    """
+    competencia = None
+    competencia_rotulada = None
+    valores = {}
+    for linha in texto.splitlines():
+        normalizada = _normalizar(linha)
+        achada = parse_competencia(normalizada)
+        if achada and competencia is None:
+            competencia = achada
+        # Datas de emissao tambem casam; prefere a linha que fala da
+        # competencia/mes de referencia.
+        if achada and competencia_rotulada is None and (
+            "refer" in normalizada or "competencia" in normalizada
+        ):
+            competencia_rotulada = achada
+        projeto = _RE_LINHA_PROJETO.search(normalizada)
+        if not projeto:
+            continue
+        padrao = _rotulo_padrao(projeto.group(1))
+        resto = normalizada[projeto.end():]
+        numeros = [parse_valor(n) for n in _RE_NUMERO.findall(resto)]
+        numeros = [n for n in numeros if n is not None and n >= VALOR_MINIMO]
+        if padrao and numeros and padrao not in valores:
+            valores[padrao] = numeros[-1]
+    competencia = competencia_rotulada or competencia
+    if competencia is None:
+        raise ValueError("competencia nao encontrada no texto")
+    if not valores:
+        raise ValueError("linhas R1-B/R1-N/R1-A nao encontradas no texto")
+    return {competencia: valores}
+
+
+def ler_pdf(caminho):
+    """
+    Extrai o texto com o utilitario pdftotext (poppler), se instalado.
+    """
+    executavel = shutil.which("pdftotext")
+    if executavel is None:
+        raise ValueError(
+            "leitura de .pdf requer pdftotext; exporte o texto para .txt"
+        )
+    try:
+        saida = subprocess.run(
+            [executavel, "-layout", str(caminho), "-"],
+            capture_output=True,
+            check=True,
+            timeout=60,
+        )
+    except subprocess.SubprocessError as exc:
+        raise ValueError(f"pdftotext falhou: {exc}") from exc
+    return ler_texto(saida.stdout.decode("utf-8", errors="replace"))
+
+
+def ler_tabela_cub(caminho):
+    """
+    {competencia: {padrao: valor}} a partir de CSV, XLSX, PDF ou texto.
+    """
+    caminho = Path(caminho)
+    sufixo = caminho.suffix.lower()
+    if sufixo == ".csv":
+        return ler_csv(caminho.read_bytes())
+    if sufixo in {".xlsx", ".xlsm"}:
+        return ler_xlsx(caminho)
+    if sufixo == ".pdf":
+        return ler_pdf(caminho)
+    if sufixo in {".txt", ".text"}:
+        return ler_texto(caminho.read_text(encoding="utf-8", errors="replace"))
+    raise ValueError(f"formato nao suportado: {caminho.name}")
+
+
+def _indice_mes(competencia):
+    ano, mes = competencia.split("-")
+    return int(ano) * 12 + int(mes) - 1
+
+
+def _competencia_de_indice(indice):
+    return f"{indice // 12:04d}-{indice % 12 + 1:02d}"
+
+
+def validar_registros(registros):
+    """
+    Levanta ValueError para valores fora da faixa plausivel; devolve
+    avisos para variacoes mensais acima de VARIACAO_ALERTA.
+    """
+    avisos = []
+    anteriores = {}
+    for comp in sorted(registros):
+        for padrao, valor in registros[comp].items():
+            if not VALOR_MINIMO <= valor <= VALOR_MAXIMO:
+                raise ValueError(f"{comp} {padrao}: valor fora da faixa ({valor})")
+            anterior = anteriores.get(padrao)
+            if anterior and abs(valor / anterior - 1) > VARIACAO_ALERTA:
+                avisos.append(
+                    f"{comp} {padrao}: variacao de "
+                    f"{(valor / anterior - 1) * 100:.1f}% sobre o dado anterior"
+                )
+            anteriores[padrao] = valor
+    return avisos
+
+
+def mesclar_serie(base, registros, fonte=None):
+    """
+    Junta os registros importados a serie atual (importado prevalece) e
+    preenche competencias faltantes por interpolacao linear entre os
+    vizinhos de cada padrao. Cada item ganha "origem" por padrao:
+    manual, importado ou interpolado.
+
+    A serie gravada vai so da primeira a ultima competencia em que todos
+    os padroes tem dado, para todo item ter os tres valores; competencias
+    fora disso ficam em nova["descartadas"] (removido antes de gravar).
+    Levanta ValueError se nao houver competencia comum.
+    """
+    conhecidos = {padrao: {} for padrao in PADROES_CUB}
+    for item in base.get("series", []):
+        comp = parse_competencia(item.get("competencia", ""))
+        if comp is None:
+            continue
+        origens = item.get("origem") or {}
+        for padrao in PADROES_CUB:
+            valor = parse_valor(item.get(padrao))
+            origem = origens.get(padrao, ORIGEM_MANUAL)
+            if valor and origem != ORIGEM_INTERPOLADO:
+                conhecidos[padrao][_indice_mes(comp)] = (valor, origem)
+    for comp, valores in registros.items():
+        for padrao, valor in valores.items():
+            conhecidos[padrao][_indice_mes(comp)] = (valor, ORIGEM_IMPORTADO)
+
+    indices = {i for serie in conhecidos.values() for i in serie}
+    if not indices:
+        raise ValueError("serie vazia apos a importacao")
+    faltando = [padrao for padrao, serie in conhecidos.items() if not serie]
+    if faltando:
+        raise ValueError(f"sem nenhum valor para: {', '.join(faltando)}")
+    inicio = max(min(serie) for serie in conhecidos.values())
+    fim = min(max(serie) for serie in conhecidos.values())
+    if inicio > fim:
+        raise ValueError("nenhuma competencia com os tres padroes")
+
+    ordenados = {padrao: sorted(serie) for padrao, serie in conhecidos.items()}
+    itens = []
+    for indice in range(inicio, fim + 1):
+        item = {"competencia": _competencia_de_indice(indice)}
+        origens = {}
+        for padrao, serie in conhecidos.items():
+            if indice in serie:
+                valor, origem = serie[indice]
+            else:
+                chaves = ordenados[padrao]
+                posicao = bisect_left(chaves, indice)
+                a, d = chaves[posicao - 1], chaves[posicao]
+                peso = (indice - a) / (d - a)
+                valor = serie[a][0] + (serie[d][0] - serie[a][0]) * peso
+                origem = ORIGEM_INTERPOLADO
+            item[padrao] = round(valor, 2)
+            origens[padrao] = origem
+        item["origem"] = origens
+        itens.append(item)
+
+    nova = dict(base)
+    nova["series"] = itens
+    nova["descartadas"] = [
+        _competencia_de_indice(i)
+        for i in sorted(indices)
+        if not inicio <= i <= fim
+    ]
+    if fonte:
+        nova["fonte"] = fonte
+    nova["atualizado_em"] = datetime.now().isoformat(timespec="seconds")
+    return nova
+
+
+def gravar_serie(base, destino=_CUB_PATH):
+    """
+    Escrita atomica (arquivo temporario + replace): os workers veem a
+    versao anterior ou a nova inteira, e a recarregam pelo mtime.
+    """
+    destino = Path(destino)
+    tmp = destino.with_name(f"{destino.name}.{os.getpid()}.tmp")
+    tmp.write_text(
+        json.dumps(base, ensure_ascii=False, indent=2) + "\n",
+        encoding="utf-8",
+    )
+    tmp.replace(destino)
+    return destino
+
+
+def importar_cub(caminhos, destino=_CUB_PATH, fonte=None):
+    """
+    Le as tabelas, valida, mescla com a serie atual e grava.
+    Retorna um resumo (competencias importadas, interpoladas e avisos).
+    """
+    registros = {}
+    for caminho in caminhos:
+        for comp, valores in ler_tabela_cub(caminho).items():
+            registros.setdefault(comp, {}).update(valores)
+    if not registros:
+        raise ValueError("nenhum valor de CUB encontrado nos arquivos")
+
+    destino = Path(destino)
+    try:
+        base = json.loads(destino.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        base = {"cidade": "Cuiaba-MT", "series": []}
+
+    nova = mesclar_serie(base, registros, fonte=fonte)
+    descartadas = nova.pop("descartadas")
+    avisos = validar_registros(
+        {
+            item["competencia"]: {
+                p: item[p] for p in PADROES_CUB if p in item
+            }
+            for item in nova["series"]
+        }
+    )
+    gravar_serie(nova, destino)
+    interpoladas = sorted(
+        {
+            item["competencia"]
+            for item in nova["series"]
+            if ORIGEM_INTERPOLADO in item["origem"].values()
+        }
+    )
+    return {
+        "destino": str(destino),
+        "importadas": sorted(registros),
+        "interpoladas": interpoladas,
+        "competencias": len(nova["series"]),
+        "descartadas": descartadas,
+        "avisos": avisos,
+    }
@@ -0,0 +1,100 @@
+import queue
+import threading
+
+
+class FilaAtualizacao:
+    """
+    Fila limitada de tarefas em segundo plano, por processo (worker).
+    Cada chave fica na fila no maximo uma vez: pedidos repetidos enquanto
+    ela aguarda ou executa sao descartados, assim como pedidos com a
+    fila cheia. As threads sao criadas no primeiro agendamento (depois do
+    fork do gunicorn) e sao daemon.
+    """
+
+    def __init__(self, max_itens=64, threads=1, nome="fila"):
+        self.max_itens = max(1, int(max_itens))
+        self.threads = max(1, int(threads))
+        self.nome = nome
+        self._fila = queue.Queue(maxsize=self.max_itens)
+        self._lock = threading.Lock()
+        self._pendentes = set()
+        self._trabalhadores = []
+        self._agendados = 0
+        self._duplicados = 0
+        self._recusados = 0
+        self._concluidos = 0
+        self._falhas = 0
+
+    def _iniciar(self):
+        vivos = [t for t in self._trabalhadores if t.is_alive()]
+        for i in range(len(vivos), self.threads):
+            trabalhador = threading.Thread(
+                target=self._executar,
+                name=f"{self.nome}-{i}",
+                daemon=True,
+            )
+            trabalhador.start()
+            vivos.append(trabalhador)
+        self._trabalhadores = vivos
+
+    def agendar(self, chave, tarefa, *args, **kwargs):
+        """
+        Enfileira tarefa(*args, **kwargs) sem bloquear. Retorna False se a
+        chave ja estiver pendente ou se a fila estiver cheia.
+        """
+        with self._lock:
+            if chave in self._pendentes:
+                self._duplicados += 1
+                return False
+            try:
+                self._fila.put_nowait((chave, tarefa, args, kwargs))
+            except queue.Full:
+                self._recusados += 1
+                return False
+            self._pendentes.add(chave)
+            self._agendados += 1
+            self._iniciar()
+        return True
+
+    def pendente(self, chave):
+        with self._lock:
+            return chave in self._pendentes
+
+    def _executar(self):
+        while True:
+            chave, tarefa, args, kwargs = self._fila.get()
+            # SystemExit/KeyboardInterrupt passam direto (a thread morre e
+            # e recriada no proximo agendamento), mas a chave e liberada.
+            falhou = True
+            try:
+                tarefa(*args, **kwargs)
+                falhou = False
+            except Exception:
+                pass
+            finally:
+                with self._lock:
+                    self._pendentes.discard(chave)
+                    if falhou:
+                        self._falhas += 1
+                    else:
+                        self._concluidos += 1
+                self._fila.task_done()
+
+    def aguardar(self):
+        """
+        Bloqueia ate a fila esvaziar (scripts e manutencao).
+        """
+        self._fila.join()
+
+    def estatisticas(self):
+        with self._lock:
+            return {
+                "pendentes": len(self._pendentes),
+                "max_itens": self.max_itens,
+                "threads": self.threads,
+                "agendados": self._agendados,
+                "duplicados": self._duplicados,
+                "recusados": self._recusados,
+                "concluidos": self._concluidos,
+                "falhas": self._falhas,
+            }
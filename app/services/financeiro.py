@@ -1,5 +1,13 @@
 ﻿# app/services/financeiro.py
 
+from app.services.amortizacao import (
+    TAXAS_REFERENCIA,
+    limitar_prazo,
+    resumir_cronogramas,
+)
+from app.services.cet import PRAZOS_PADRAO, comparar_bancos
+from app.services.simulacao_estresse import simular_estresse
+
 
 def _to_float(valor):
     try:
@@ -14,39 +22,133 @@ def _safe_div(numerador, denominador):
     return numerador / denominador
 
 
+# Entrada minima exigida no financiamento (fracao do valor do imovel).
+ENTRADA_MINIMA = 0.2
+
+# Premissas dos cenarios de desembolso: percentuais sobre o valor do
+# imovel (compra) ou sobre o custo da obra (construcao); tarifas bancarias
+# em reais, com e sem financiamento.
+CENARIOS_COMPRA = {
+    "Conservador": {
+        "itbi": 0.020,
+        "cartorio": 0.008,
+        "bancario": (2500, 800),
+        "adequacoes": 0.020,
+        "reserva": 0.040,
+    },
+    "Base": {
+        "itbi": 0.025,
+        "cartorio": 0.011,
+        "bancario": (4500, 1200),
+        "adequacoes": 0.050,
+        "reserva": 0.060,
+    },
+    "Estressado": {
+        "itbi": 0.030,
+        "cartorio": 0.015,
+        "bancario": (7000, 1800),
+        "adequacoes": 0.080,
+        "reserva": 0.100,
+    },
+}
+
+CENARIOS_CONSTRUCAO = {
+    "Conservador": {
+        "projetos": 0.040,
+        "aprovacoes": 0.010,
+        "infraestrutura": 0.070,
+        "contingencia": 0.080,
+    },
+    "Base": {
+        "projetos": 0.060,
+        "aprovacoes": 0.015,
+        "infraestrutura": 0.100,
+        "contingencia": 0.120,
+    },
+    "Estressado": {
+        "projetos": 0.080,
+        "aprovacoes": 0.020,
+        "infraestrutura": 0.130,
+        "contingencia": 0.180,
+    },
+}
+
+# Referencias de custo/m2 por metodologia construtiva: fator sobre o CUB
+# (alvenaria convencional) e piso por padrao para o steel frame.
+CUB_PADRAO_AUSENTE = 3000.0
+STEEL_FRAME_PISO = {
+    "economico": 2951.0,
+    "medio": 4368.0,
+    "alto": 5904.0,
+}
+METODOLOGIAS = (
+    {
+        "metodologia": "Alvenaria convencional",
+        "fator_cub": 1.0,
+        "faixa_prazo": "8 a 14 meses",
+        "fonte_preco": "Base Lokáo (referencia CUB/SINAPI)",
+    },
+    {
+        "metodologia": "Alvenaria estrutural",
+        "fator_cub": 0.92,
+        "faixa_prazo": "7 a 12 meses",
+        "fonte_preco": "Base Lokáo (ganho de racionalizacao)",
+    },
+    {
+        "metodologia": "Steel Frame",
+        "fator_cub": 1.18,
+        "faixa_prazo": "5 a 9 meses",
+        "fonte_preco": "Benchmark setorial (Centro-Oeste)",
+    },
+    {
+        "metodologia": "Painel EPS (isopor) + concreto",
+        "fator_cub": 1.06,
+        "faixa_prazo": "6 a 10 meses",
+        "fonte_preco": "Base Lokáo (mercado regional)",
+    },
+)
+
+
+def _sistema(sistema):
+    return "PRICE" if str(sistema or "").strip().upper() == "PRICE" else "SAC"
+
+
+def tarifa_bancaria(premissa, financiar):
+    com_financiamento, sem_financiamento = premissa["bancario"]
+    return com_financiamento if financiar else sem_financiamento
+
+
+def custo_m2_metodologia(cub, padrao):
+    """
+    Custo/m2 estimado por metodologia construtiva a partir do CUB.
+    """
+    padrao_txt = str(padrao or "").strip().lower()
+    convencional = cub if cub > 0 else CUB_PADRAO_AUSENTE
+    linhas = []
+    for item in METODOLOGIAS:
+        m2 = convencional * item["fator_cub"]
+        if item["metodologia"] == "Steel Frame":
+            m2 = max(m2, STEEL_FRAME_PISO.get(padrao_txt, 4368.0))
+        linhas.append(
+            {
+                "metodologia": item["metodologia"],
+                "m2": m2,
+                "faixa_prazo": item["faixa_prazo"],
+                "fonte_preco": item["fonte_preco"],
+            }
+        )
+    return linhas
+
+
 def _calcular_cenarios_compra(valor_imovel, financiar):
     if valor_imovel <= 0:
         return []
 
-    cenarios = {
-        "Conservador": {
-            "itbi": 0.020,
-            "cartorio": 0.008,
-            "bancario": 2500 if financiar else 800,
-            "adequacoes": 0.020,
-            "reserva": 0.040,
-        },
-        "Base": {
-            "itbi": 0.025,
-            "cartorio": 0.011,
-            "bancario": 4500 if financiar else 1200,
-            "adequacoes": 0.050,
-            "reserva": 0.060,
-        },
-        "Estressado": {
-            "itbi": 0.030,
-            "cartorio": 0.015,
-            "bancario": 7000 if financiar else 1800,
-            "adequacoes": 0.080,
-            "reserva": 0.100,
-        },
-    }
-
     projecoes = []
-    for nome, premissa in cenarios.items():
+    for nome, premissa in CENARIOS_COMPRA.items():
         itbi = valor_imovel * premissa["itbi"]
         cartorio = valor_imovel * premissa["cartorio"]
-        bancario = premissa["bancario"]
+        bancario = tarifa_bancaria(premissa, financiar)
         adequacoes = valor_imovel * premissa["adequacoes"]
         reserva = valor_imovel * premissa["reserva"]
         total = (
@@ -71,29 +173,8 @@ def _calcular_cenarios_construcao(custo_obra):
     if custo_obra <= 0:
         return []
 
-    cenarios = {
-        "Conservador": {
-            "projetos": 0.040,
-            "aprovacoes": 0.010,
-            "infraestrutura": 0.070,
-            "contingencia": 0.080,
-        },
-        "Base": {
-            "projetos": 0.060,
-            "aprovacoes": 0.015,
-            "infraestrutura": 0.100,
-            "contingencia": 0.120,
-        },
-        "Estressado": {
-            "projetos": 0.080,
-            "aprovacoes": 0.020,
-            "infraestrutura": 0.130,
-            "contingencia": 0.180,
-        },
-    }
-
     projecoes = []
-    for nome, premissa in cenarios.items():
+    for nome, premissa in CENARIOS_CONSTRUCAO.items():
         projetos = custo_obra * premissa["projetos"]
         aprovacoes = custo_obra * premissa["aprovacoes"]
         infraestrutura = custo_obra * premissa["infraestrutura"]
@@ -126,7 +207,7 @@ def analisar_financeiro(**kwargs) -> dict:
     valor_m2 = _to_float(kwargs.get("valor_m2"))
     renda = _to_float(kwargs.get("renda"))
     financiar = bool(kwargs.get("financiar", False))
-    prazo_meses = int(_to_float(kwargs.get("prazo_meses", 360))) or 360
+    prazo_meses = limitar_prazo(kwargs.get("prazo_meses", 360))
 
     resultado = {
         "orcamento": orcamento,
@@ -158,17 +239,50 @@ def analisar_financeiro(**kwargs) -> dict:
             )
 
     if financiar and valor_imovel > 0:
-        entrada_minima = valor_imovel * 0.2
+        entrada_minima = valor_imovel * ENTRADA_MINIMA
         saldo_financiado = valor_imovel - entrada_minima
-        parcela_estimada = saldo_financiado / max(1, prazo_meses)
+        taxas = tuple(kwargs.get("taxas_anuais") or TAXAS_REFERENCIA)
+        amortizacao = resumir_cronogramas(
+            saldo_financiado,
+            taxas,
+            [prazo_meses],
+            renda=renda,
+        )
+        # Parcela de referencia: primeira parcela (a maior no SAC) do
+        # sistema escolhido, na taxa intermediaria da tabela.
+        sistema = _sistema(kwargs.get("sistema"))
+        taxa = float(taxas[len(taxas) // 2])
+        referencia = next(
+            linha
+            for linha in amortizacao
+            if linha["sistema"] == sistema and linha["taxa_anual"] == taxa
+        )
+        parcela_estimada = referencia["primeira_parcela"]
         comprometimento = _safe_div(parcela_estimada, renda) * 100
         resultado.update(
             {
                 "entrada_minima_estimada": entrada_minima,
-                "parcela_estimada_360m": parcela_estimada,
+                "parcela_estimada": parcela_estimada,
+                "parcela_sistema": sistema,
+                "parcela_taxa_anual": taxa,
                 "comprometimento_renda_estimado": comprometimento,
+                "amortizacao": amortizacao,
             }
         )
+        resultado["bancos"] = comparar_bancos(
+            saldo_financiado,
+            valor_imovel=valor_imovel,
+            renda=renda,
+            prazos=sorted(set(PRAZOS_PADRAO) | {prazo_meses}),
+            limite=8,
+        )
+        if kwargs.get("simular_estresse"):
+            resultado["estresse"] = simular_estresse(
+                saldo_financiado,
+                renda=renda,
+                prazo_meses=prazo_meses,
+                sistema=kwargs.get("sistema"),
+            )
         resultado["mensagens"].append(
             "Simulacao simplificada: use como referencia inicial, "
             "nao como proposta bancaria."
@@ -1,5 +1,11 @@
+import hashlib
+import os
 from pathlib import Path
-import unicodedata
+
+
+# Maximo de PNGs gerados mantidos em static/; acima disso os usados ha
+# mais tempo (mtime) sao apagados e recriados se voltarem a ser pedidos.
+MAX_GRAFICOS = int(os.getenv("LOKAO_MAX_GRAFICOS", "500"))
 
 
 def _plt():
@@ -9,16 +15,6 @@ def _plt():
     return plt
 
 
-def _slug(texto):
-    texto = str(texto or "grafico").strip().lower()
-    texto = "".join(
-        c for c in unicodedata.normalize("NFKD", texto)
-        if not unicodedata.combining(c)
-    )
-    texto = "_".join(texto.split())
-    return "".join(c for c in texto if c.isalnum() or c == "_") or "grafico"
-
-
 def _patch():
     from matplotlib.patches import Patch
     return Patch
@@ -31,10 +27,61 @@ def _static_dir():
     return static_dir
 
 
+def _nome_por_conteudo(tipo, *valores):
+    """
+    Nome do PNG derivado dos dados do grafico: mesmos dados, mesmo arquivo.
+    """
+    digest = hashlib.sha256(repr((tipo, *valores)).encode("utf-8")).hexdigest()
+    return f"grafico_{tipo}_{digest[:20]}.png"
+
+
+def _reaproveitar(caminho):
+    """
+    True se o PNG ja existe; renova o mtime para a limpeza tratar como
+    usado agora.
+    """
+    try:
+        os.utime(caminho)
+    except OSError:
+        return False
+    return True
+
+
+def _limpar_graficos(static_dir, maximo=None):
+    """
+    Mantem no maximo `maximo` (padrao MAX_GRAFICOS) graficos, apagando os
+    de mtime mais antigo.
+    """
+    maximo = MAX_GRAFICOS if maximo is None else maximo
+    arquivos = []
+    for caminho in static_dir.glob("grafico_*.png"):
+        try:
+            arquivos.append((caminho.stat().st_mtime, caminho))
+        except OSError:
+            continue
+    if len(arquivos) <= maximo:
+        return
+    arquivos.sort()
+    for _, caminho in arquivos[: len(arquivos) - maximo]:
+        caminho.unlink(missing_ok=True)
+
+
+def _salvar_figura(plt, fig, caminho, **kwargs):
+    tmp = caminho.with_name(f"{caminho.name}.{os.getpid()}.tmp")
+    try:
+        fig.savefig(tmp, format="png", **kwargs)
+        tmp.replace(caminho)
+    finally:
+        plt.close(fig)
+        tmp.unlink(missing_ok=True)
+    _limpar_graficos(caminho.parent)
+
+
 def gerar_grafico_score(**kwargs) -> str:
-    plt = _plt()
-    Patch = _patch()
-    bairro = kwargs.get("bairro", "bairro")
+    """
+    PNG com nome derivado do conteudo: se ja existe, nao renderiza de novo.
+    O total em static/ fica limitado a MAX_GRAFICOS (ver _limpar_graficos).
+    """
     score_bairro = kwargs.get("score") or kwargs.get("score_bairro") or 0
     media_cidade = kwargs.get("media_cidade", 55)
 
@@ -48,8 +95,13 @@ def gerar_grafico_score(**kwargs) -> str:
     except (TypeError, ValueError):
         media_cidade = 55
 
-    nome_arquivo = f"grafico_score_{_slug(bairro)}.png"
+    nome_arquivo = _nome_por_conteudo("score", score_bairro, media_cidade)
     caminho_completo = _static_dir() / nome_arquivo
+    if _reaproveitar(caminho_completo):
+        return f"/static/{nome_arquivo}"
+
+    plt = _plt()
+    Patch = _patch()
 
     labels = ["Bairro analisado", "Media da cidade"]
     valores = [score_bairro, media_cidade]
@@ -104,14 +156,11 @@ def gerar_grafico_score(**kwargs) -> str:
         )
 
     fig.tight_layout(rect=[0, 0, 0.86, 1])
-    fig.savefig(caminho_completo, dpi=140)
-    plt.close(fig)
+    _salvar_figura(plt, fig, caminho_completo, dpi=140)
     return f"/static/{nome_arquivo}"
 
 
 def gerar_grafico_financeiro(**kwargs) -> str:
-    plt = _plt()
-    bairro = kwargs.get("bairro", "bairro")
     orcamento = kwargs.get("orcamento", 0) or 0
     valor_imovel = kwargs.get("valor_imovel", 0) or 0
 
@@ -125,8 +174,12 @@ def gerar_grafico_financeiro(**kwargs) -> str:
     except (TypeError, ValueError):
         valor_imovel = 0
 
-    nome_arquivo = f"grafico_financeiro_{_slug(bairro)}.png"
+    nome_arquivo = _nome_por_conteudo("financeiro", orcamento, valor_imovel)
     caminho_completo = _static_dir() / nome_arquivo
+    if _reaproveitar(caminho_completo):
+        return f"/static/{nome_arquivo}"
+
+    plt = _plt()
 
     labels = ["Orcamento", "Valor do imovel"]
     valores = [orcamento, valor_imovel]
@@ -161,6 +214,5 @@ def gerar_grafico_financeiro(**kwargs) -> str:
         )
 
     fig.tight_layout()
-    fig.savefig(caminho_completo, dpi=140)
-    plt.close(fig)
+    _salvar_figura(plt, fig, caminho_completo, dpi=140)
     return f"/static/{nome_arquivo}"
@@ -0,0 +1,353 @@
+import unicodedata
+from collections import defaultdict
+
+from app.services.bairro_store import BairroStore
+from app.services.loader import obter_snapshot_bairros
+
+
+# Apelidos conhecidos (ja normalizados) -> nome oficial na base.
+ALIASES_BAIRROS = {
+    "alphaville": "Alphaville I e II",
+    "alphaville i": "Alphaville I e II",
+    "alphaville ii": "Alphaville I e II",
+    "alphaville 1": "Alphaville I e II",
+    "alphaville 2": "Alphaville I e II",
+    "cpa 1": "CPA I",
+    "cpa 2": "CPA II",
+    "cpa 3": "CPA III",
+    "pedra noventa": "Pedra 90",
+    "paiaguas": "Residencial Paiaguás",
+}
+
+# Abreviacoes comuns digitadas pelos usuarios.
+ABREVIACOES = {
+    "jd": "jardim",
+    "jdm": "jardim",
+    "res": "residencial",
+    "resid": "residencial",
+    "pq": "parque",
+    "vl": "vila",
+    "sta": "santa",
+    "sto": "santo",
+    "cj": "conjunto",
+    "conj": "conjunto",
+}
+
+_ROMANOS = {
+    "1": "i",
+    "2": "ii",
+    "3": "iii",
+    "4": "iv",
+    "5": "v",
+    "6": "vi",
+    "7": "vii",
+    "8": "viii",
+    "9": "ix",
+    "10": "x",
+}
+
+_NUMERAIS = set(_ROMANOS.values())
+
+SIMILARIDADE_MINIMA = 0.6
+# Diferenca minima entre o melhor e o segundo candidato para aceitar
+# a correcao automatica (evita escolher entre "Centro Norte"/"Centro Sul").
+MARGEM_AMBIGUIDADE = 0.05
+# Prefixo curto ("bos") so entra como sugestao; para corrigir sozinho, o
+# texto precisa ter ao menos estes caracteres ou ser uma palavra inteira.
+PREFIXO_MINIMO = 4
+
+
+def corrigir_mojibake(texto):
+    if not isinstance(texto, str):
+        return texto
+    try:
+        return texto.encode("latin1").decode("utf-8")
+    except Exception:
+        return texto
+
+
+def normalizar_nome_bairro(texto):
+    """
+    Chave de comparacao: corrige mojibake, remove acentos,
+    caixa baixa e espacos repetidos.
+    """
+    texto = corrigir_mojibake(str(texto or "")).strip().lower()
+    texto = "".join(
+        c for c in unicodedata.normalize("NFKD", texto)
+        if not unicodedata.combining(c)
+    )
+    return " ".join(texto.split())
+
+
+def chave_busca(texto):
+    """
+    Chave tolerante: alem da normalizacao, expande abreviacoes
+    ('jd' -> 'jardim') e numerais ('2' -> 'ii').
+    """
+    tokens = normalizar_nome_bairro(texto).replace(".", " ").split()
+    return " ".join(_ROMANOS.get(t, ABREVIACOES.get(t, t)) for t in tokens)
+
+
+def _trigramas(chave):
+    texto = f"  {chave} "
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+def _numerais(chave):
+    return {t for t in chave.split() if t in _NUMERAIS}
+
+
+def _prefixo_valido(chave, candidato, prefixo_minimo):
+    if not candidato.startswith(chave):
+        return False
+    if len(chave) >= prefixo_minimo:
+        return True
+    return len(candidato) == len(chave) or candidato[len(chave)] == " "
+
+
+def _levenshtein(a, b):
+    if len(a) < len(b):
+        a, b = b, a
+    anterior = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        atual = [i]
+        for j, cb in enumerate(b, 1):
+            atual.append(
+                min(
+                    anterior[j] + 1,
+                    atual[j - 1] + 1,
+                    anterior[j - 1] + (ca != cb),
+                )
+            )
+        anterior = atual
+    return anterior[-1]
+
+
+class IndiceTrigramas:
+    """
+    Indice invertido de trigramas de caracteres sobre nomes.
+    A consulta soma ocorrencias nas listas de postagem e so aplica
+    distancia de edicao numa lista curta de candidatos.
+    """
+
+    def __init__(self, entradas):
+        self._chaves = []
+        self._valores = []
+        self._tamanhos = []
+        self._postagens = defaultdict(list)
+        vistos = set()
+        for texto, valor in entradas:
+            chave = chave_busca(texto)
+            if not chave or (chave, valor) in vistos:
+                continue
+            vistos.add((chave, valor))
+            posicao = len(self._chaves)
+            trigramas = _trigramas(chave)
+            self._chaves.append(chave)
+            self._valores.append(valor)
+            self._tamanhos.append(len(trigramas))
+            for trigrama in trigramas:
+                self._postagens[trigrama].append(posicao)
+
+    def buscar(
+        self,
+        texto,
+        limite=5,
+        similaridade_minima=0.3,
+        prefixo_minimo=1,
+    ):
+        """
+        Retorna [(valor, similaridade)] em ordem decrescente. Candidato que
+        comeca com o texto conta como edicao perfeita se o texto tiver ao
+        menos prefixo_minimo caracteres ou for uma palavra inteira.
+        """
+        chave = chave_busca(texto)
+        if not chave:
+            return []
+        trigramas = _trigramas(chave)
+        numerais = _numerais(chave)
+        comuns = defaultdict(int)
+        for trigrama in trigramas:
+            for posicao in self._postagens.get(trigrama, ()):
+                comuns[posicao] += 1
+        if not comuns:
+            return []
+
+        dice = sorted(
+            (
+                (2 * total / (len(trigramas) + self._tamanhos[pos]), pos)
+                for pos, total in comuns.items()
+            ),
+            reverse=True,
+        )[: max(limite * 2, 5)]
+
+        resultado = {}
+        for similaridade_dice, pos in dice:
+            candidato = self._chaves[pos]
+            # "cpa 4" nao deve virar "CPA I": numerais precisam bater.
+            if numerais and not numerais <= _numerais(candidato):
+                continue
+            if _prefixo_valido(chave, candidato, prefixo_minimo):
+                similaridade_edicao = 1.0
+            else:
+                distancia = _levenshtein(chave, candidato)
+                similaridade_edicao = 1 - distancia / max(
+                    len(chave),
+                    len(candidato),
+                )
+            similaridade = round(
+                (similaridade_dice + similaridade_edicao) / 2,
+                4,
+            )
+            valor = self._valores[pos]
+            if similaridade < similaridade_minima:
+                continue
+            if similaridade > resultado.get(valor, -1):
+                resultado[valor] = similaridade
+
+        ordenado = sorted(
+            resultado.items(),
+            key=lambda item: (-item[1], item[0]),
+        )
+        return ordenado[:limite]
+
+    def melhor(self, texto, similaridade_minima=SIMILARIDADE_MINIMA):
+        """
+        Melhor candidato inequivoco ou None.
+        """
+        melhores = self.buscar(
+            texto,
+            limite=2,
+            similaridade_minima=similaridade_minima,
+            prefixo_minimo=PREFIXO_MINIMO,
+        )
+        if not melhores:
+            return None
+        if len(melhores) > 1 and (
+            melhores[0][1] - melhores[1][1] < MARGEM_AMBIGUIDADE
+        ):
+            return None
+        return melhores[0][0]
+
+
+class IndiceBairros:
+    """
+    Mapa nome normalizado/apelido -> registro do bairro.
+    Construido uma vez por versao da base; a busca e um acesso a dict.
+    """
+
+    def __init__(self, registros, aliases=None):
+        self.registros = {}
+        for registro in registros:
+            chave = normalizar_nome_bairro(registro.get("bairro"))
+            if chave and chave not in self.registros:
+                self.registros[chave] = registro
+
+        nomes = [
+            (registro.get("bairro"), registro.get("bairro"))
+            for registro in self.registros.values()
+        ]
+        for apelido, oficial in (aliases or {}).items():
+            chave = normalizar_nome_bairro(apelido)
+            registro = self.registros.get(normalizar_nome_bairro(oficial))
+            if registro is not None and chave not in self.registros:
+                self.registros[chave] = registro
+                nomes.append((apelido, registro.get("bairro")))
+
+        self._por_chave_busca = {}
+        for chave, registro in self.registros.items():
+            self._por_chave_busca.setdefault(chave_busca(chave), registro)
+        self._por_nome = {
+            registro.get("bairro"): registro
+            for registro in self.registros.values()
+        }
+        self.trigramas = IndiceTrigramas(nomes)
+
+    @classmethod
+    def de_dataframe(cls, df, aliases=None):
+        if df is None or "bairro" not in df.columns:
+            return cls([], aliases)
+        return cls(df.to_dict("records"), aliases)
+
+    def _exato(self, nome):
+        registro = self.registros.get(normalizar_nome_bairro(nome))
+        if registro is None:
+            registro = self._por_chave_busca.get(chave_busca(nome))
+        return registro
+
+    def _resolver(self, nome, similaridade_minima):
+        registro = self._exato(nome)
+        if registro is None:
+            nome_oficial = self.trigramas.melhor(nome, similaridade_minima)
+            registro = self._por_nome.get(nome_oficial)
+        return registro
+
+    def buscar(self, nome):
+        """
+        Retorna uma copia do registro do bairro ou None.
+        """
+        registro = self._exato(nome)
+        return dict(registro) if registro is not None else None
+
+    def resolver(self, nome, similaridade_minima=SIMILARIDADE_MINIMA):
+        """
+        Como buscar(), mas tolera erros de digitacao via trigramas.
+        """
+        registro = self._resolver(nome, similaridade_minima)
+        return dict(registro) if registro is not None else None
+
+    def nome_oficial(self, nome, similaridade_minima=SIMILARIDADE_MINIMA):
+        registro = self._resolver(nome, similaridade_minima)
+        return registro.get("bairro") if registro is not None else None
+
+    def sugerir(self, texto, limite=8):
+        """
+        Autocomplete: nomes oficiais mais proximos do texto digitado.
+        """
+        return [
+            nome for nome, _ in self.trigramas.buscar(texto, limite=limite)
+        ]
+
+    def __contains__(self, nome):
+        return self._exato(nome) is not None
+
+
+def _construir_indice(snapshot):
+    return IndiceBairros(snapshot.store.registros, ALIASES_BAIRROS)
+
+
+def obter_indice_bairros(base=None):
+    """
+    Indice da base atual (cacheado por versao).
+    Para outro BairroStore ou DataFrame, monta um indice avulso.
+    """
+    snapshot = obter_snapshot_bairros()
+    if base is None or base is snapshot.store:
+        return snapshot.derivado("indice_nomes", _construir_indice)
+    if isinstance(base, BairroStore):
+        return IndiceBairros(base.registros, ALIASES_BAIRROS)
+    return IndiceBairros.de_dataframe(base, ALIASES_BAIRROS)
+
+
+def buscar_bairro(nome):
+    """
+    Registro do bairro pelo nome (sem acento/caixa) ou apelido conhecido.
+    """
+    if not nome:
+        return None
+    return obter_indice_bairros().buscar(nome)
+
+
+def resolver_bairro(nome):
+    """
+    Registro do bairro tolerando abreviacoes e erros de digitacao.
+    """
+    if not nome:
+        return None
+    return obter_indice_bairros().resolver(nome)
+
+
+def sugerir_bairros(texto, limite=8):
+    if not str(texto or "").strip():
+        return []
+    return obter_indice_bairros().sugerir(texto, limite=limite)
@@ -1,37 +1,128 @@
-import pandas as pd
+import csv
+import hashlib
+import io
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
 
+from app.services.bairro_store import BairroStore
 
-def carregar_bairros():
+
+_RAIZ = Path(__file__).resolve().parents[2]
+
+CAMINHOS_BAIRROS = (
+    _RAIZ / "data" / "bairros_cuiaba.csv",
+    _RAIZ / "data" / "bairros.csv",
+    _RAIZ / "bairros_cuiaba.csv",
+    _RAIZ / "bairros.csv",
+)
+
+_BOOLEANOS = {"true": True, "false": False}
+
+
+@dataclass(frozen=True)
+class SnapshotBairros:
     """
-    Carrega a base de bairros de Cuiaba com contrato unico.
+    Versao carregada da base de bairros.
+    O store e compartilhado entre requisicoes: trate como somente leitura.
     """
-    raiz = Path(__file__).resolve().parents[2]
 
-    caminhos_possiveis = [
-        raiz / "data" / "bairros_cuiaba.csv",
-        raiz / "data" / "bairros.csv",
-        raiz / "bairros_cuiaba.csv",
-        raiz / "bairros.csv",
-    ]
+    versao: str
+    caminho: Path
+    store: BairroStore
+    _derivados: dict = field(
+        default_factory=dict,
+        init=False,
+        repr=False,
+        compare=False,
+    )
 
-    caminho = next((c for c in caminhos_possiveis if c.exists()), None)
-    if caminho is None:
-        raise FileNotFoundError(
-            "Arquivo de bairros nao encontrado. "
-            "Coloque 'bairros_cuiaba.csv' dentro de /data."
-        )
+    def derivado(self, nome, construtor):
+        """
+        Estrutura derivada (indices, colunas preparadas) calculada uma
+        unica vez por versao da base.
+        """
+        try:
+            return self._derivados[nome]
+        except KeyError:
+            return self._derivados.setdefault(nome, construtor(self))
+
+    @property
+    def df(self):
+        """
+        DataFrame montado sob demanda (ferramentas offline e scripts).
+        O caminho de requisicao usa apenas o store.
+        """
+        return self.derivado("df", _montar_dataframe)
+
+
+def _montar_dataframe(snapshot):
+    import pandas as pd
+
+    store = snapshot.store
+    return pd.DataFrame(
+        [registro.as_dict() for registro in store.registros],
+        columns=list(store.colunas),
+    )
 
-    df = pd.read_csv(caminho)
-    df.columns = [c.strip().lower() for c in df.columns]
+
+def _tipar_coluna(valores):
+    """
+    Inferencia de tipo por coluna (int, float, bool ou texto),
+    com celulas vazias como None.
+    """
+    preenchidos = [v for v in valores if v != ""]
+    if not preenchidos:
+        return [None] * len(valores)
+
+    conversores = []
+    if len(preenchidos) == len(valores):
+        conversores.append(int)
+    conversores.append(float)
+    for conversor in conversores:
+        try:
+            convertidos = [conversor(v) for v in preenchidos]
+        except ValueError:
+            continue
+        it = iter(convertidos)
+        return [next(it) if v != "" else None for v in valores]
+
+    if len(preenchidos) == len(valores) and all(
+        v.lower() in _BOOLEANOS for v in valores
+    ):
+        return [_BOOLEANOS[v.lower()] for v in valores]
+    return [v if v != "" else None for v in valores]
+
+
+def _texto(valor):
+    return "" if valor is None else str(valor)
+
+
+def _ler_csv_bairros(conteudo):
+    """
+    Le o CSV (bytes) e aplica o contrato unico de colunas.
+    Retorna (colunas, linhas) com valores ja tipados.
+    """
+    leitor = csv.reader(io.StringIO(conteudo.decode("utf-8-sig")))
+    cabecalho = next(leitor, [])
+    linhas_brutas = [linha for linha in leitor if linha]
+    dados = {}
+    for posicao, nome in enumerate(c.strip().lower() for c in cabecalho):
+        dados[nome] = _tipar_coluna(
+            [
+                linha[posicao] if posicao < len(linha) else ""
+                for linha in linhas_brutas
+            ]
+        )
+    total = len(linhas_brutas)
 
     # Compatibilidade entre schemas antigos/novos
-    if "padrao_predominante" not in df.columns and "padrao_urbano" in df.columns:
-        df["padrao_predominante"] = df["padrao_urbano"]
-    if "uso_predominante" not in df.columns and "uso_solo" in df.columns:
-        df["uso_predominante"] = df["uso_solo"]
-    if "nivel_ruido" not in df.columns and "sensibilidade_ruido" in df.columns:
-        df["nivel_ruido"] = df["sensibilidade_ruido"]
+    if "padrao_predominante" not in dados and "padrao_urbano" in dados:
+        dados["padrao_predominante"] = list(dados["padrao_urbano"])
+    if "uso_predominante" not in dados and "uso_solo" in dados:
+        dados["uso_predominante"] = list(dados["uso_solo"])
+    if "nivel_ruido" not in dados and "sensibilidade_ruido" in dados:
+        dados["nivel_ruido"] = list(dados["sensibilidade_ruido"])
 
     colunas_minimas = [
         "bairro",
@@ -45,20 +136,118 @@ def carregar_bairros():
         "perfil_socioeconomico",
     ]
     for col in colunas_minimas:
-        if col not in df.columns:
-            df[col] = ""
+        if col not in dados:
+            dados[col] = [""] * total
 
-    df["bairro"] = df["bairro"].astype(str).str.strip()
-    df["regiao"] = df["regiao"].astype(str).str.strip()
-    df["padrao_predominante"] = (
-        df["padrao_predominante"].astype(str).str.strip().str.lower()
-    )
-    df["perfil_socioeconomico"] = (
-        df["perfil_socioeconomico"].astype(str).str.strip().str.lower()
-    )
+    dados["bairro"] = [_texto(v).strip() for v in dados["bairro"]]
+    dados["regiao"] = [_texto(v).strip() for v in dados["regiao"]]
+    dados["padrao_predominante"] = [
+        _texto(v).strip().lower() for v in dados["padrao_predominante"]
+    ]
+    dados["perfil_socioeconomico"] = [
+        _texto(v).strip().lower() for v in dados["perfil_socioeconomico"]
+    ]
 
     # Alias legado para consumidores que esperam 'padrao'
-    if "padrao" not in df.columns:
-        df["padrao"] = df["padrao_predominante"]
+    if "padrao" not in dados:
+        dados["padrao"] = list(dados["padrao_predominante"])
+
+    linhas = [list(valores) for valores in zip(*dados.values())]
+    return list(dados), linhas
 
-    return df
+
+def _versao_conteudo(conteudo):
+    return hashlib.sha256(conteudo).hexdigest()[:16]
+
+
+def _carregar_snapshot(caminho):
+    conteudo = caminho.read_bytes()
+    colunas, linhas = _ler_csv_bairros(conteudo)
+    return SnapshotBairros(
+        versao=_versao_conteudo(conteudo),
+        caminho=caminho,
+        store=BairroStore(colunas, linhas),
+    )
+
+
+class CatalogoBairros:
+    """
+    Cache da base de bairros por processo (worker).
+    Le a base uma unica vez e so recarrega quando mtime ou tamanho do CSV
+    mudam.
+    """
+
+    def __init__(self, caminhos):
+        self._caminhos = tuple(caminhos)
+        self._lock = threading.Lock()
+        self._caminho = None
+        self._assinatura = None
+        self._snapshot = None
+
+    def _localizar(self):
+        caminho = next((c for c in self._caminhos if c.exists()), None)
+        if caminho is None:
+            raise FileNotFoundError(
+                "Arquivo de bairros nao encontrado. "
+                "Coloque 'bairros_cuiaba.csv' dentro de /data."
+            )
+        return caminho
+
+    @staticmethod
+    def _assinatura_arquivo(caminho):
+        stat = caminho.stat()
+        return (str(caminho), stat.st_mtime_ns, stat.st_size)
+
+    def _assinatura_atual(self):
+        caminho = self._caminho
+        if caminho is not None:
+            try:
+                return caminho, self._assinatura_arquivo(caminho)
+            except OSError:
+                pass
+        caminho = self._localizar()
+        return caminho, self._assinatura_arquivo(caminho)
+
+    def snapshot(self):
+        caminho, assinatura = self._assinatura_atual()
+        snapshot = self._snapshot
+        if snapshot is not None and assinatura == self._assinatura:
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is None or assinatura != self._assinatura:
+                self._snapshot = _carregar_snapshot(caminho)
+                self._caminho = caminho
+                self._assinatura = assinatura
+            return self._snapshot
+
+    def invalidar(self):
+        with self._lock:
+            self._caminho = None
+            self._assinatura = None
+            self._snapshot = None
+
+
+_CATALOGO = CatalogoBairros(CAMINHOS_BAIRROS)
+
+
+def obter_snapshot_bairros():
+    """
+    Retorna o snapshot atual da base de bairros (com versao).
+    """
+    return _CATALOGO.snapshot()
+
+
+def carregar_store_bairros():
+    """
+    Base de bairros sem pandas, para o caminho de requisicao.
+    """
+    return _CATALOGO.snapshot().store
+
+
+def carregar_bairros():
+    """
+    Carrega a base de bairros de Cuiaba com contrato unico (DataFrame).
+    Mantido para ferramentas offline; importa pandas sob demanda.
+    """
+    return _CATALOGO.snapshot().df
@@ -0,0 +1,93 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+def chave_canonica(*partes):
+    """
+    Hash estavel de valores JSON-serializaveis (dicts com chaves ordenadas).
+    """
+    texto = json.dumps(
+        partes,
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+class MemoLRU:
+    """
+    Memo por processo (worker) com limite de itens (LRU) e validade (TTL).
+    Os valores guardados sao compartilhados: trate como somente leitura.
+    """
+
+    def __init__(self, max_itens=128, ttl_segundos=900, relogio=time.monotonic):
+        self.max_itens = max(1, int(max_itens))
+        self.ttl_segundos = float(ttl_segundos)
+        self._relogio = relogio
+        self._lock = threading.Lock()
+        self._itens = OrderedDict()
+        self._acertos = 0
+        self._falhas = 0
+        self._expirados = 0
+        self._descartados = 0
+
+    def obter(self, chave, padrao=None):
+        agora = self._relogio()
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None and item[0] <= agora:
+                del self._itens[chave]
+                self._expirados += 1
+                item = None
+            if item is None:
+                self._falhas += 1
+                return padrao
+            self._itens.move_to_end(chave)
+            self._acertos += 1
+            return item[1]
+
+    def guardar(self, chave, valor):
+        expira = self._relogio() + self.ttl_segundos
+        with self._lock:
+            self._itens[chave] = (expira, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+                self._descartados += 1
+        return valor
+
+    def obter_ou_calcular(self, chave, construtor):
+        """
+        Valor memorizado ou construtor() (fora do lock; excecoes nao sao
+        memorizadas).
+        """
+        faltante = object()
+        valor = self.obter(chave, faltante)
+        if valor is faltante:
+            valor = self.guardar(chave, construtor())
+        return valor
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+
+    def estatisticas(self):
+        with self._lock:
+            consultas = self._acertos + self._falhas
+            return {
+                "itens": len(self._itens),
+                "max_itens": self.max_itens,
+                "ttl_segundos": self.ttl_segundos,
+                "acertos": self._acertos,
+                "falhas": self._falhas,
+                "expirados": self._expirados,
+                "descartados": self._descartados,
+                "taxa_acerto": (
+                    round(self._acertos / consultas, 4) if consultas else 0.0
+                ),
+            }
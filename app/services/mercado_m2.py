@@ -1,15 +1,39 @@
-import json
+import os
+import threading
+import time
 import unicodedata
 from datetime import datetime, timedelta
 from pathlib import Path
 
+from app.services.cache_m2 import CacheM2
+from app.services.fila_atualizacao import FilaAtualizacao
 from app.services.scraper_valor_m2 import buscar_valor_m2_viva_real
+from app.services.voo_unico import VooUnico
 from app.utils.formatacao import moeda_para_float
 
 
-CACHE_PATH = (
-    Path(__file__).resolve().parents[1] / "data" / "mercado_m2_cache.json"
+_DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+CACHE_PATH = Path(
+    os.getenv("LOKAO_CACHE_M2", _DATA_DIR / "mercado_m2_cache.sqlite3")
 )
+# Cache antigo em JSON, importado uma vez na criacao da tabela.
+CACHE_JSON_LEGADO = _DATA_DIR / "mercado_m2_cache.json"
+
+CACHE_M2 = CacheM2(CACHE_PATH, json_legado=CACHE_JSON_LEGADO)
+
+# Coletas externas rodam fora da requisicao, numa fila por worker.
+FILA_M2 = FilaAtualizacao(
+    max_itens=int(os.getenv("LOKAO_FILA_M2_ITENS", "64")),
+    threads=int(os.getenv("LOKAO_FILA_M2_THREADS", "1")),
+    nome="fila-m2",
+)
+TIMEOUT_COLETA = 4
+
+# Single-flight da coleta: por processo (VooUnico) e entre workers (lease
+# no SQLite, vencido se o dono morrer no meio da coleta).
+VOO_M2 = VooUnico()
+LEASE_COLETA_SEGUNDOS = 30
+INTERVALO_LEASE = 0.2
 
 
 def _normalizar_chave(texto):
@@ -21,25 +45,8 @@ def _normalizar_chave(texto):
     return " ".join(texto.split())
 
 
-def _carregar_cache():
-    if not CACHE_PATH.exists():
-        return {}
-    try:
-        return json.loads(CACHE_PATH.read_text(encoding="utf-8"))
-    except Exception:
-        return {}
-
-
-def _salvar_cache(cache):
-    CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
-    CACHE_PATH.write_text(
-        json.dumps(cache, ensure_ascii=False, indent=2),
-        encoding="utf-8",
-    )
-
-
-def _cache_valido(registro, max_age_hours):
-    coletado_em = str(registro.get("coletado_em", "")).strip()
+def _cache_valido(registro, max_age_hours, campo="coletado_em"):
+    coletado_em = str(registro.get(campo, "")).strip()
     if not coletado_em:
         return False
     try:
@@ -49,6 +56,98 @@ def _cache_valido(registro, max_age_hours):
     return datetime.now() - coleta <= timedelta(hours=max_age_hours)
 
 
+def _chave_cache(bairro, tipo_imovel):
+    return _normalizar_chave(bairro), _normalizar_chave(tipo_imovel)
+
+
+def _valor_recente(registro, cache_horas):
+    valor = moeda_para_float(registro.get("valor")) if registro else 0.0
+    if valor > 0 and _cache_valido(registro, cache_horas):
+        return valor
+    return None
+
+
+def atualizar_m2(
+    bairro,
+    tipo_imovel,
+    cooldown_falha_horas=6,
+    cache_horas=168,
+    espera_segundos=0,
+):
+    """
+    Coleta o m2 no portal e grava no cache (sucesso ou falha com cooldown;
+    a falha preserva o ultimo valor coletado). Roda na fila em segundo
+    plano; tambem pode ser chamada direto.
+
+    Uma coleta por (bairro, tipo) de cada vez: no processo, chamadas
+    simultaneas recebem o resultado da que ja esta em andamento; entre
+    workers, um lease no SQLite. Quem nao obtem o lease espera ate
+    espera_segundos pelo valor gravado pelo outro worker (ou None).
+    Valor ainda recente ou falha em cooldown nao sao recoletados
+    (cache_horas=0 e cooldown_falha_horas=0 forcam a coleta).
+    """
+    chave = _chave_cache(bairro, tipo_imovel)
+    return VOO_M2.executar(
+        chave,
+        _coletar_m2,
+        chave,
+        bairro,
+        tipo_imovel,
+        cooldown_falha_horas,
+        cache_horas,
+        espera_segundos,
+    )
+
+
+def _coletar_m2(
+    chave,
+    bairro,
+    tipo_imovel,
+    cooldown_falha_horas,
+    cache_horas,
+    espera_segundos,
+):
+    dono = f"{os.getpid()}:{threading.get_ident()}"
+    prazo = time.monotonic() + espera_segundos
+    while not CACHE_M2.adquirir_lease(*chave, dono, LEASE_COLETA_SEGUNDOS):
+        if time.monotonic() >= prazo:
+            return _valor_recente(CACHE_M2.obter(*chave), cache_horas)
+        time.sleep(INTERVALO_LEASE)
+
+    try:
+        # Outro worker pode ter coletado (ou falhado) enquanto este
+        # esperava pelo lease.
+        registro = CACHE_M2.obter(*chave)
+        valor = _valor_recente(registro, cache_horas)
+        if valor is not None:
+            return valor
+        if registro.get("status") == "falha" and _cache_valido(
+            registro,
+            cooldown_falha_horas,
+            campo="falha_em",
+        ):
+            return None
+
+        valor_coleta = buscar_valor_m2_viva_real(
+            bairro,
+            tipo_imovel=tipo_imovel or "casa",
+            timeout=TIMEOUT_COLETA,
+        )
+        agora = datetime.now().isoformat(timespec="seconds")
+        if valor_coleta:
+            CACHE_M2.gravar_sucesso(*chave, valor_coleta, "Base Lokao", agora)
+        else:
+            CACHE_M2.gravar_falha(
+                *chave,
+                "falha_coleta",
+                agora,
+                cooldown_falha_horas,
+            )
+        return valor_coleta
+    finally:
+        CACHE_M2.liberar_lease(*chave, dono)
+
+
 def obter_contexto_m2(
     dados_bairro,
     bairro,
@@ -58,10 +157,10 @@ def obter_contexto_m2(
     cooldown_falha_horas=6,
 ):
     """
-    Resolve valor de m2 com estrategia segura:
+    Resolve valor de m2 sem esperar pela rede (stale-while-revalidate):
     1) cache recente
-    2) coleta online (quando habilitado)
-    3) base interna da planilha
+    2) cache vencido, servido na hora enquanto a fila recoleta
+    3) base interna da planilha (coleta agendada quando habilitada)
     """
 
     valor_planilha = moeda_para_float(dados_bairro.get("valor_m2_medio"))
@@ -69,54 +168,44 @@ def obter_contexto_m2(
     if not origem_planilha:
         origem_planilha = "base_interna"
 
-    chave = f"{_normalizar_chave(bairro)}|{_normalizar_chave(tipo_imovel)}"
-    cache = _carregar_cache()
-    registro = cache.get(chave, {})
-
-    if registro:
-        if _cache_valido(registro, cache_horas):
-            valor_cache = moeda_para_float(registro.get("valor"))
-            if valor_cache > 0:
-                return {
-                    "valor": valor_cache,
-                    "fonte": "Base Lokao",
-                    "data_referencia": registro.get("coletado_em", ""),
-                    "origem": "base_lokao",
-                }
-        if registro.get("status") == "falha" and _cache_valido(
-            registro,
-            cooldown_falha_horas,
-        ):
-            usar_coleta_externa = False
+    # Nome oficial da base: "jd italia" e "Jardim Itália" usam a mesma chave.
+    bairro = str(dados_bairro.get("bairro") or bairro or "").strip()
+    chave = _chave_cache(bairro, tipo_imovel)
+    registro = CACHE_M2.obter(*chave)
+
+    valor_cache = moeda_para_float(registro.get("valor")) if registro else 0.0
+    if valor_cache > 0 and _cache_valido(registro, cache_horas):
+        return {
+            "valor": valor_cache,
+            "fonte": "Base Lokao",
+            "data_referencia": registro.get("coletado_em", ""),
+            "origem": "base_lokao",
+        }
+
+    if registro.get("status") == "falha" and _cache_valido(
+        registro,
+        cooldown_falha_horas,
+        campo="falha_em",
+    ):
+        usar_coleta_externa = False
 
     if usar_coleta_externa and bairro:
-        valor_coleta = buscar_valor_m2_viva_real(
+        FILA_M2.agendar(
+            chave,
+            atualizar_m2,
             bairro,
-            tipo_imovel=tipo_imovel or "casa",
-            timeout=4,
+            tipo_imovel,
+            cooldown_falha_horas=cooldown_falha_horas,
+            cache_horas=cache_horas,
         )
-        if valor_coleta:
-            agora = datetime.now().isoformat(timespec="seconds")
-            cache[chave] = {
-                "valor": valor_coleta,
-                "fonte": "Base Lokao",
-                "coletado_em": agora,
-            }
-            _salvar_cache(cache)
-            return {
-                "valor": float(valor_coleta),
-                "fonte": "Base Lokao",
-                "data_referencia": agora,
-                "origem": "base_lokao",
-            }
-        agora = datetime.now().isoformat(timespec="seconds")
-        cache[chave] = {
-            "status": "falha",
-            "fonte": "falha_coleta",
-            "coletado_em": agora,
-            "cooldown_horas": cooldown_falha_horas,
+
+    if valor_cache > 0:
+        return {
+            "valor": valor_cache,
+            "fonte": "Base Lokao",
+            "data_referencia": registro.get("coletado_em", ""),
+            "origem": "base_lokao",
         }
-        _salvar_cache(cache)
 
     if valor_planilha > 0:
         return {
@@ -0,0 +1,275 @@
+import csv
+import io
+import threading
+from bisect import bisect_right
+from dataclasses import dataclass, replace
+from itertools import product
+from pathlib import Path
+
+import numpy as np
+
+
+_PESOS_PATH = Path(__file__).resolve().parents[1] / "data" / "pesos_score_urbano.csv"
+
+# Nivel de padrao (0 = nao identificado) -> codigo em padrao_bairro.
+_CODIGO_NIVEL = (
+    "padrao_economico",
+    "padrao_economico",
+    "padrao_medio",
+    "padrao_alto",
+)
+
+# Indice da coerencia indefinida nas tabelas de coerencia_padrao.
+COERENCIA_INDEFINIDA = 3
+
+NIVEIS_PADRAO = {"economico": 1, "baixo": 1, "medio": 2, "alto": 3}
+# Padrao desejado: 0 = nao informado, 1..3 = nivel, 4 = informado sem nivel.
+DESEJADO_DESCONHECIDO = 4
+# Nivel desejado a partir do qual o desalinhamento socioeconomico conta.
+NIVEL_DESALINHAMENTO = 3
+
+
+def classificar_score(score):
+    if score >= 80:
+        return "Excelente compatibilidade"
+    if score >= 65:
+        return "Boa compatibilidade"
+    if score >= 45:
+        return "Compatibilidade limitada"
+    return "Baixa compatibilidade"
+
+
+@dataclass(frozen=True)
+class TabelaPesos:
+    """
+    Pesos do score urbano compilados em tabelas de consulta.
+    Cada regra e (codigo, pontos, explicacao); as listas *_pontos sao os
+    mesmos pontos em arrays NumPy para o ranking em lote.
+    """
+
+    base: int
+    # Indexado pelo nivel do bairro (0..3).
+    padrao: tuple
+    padrao_pontos: np.ndarray
+    # Indexado pela diferenca de nivel (0, 1, 2+) e COERENCIA_INDEFINIDA.
+    coerencia: tuple
+    coerencia_pontos: np.ndarray
+    # Faixas de orcamento / valor em ordem crescente: a faixa i vale para
+    # relacao >= relacao_limites[i - 1]; a faixa 0 e o piso.
+    relacao_limites: tuple
+    relacao: tuple
+    relacao_pontos: np.ndarray
+    desalinhamento_fator: float
+    desalinhamento: tuple
+    financiamento: tuple
+    # Tabela densa: (score, classificacao, explicacoes, codigos) por
+    # combinacao de fatores discretos; ver indice_celula().
+    celulas: tuple = ()
+    celulas_score: np.ndarray = None
+
+    def faixa_relacao(self, relacao):
+        return bisect_right(self.relacao_limites, relacao)
+
+    def dimensoes(self):
+        """
+        (nivel_bairro, desejado, nivel_socio, faixa + 1, folga, financia).
+        A faixa -1 (sem comparacao financeira) vira 0.
+        """
+        return (4, 5, 4, len(self.relacao) + 1, 2, 2)
+
+    def indice_celula(self, nivel_bairro, desejado, nivel_socio, faixa, folga, financia):
+        """
+        Posicao na tabela densa; funciona com inteiros ou arrays NumPy.
+        """
+        _, n_desejado, n_socio, n_faixa, _, _ = self.dimensoes()
+        indice = nivel_bairro * n_desejado + desejado
+        indice = indice * n_socio + nivel_socio
+        indice = indice * n_faixa + faixa + 1
+        indice = indice * 2 + folga
+        return indice * 2 + financia
+
+
+def _avaliar(tabela, nivel_bairro, desejado, nivel_socio, faixa, folga, financia):
+    """
+    Regras do score para uma combinacao de fatores (usado so ao montar
+    a tabela densa).
+    """
+    aplicadas = [tabela.padrao[nivel_bairro]]
+
+    nivel_desejado = desejado if desejado != DESEJADO_DESCONHECIDO else 0
+    if desejado:
+        if nivel_desejado and nivel_bairro:
+            diff = min(abs(nivel_desejado - nivel_bairro), 2)
+            aplicadas.append(tabela.coerencia[diff])
+        else:
+            aplicadas.append(tabela.coerencia[COERENCIA_INDEFINIDA])
+
+    if faixa >= 0:
+        aplicadas.append(tabela.relacao[faixa])
+
+    bairro_abaixo = (0 < nivel_bairro < nivel_desejado) or (
+        0 < nivel_socio < nivel_desejado
+    )
+    if folga and nivel_desejado >= NIVEL_DESALINHAMENTO and bairro_abaixo:
+        aplicadas.append(tabela.desalinhamento)
+
+    if financia:
+        aplicadas.append(tabela.financiamento)
+
+    score = max(0, min(100, int(tabela.base + sum(r[1] for r in aplicadas))))
+    return (
+        score,
+        classificar_score(score),
+        tuple(r[2] for r in aplicadas if r[2]),
+        tuple(r[0] for r in aplicadas),
+    )
+
+
+def _montar_celulas(tabela):
+    n_bairro, n_desejado, n_socio, n_faixa, _, _ = tabela.dimensoes()
+    celulas = tuple(
+        _avaliar(tabela, nb, nd, ns, faixa - 1, folga, financia)
+        for nb, nd, ns, faixa, folga, financia in product(
+            range(n_bairro),
+            range(n_desejado),
+            range(n_socio),
+            range(n_faixa),
+            range(2),
+            range(2),
+        )
+    )
+    return replace(
+        tabela,
+        celulas=celulas,
+        celulas_score=np.array([c[0] for c in celulas], dtype=np.int32),
+    )
+
+
+def _regra(linha):
+    return (
+        linha["codigo"].strip(),
+        int(linha["pontos"]),
+        (linha.get("explicacao") or "").strip(),
+    )
+
+
+def compilar_pesos(texto):
+    """
+    Compila o CSV (criterio, codigo, limite, pontos, explicacao).
+    Levanta ValueError se faltar alguma regra. Criterios dos analistas sem
+    dado por bairro na base (perfil_urbano, nivel_ruido, ...; codigos
+    baixo/medio/alto) ficam no arquivo, mas ainda nao entram no score.
+    """
+    criterios = {}
+    for linha in csv.DictReader(io.StringIO(texto)):
+        criterio = (linha.get("criterio") or "").strip()
+        if criterio:
+            criterios.setdefault(criterio, []).append(linha)
+
+    try:
+        base = int(criterios["base"][0]["pontos"])
+        padrao = {
+            linha["codigo"].strip(): _regra(linha)
+            for linha in criterios["padrao_bairro"]
+        }
+        padrao = tuple(padrao[codigo] for codigo in _CODIGO_NIVEL)
+
+        coerencia = [None] * 4
+        for linha in criterios["coerencia_padrao"]:
+            limite = (linha.get("limite") or "").strip()
+            indice = int(limite) if limite else COERENCIA_INDEFINIDA
+            coerencia[min(indice, COERENCIA_INDEFINIDA)] = _regra(linha)
+
+        piso = None
+        faixas = []
+        for linha in criterios["relacao_orcamento"]:
+            limite = (linha.get("limite") or "").strip()
+            if limite:
+                faixas.append((float(limite), _regra(linha)))
+            else:
+                piso = _regra(linha)
+        faixas.sort()
+
+        desalinhamento = criterios["desalinhamento_socio"][0]
+        financiamento = criterios["financiamento"][0]
+        tabela = TabelaPesos(
+            base=base,
+            padrao=padrao,
+            padrao_pontos=np.array([r[1] for r in padrao], dtype=np.int32),
+            coerencia=tuple(coerencia),
+            coerencia_pontos=np.array(
+                [r[1] for r in coerencia],
+                dtype=np.int32,
+            ),
+            relacao_limites=tuple(limite for limite, _ in faixas),
+            relacao=(piso, *(regra for _, regra in faixas)),
+            relacao_pontos=np.array(
+                [piso[1], *(regra[1] for _, regra in faixas)],
+                dtype=np.int32,
+            ),
+            desalinhamento_fator=float(desalinhamento["limite"]),
+            desalinhamento=_regra(desalinhamento),
+            financiamento=_regra(financiamento),
+        )
+    except (KeyError, IndexError, TypeError, ValueError) as exc:
+        raise ValueError(f"Tabela de pesos invalida: {exc!r}") from exc
+    return _montar_celulas(tabela)
+
+
+class CatalogoPesos:
+    """
+    Tabela de pesos por processo, recompilada quando mtime ou tamanho do
+    CSV mudam. Se a nova versao nao compilar, mantem a anterior; sem
+    nenhuma versao valida carregada, o erro sobe.
+    """
+
+    def __init__(self, caminho):
+        self._caminho = Path(caminho)
+        self._lock = threading.Lock()
+        self._assinatura = None
+        self._tabela = None
+
+    def _assinatura_atual(self):
+        try:
+            stat = self._caminho.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def tabela(self):
+        assinatura = self._assinatura_atual()
+        tabela = self._tabela
+        if tabela is not None and assinatura == self._assinatura:
+            return tabela
+
+        with self._lock:
+            if self._tabela is None or assinatura != self._assinatura:
+                try:
+                    texto = self._caminho.read_text(encoding="utf-8-sig")
+                    self._tabela = compilar_pesos(texto)
+                except (OSError, ValueError):
+                    if self._tabela is None:
+                        raise
+                self._assinatura = assinatura
+            return self._tabela
+
+    def versao(self):
+        """
+        Assinatura (mtime, tamanho) do CSV da tabela em uso.
+        """
+        self.tabela()
+        return self._assinatura
+
+
+_CATALOGO = CatalogoPesos(_PESOS_PATH)
+
+
+def obter_tabela_pesos():
+    return _CATALOGO.tabela()
+
+
+def versao_pesos():
+    """
+    Assinatura (mtime, tamanho) do CSV de pesos em uso.
+    """
+    return _CATALOGO.versao()
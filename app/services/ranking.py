@@ -0,0 +1,139 @@
+import numpy as np
+
+from app.services.pesos_score import (
+    DESEJADO_DESCONHECIDO,
+    NIVEIS_PADRAO as _NIVEL,
+    obter_tabela_pesos,
+)
+from app.services.score_urbano import _parse_float
+
+# Area usada quando o comprador nao informa (mesma referencia das sugestoes).
+AREA_REFERENCIA = 180.0
+
+
+def _colunas_ranking(store):
+    """
+    Colunas NumPy usadas pelo ranking, preparadas uma vez por store.
+    """
+    registros = store.registros
+    return {
+        "valor_m2": np.frombuffer(store.valor_m2_medio, dtype=np.float64),
+        "nivel_bairro": np.array(
+            [
+                _NIVEL.get(str(r.get("padrao_predominante") or "").lower(), 0)
+                for r in registros
+            ],
+            dtype=np.int8,
+        ),
+        "nivel_socio": np.array(
+            [
+                _NIVEL.get(
+                    str(r.get("perfil_socioeconomico") or "").lower(),
+                    0,
+                )
+                for r in registros
+            ],
+            dtype=np.int8,
+        ),
+    }
+
+
+def calcular_scores(
+    store,
+    orcamento,
+    valor_imovel=None,
+    area=None,
+    padrao_desejado="",
+    financia=False,
+    pesos=None,
+):
+    """
+    Aplica as regras de calcular_score_urbano a todas as linhas da base
+    numa unica passada vetorizada: calcula o indice da celula na tabela
+    densa de pesos para cada linha.
+    Sem valor_imovel, o ticket de cada bairro e valor_m2 x area.
+    Retorna (scores, celulas).
+    """
+    pesos = pesos or obter_tabela_pesos()
+    colunas = store.derivado("colunas_ranking", _colunas_ranking)
+
+    orcamento = _parse_float(orcamento)
+    valor_imovel = _parse_float(valor_imovel)
+    area = _parse_float(area)
+    padrao_desejado = str(padrao_desejado or "").lower()
+    desejado = _NIVEL.get(
+        padrao_desejado,
+        DESEJADO_DESCONHECIDO if padrao_desejado else 0,
+    )
+
+    if valor_imovel > 0:
+        valores = np.full(len(store), valor_imovel)
+    else:
+        valores = colunas["valor_m2"] * (area if area > 0 else AREA_REFERENCIA)
+
+    comparavel = valores > 0
+    if orcamento > 0:
+        with np.errstate(divide="ignore"):
+            relacao = orcamento / np.where(comparavel, valores, 1.0)
+        faixa = np.where(
+            comparavel,
+            np.searchsorted(pesos.relacao_limites, relacao, side="right"),
+            -1,
+        )
+    else:
+        faixa = -1
+    folga = comparavel & (orcamento >= valores * pesos.desalinhamento_fator)
+
+    celulas = pesos.indice_celula(
+        colunas["nivel_bairro"].astype(np.intp),
+        desejado,
+        colunas["nivel_socio"].astype(np.intp),
+        faixa,
+        folga.astype(np.intp),
+        int(bool(financia)),
+    )
+    return pesos.celulas_score[celulas], celulas
+
+
+def ranquear_bairros(
+    store,
+    orcamento,
+    valor_imovel=None,
+    area=None,
+    padrao_desejado="",
+    financia=False,
+    limite=10,
+):
+    """
+    Top-N bairros da base para um perfil de comprador, com classificacao
+    e codigos compactos de explicacao. Empates mantem a ordem da base.
+    """
+    if not len(store) or limite <= 0:
+        return []
+
+    pesos = obter_tabela_pesos()
+    scores, celulas = calcular_scores(
+        store,
+        orcamento,
+        valor_imovel=valor_imovel,
+        area=area,
+        padrao_desejado=padrao_desejado,
+        financia=financia,
+        pesos=pesos,
+    )
+
+    ranking = []
+    for i in np.argsort(-scores, kind="stable")[:limite]:
+        registro = store.registros[i]
+        score, classificacao, _, codigos = pesos.celulas[celulas[i]]
+        ranking.append(
+            {
+                "bairro": registro.get("bairro"),
+                "regiao": registro.get("regiao"),
+                "valor_m2_medio": store.valor_m2_medio[i],
+                "score": score,
+                "classificacao": classificacao,
+                "explicacoes": list(codigos),
+            }
+        )
+    return ranking
@@ -0,0 +1,75 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+PASTA = BASE_DIR / "data" / "relatorios"
+
+_TOKEN_VALIDO = re.compile(r"^[A-Za-z0-9_-]{1,120}$")
+
+
+def _escrever_atomico(destino, conteudo):
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    tmp = destino.with_name(f"{destino.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(conteudo)
+    tmp.replace(destino)
+
+
+def _caminho_ref(token):
+    if not _TOKEN_VALIDO.match(str(token or "")):
+        return None
+    return PASTA / "tokens" / f"{token}.json"
+
+
+def salvar_relatorio(token, contexto, versoes):
+    """
+    Grava o contexto calculado do relatorio pago, uma unica vez por token.
+    O conteudo vai comprimido em <sha256>.json.gz (relatorios iguais
+    compartilham o arquivo); o token aponta para ele junto com as versoes
+    das bases usadas no calculo.
+    """
+    ref = _caminho_ref(token)
+    if ref is None or ref.exists():
+        return None
+
+    bruto = json.dumps(
+        contexto,
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    digest = hashlib.sha256(bruto).hexdigest()
+    arquivo = PASTA / f"{digest}.json.gz"
+    if not arquivo.exists():
+        _escrever_atomico(arquivo, gzip.compress(bruto, mtime=0))
+
+    meta = {
+        "arquivo": arquivo.name,
+        "sha256": digest,
+        "versoes": versoes,
+        "salvo_em": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+    }
+    _escrever_atomico(ref, json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+    return meta
+
+
+def carregar_relatorio(token):
+    """
+    Contexto salvo para o token, ou None se nao existir ou estiver corrompido.
+    """
+    ref = _caminho_ref(token)
+    if ref is None:
+        return None
+    try:
+        meta = json.loads(ref.read_text(encoding="utf-8"))
+        bruto = gzip.decompress((PASTA / meta["arquivo"]).read_bytes())
+    except (OSError, ValueError, KeyError, EOFError):
+        return None
+    if hashlib.sha256(bruto).hexdigest() != meta.get("sha256"):
+        return None
+    return json.loads(bruto)
@@ -1,8 +1,9 @@
-import requests
 from bs4 import BeautifulSoup
 import re
 import statistics
 
+from app.services.scraping.cliente_http import obter
+
 
 HEADERS = {
     "User-Agent": (
@@ -45,7 +46,12 @@ def buscar_valor_m2_viva_real(
     )
 
     try:
-        resposta = requests.get(url, headers=HEADERS, timeout=timeout)
+        resposta = obter(
+            url,
+            fonte="vivareal_busca",
+            headers=HEADERS,
+            timeout=timeout,
+        )
         if resposta.status_code != 200:
             return None
 
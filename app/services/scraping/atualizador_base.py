@@ -1,39 +1,155 @@
-import pandas as pd
+import csv
+import io
+import json
+import os
 from datetime import datetime, timedelta
-from app.services.scraping.fontes.vivareal import extrair_valores
+from pathlib import Path
 
-CAMINHO = "data/bairros_cuiaba.csv"
+from app.services.scraping.coletor import (
+    CONCORRENCIA,
+    PRAZO_SEGUNDOS,
+    coletar_valores,
+)
+
+CAMINHO = Path(__file__).resolve().parents[3] / "data" / "bairros_cuiaba.csv"
+DIAS_VALIDADE = 15
+
+# Tipo coletado -> coluna da base que o app le (loader/score/ranking usam
+# valor_m2_medio). Terreno nao tem coluna na base, entao nao e coletado.
+COLUNAS_TIPO = {
+    "casa": "valor_m2_medio",
+}
+COLUNA_ORIGEM = "origem_valor"
+ORIGEM_COLETA = "scraping"
+
+
+def caminho_datas(caminho_csv):
+    """
+    Datas da ultima coleta por bairro ficam ao lado do CSV, para nao
+    acrescentar colunas na base.
+    """
+    caminho_csv = Path(caminho_csv)
+    return caminho_csv.with_name(f"{caminho_csv.stem}.coleta.json")
 
 
 def precisa_atualizar(data):
-    if pd.isna(data) or not data:
+    if not data:
         return True
     try:
         ultima = datetime.strptime(data, "%Y-%m-%d")
-        return datetime.now() - ultima > timedelta(days=15)
-    except:
+        return datetime.now() - ultima > timedelta(days=DIAS_VALIDADE)
+    except (TypeError, ValueError):
         return True
 
 
-def atualizar_base():
-    df = pd.read_csv(CAMINHO)
+def _mostrar_progresso(feitos, total, bairro, tipo, valor):
+    situacao = valor if valor else "sem valor"
+    print(f"🔍 [{feitos}/{total}] {bairro} ({tipo}): {situacao}")
+
+
+def _gravar_atomico(caminho, texto):
+    tmp = caminho.with_name(f"{caminho.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8", newline="") as arquivo:
+        arquivo.write(texto)
+    tmp.replace(caminho)
+
+
+def _ler_datas(caminho):
+    try:
+        return json.loads(caminho.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _formatar_valor(valor):
+    valor = round(float(valor), 2)
+    return str(int(valor)) if valor.is_integer() else f"{valor:.2f}"
+
+
+def atualizar_base(
+    caminho=CAMINHO,
+    concorrencia=CONCORRENCIA,
+    prazo_segundos=PRAZO_SEGUNDOS,
+    progresso=_mostrar_progresso,
+    requisicoes_por_segundo=None,
+):
+    """
+    Recoleta o m2 dos bairros vencidos em paralelo (coletor) e grava o
+    CSV uma unica vez, de forma atomica. So as celulas de valor_m2_medio
+    e origem_valor dos bairros coletados mudam; o resto do arquivo fica
+    como estava (texto original, sem reformatar). Bairro com falha ou nao
+    concluido no prazo mantem a data antiga e entra na proxima rodada.
+    """
+    caminho = Path(caminho)
+    texto = caminho.read_bytes().decode("utf-8")
+    linhas = list(csv.reader(io.StringIO(texto, newline="")))
+    cabecalho = [c.strip().lower() for c in linhas[0]]
+    posicoes = {nome: cabecalho.index(nome) for nome in ("bairro", COLUNA_ORIGEM)}
+    for coluna in COLUNAS_TIPO.values():
+        posicoes[coluna] = cabecalho.index(coluna)
 
-    for idx, row in df.iterrows():
-        bairro = row["bairro"]
+    arquivo_datas = caminho_datas(caminho)
+    datas = _ler_datas(arquivo_datas)
+    bairros = [
+        linha[posicoes["bairro"]].strip()
+        for linha in linhas[1:]
+        if linha and precisa_atualizar(datas.get(linha[posicoes["bairro"]].strip()))
+    ]
+    if not bairros:
+        print("✅ Base ja esta atualizada.")
+        return {"atualizados": 0, "falhas": {}, "pendentes": []}
 
-        if precisa_atualizar(row["data_atualizacao"]):
-            print(f"🔍 Atualizando {bairro}")
+    resultado = coletar_valores(
+        bairros,
+        tipos=tuple(COLUNAS_TIPO),
+        concorrencia=concorrencia,
+        prazo_segundos=prazo_segundos,
+        progresso=progresso,
+        requisicoes_por_segundo=requisicoes_por_segundo,
+    )
+    valores = resultado["valores"]
+    incompletos = {b for b, _ in resultado["falhas"]} | {
+        b for b, _ in resultado["pendentes"]
+    }
 
-            valor_casa = extrair_valores(bairro, "casa")
-            valor_terreno = extrair_valores(bairro, "terreno")
+    alterado = False
+    for linha in linhas[1:]:
+        if not linha:
+            continue
+        bairro = linha[posicoes["bairro"]].strip()
+        for tipo, coluna in COLUNAS_TIPO.items():
+            valor = valores.get((bairro, tipo))
+            if valor:
+                linha[posicoes[coluna]] = _formatar_valor(valor)
+                linha[posicoes[COLUNA_ORIGEM]] = ORIGEM_COLETA
+                alterado = True
 
-            if valor_casa:
-                df.at[idx, "valor_m2_casa"] = valor_casa
-            if valor_terreno:
-                df.at[idx, "valor_m2_terreno"] = valor_terreno
+    hoje = datetime.now().strftime("%Y-%m-%d")
+    concluidos = [b for b in dict.fromkeys(bairros) if b not in incompletos]
+    for bairro in concluidos:
+        datas[bairro] = hoje
 
-            df.at[idx, "fonte_valor"] = "VivaReal"
-            df.at[idx, "data_atualizacao"] = datetime.now().strftime("%Y-%m-%d")
+    if alterado:
+        saida = io.StringIO(newline="")
+        terminador = "\r\n" if "\r\n" in texto else "\n"
+        csv.writer(saida, lineterminator=terminador).writerows(linhas)
+        novo = saida.getvalue()
+        if not texto.endswith(("\n", "\r")):
+            novo = novo[: -len(terminador)]
+        _gravar_atomico(caminho, novo)
+    _gravar_atomico(
+        arquivo_datas,
+        json.dumps(datas, ensure_ascii=False, indent=2, sort_keys=True),
+    )
 
-    df.to_csv(CAMINHO, index=False)
-    print("✅ Base atualizada com sucesso.")
+    print(
+        f"✅ Base atualizada: {len(concluidos)} bairros em "
+        f"{resultado['duracao_segundos']}s "
+        f"({len(resultado['falhas'])} falhas, "
+        f"{len(resultado['pendentes'])} pendentes)."
+    )
+    return {
+        "atualizados": len(concluidos),
+        "falhas": resultado["falhas"],
+        "pendentes": resultado["pendentes"],
+    }
@@ -0,0 +1,236 @@
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# Status que valem nova tentativa (limite de taxa e falhas do servidor).
+STATUS_RETENTAVEIS = frozenset({429, 500, 502, 503, 504})
+
+REQUISICOES_POR_SEGUNDO = float(os.getenv("LOKAO_SCRAPING_RPS", "0.5"))
+RAJADA = int(os.getenv("LOKAO_SCRAPING_RAJADA", "3"))
+TENTATIVAS = int(os.getenv("LOKAO_SCRAPING_TENTATIVAS", "3"))
+ESPERA_BASE = float(os.getenv("LOKAO_SCRAPING_ESPERA_BASE", "1.0"))
+ESPERA_MAXIMA = 30.0
+CONEXOES_POR_HOST = int(os.getenv("LOKAO_SCRAPING_CONEXOES", "8"))
+
+
+class BaldeTokens:
+    """
+    Token bucket por host: ate `capacidade` requisicoes em rajada e, depois,
+    `taxa` por segundo. consumir() bloqueia ate haver token.
+    """
+
+    def __init__(self, taxa, capacidade):
+        self.taxa = max(float(taxa), 1e-6)
+        self.capacidade = max(float(capacidade), 1.0)
+        self._tokens = self.capacidade
+        self._atualizado = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consumir(self):
+        while True:
+            with self._lock:
+                agora = time.monotonic()
+                self._tokens = min(
+                    self.capacidade,
+                    self._tokens + (agora - self._atualizado) * self.taxa,
+                )
+                self._atualizado = agora
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                espera = (1 - self._tokens) / self.taxa
+            time.sleep(espera)
+
+
+class LimiteTaxa:
+    """
+    Conjunto proprio de baldes por host (ex.: uma coleta em lote), usado
+    pelas threads que o ativarem em ClienteScraping.usar_limite().
+    """
+
+    def __init__(self, requisicoes_por_segundo, rajada):
+        self.requisicoes_por_segundo = requisicoes_por_segundo
+        self.rajada = rajada
+        self._lock = threading.Lock()
+        self._baldes = {}
+
+    def balde(self, host):
+        with self._lock:
+            balde = self._baldes.get(host)
+            if balde is None:
+                balde = self._baldes[host] = BaldeTokens(
+                    self.requisicoes_por_segundo,
+                    self.rajada,
+                )
+            return balde
+
+
+def _espera_retry_after(resposta):
+    """
+    Segundos pedidos pelo servidor em Retry-After (numero ou data HTTP).
+    """
+    valor = (resposta.headers.get("Retry-After") or "").strip()
+    if not valor:
+        return None
+    try:
+        return max(float(valor), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(valor).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class ClienteScraping:
+    """
+    Cliente HTTP compartilhado pelos scrapers: uma Session com pool de
+    conexoes (keep-alive/TLS reaproveitados), limite de taxa por host,
+    nova tentativa com espera exponencial e jitter e metricas por fonte.
+    A Session e recriada apos fork do gunicorn.
+    """
+
+    def __init__(
+        self,
+        requisicoes_por_segundo=REQUISICOES_POR_SEGUNDO,
+        rajada=RAJADA,
+        tentativas=TENTATIVAS,
+        espera_base=ESPERA_BASE,
+        espera_maxima=ESPERA_MAXIMA,
+        conexoes_por_host=CONEXOES_POR_HOST,
+    ):
+        self.requisicoes_por_segundo = requisicoes_por_segundo
+        self.rajada = rajada
+        self.tentativas = max(1, int(tentativas))
+        self.espera_base = espera_base
+        self.espera_maxima = espera_maxima
+        self.conexoes_por_host = conexoes_por_host
+        self._lock = threading.Lock()
+        self._sessao = None
+        self._pid = None
+        self._baldes = {}
+        self._metricas = {}
+        self._local = threading.local()
+
+    def _sessao_atual(self):
+        with self._lock:
+            if self._sessao is None or self._pid != os.getpid():
+                sessao = requests.Session()
+                adaptador = HTTPAdapter(
+                    pool_connections=self.conexoes_por_host,
+                    pool_maxsize=self.conexoes_por_host,
+                )
+                sessao.mount("https://", adaptador)
+                sessao.mount("http://", adaptador)
+                self._sessao = sessao
+                self._pid = os.getpid()
+            return self._sessao
+
+    def _balde(self, host):
+        limite = getattr(self._local, "limite", None)
+        if limite is not None:
+            return limite.balde(host)
+        with self._lock:
+            balde = self._baldes.get(host)
+            if balde is None:
+                balde = self._baldes[host] = BaldeTokens(
+                    self.requisicoes_por_segundo,
+                    self.rajada,
+                )
+            return balde
+
+    def _registrar(self, fonte, status, duracao_ms):
+        with self._lock:
+            m = self._metricas.setdefault(
+                fonte,
+                {"tentativas": 0, "soma_ms": 0.0, "max_ms": 0.0, "status": {}},
+            )
+            m["tentativas"] += 1
+            m["soma_ms"] += duracao_ms
+            m["max_ms"] = max(m["max_ms"], duracao_ms)
+            m["status"][status] = m["status"].get(status, 0) + 1
+
+    def usar_limite(self, limite):
+        """
+        Faz a thread atual usar os baldes de `limite` (None volta aos do
+        cliente). Pensado como initializer de um pool de coleta: o limite
+        vale enquanto as threads viverem, sem mexer no dos outros usos.
+        """
+        self._local.limite = limite
+
+    def _espera(self, tentativa):
+        teto = min(self.espera_maxima, self.espera_base * 2 ** tentativa)
+        return random.uniform(0, teto)
+
+    def get(self, url, fonte="", **kwargs):
+        """
+        GET com as politicas do cliente. Retorna a ultima resposta (mesmo
+        com status de erro) ou levanta a ultima requests.RequestException
+        se nenhuma tentativa obteve resposta.
+        """
+        host = urlsplit(url).netloc.lower()
+        fonte = fonte or host
+        balde = self._balde(host)
+        erro = None
+        resposta = None
+
+        for tentativa in range(self.tentativas):
+            if tentativa:
+                retry_after = (
+                    _espera_retry_after(resposta) if resposta is not None else None
+                )
+                time.sleep(
+                    min(retry_after, self.espera_maxima)
+                    if retry_after is not None
+                    else self._espera(tentativa - 1)
+                )
+
+            balde.consumir()
+            inicio = time.perf_counter()
+            try:
+                resposta = self._sessao_atual().get(url, **kwargs)
+            except requests.RequestException as exc:
+                erro, resposta = exc, None
+                self._registrar(fonte, "erro", (time.perf_counter() - inicio) * 1000)
+                continue
+
+            self._registrar(
+                fonte,
+                str(resposta.status_code),
+                (time.perf_counter() - inicio) * 1000,
+            )
+            if resposta.status_code not in STATUS_RETENTAVEIS:
+                return resposta
+
+        if resposta is None:
+            raise erro
+        return resposta
+
+    def metricas(self):
+        with self._lock:
+            return {
+                fonte: {
+                    "tentativas": m["tentativas"],
+                    "latencia_media_ms": round(m["soma_ms"] / m["tentativas"], 1),
+                    "latencia_max_ms": round(m["max_ms"], 1),
+                    "status": dict(m["status"]),
+                }
+                for fonte, m in self._metricas.items()
+            }
+
+
+CLIENTE = ClienteScraping()
+
+
+def obter(url, fonte="", **kwargs):
+    """
+    GET pelo cliente compartilhado do processo.
+    """
+    return CLIENTE.get(url, fonte=fonte, **kwargs)
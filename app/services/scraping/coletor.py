@@ -0,0 +1,90 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from app.services.scraping.cliente_http import CLIENTE, LimiteTaxa
+from app.services.scraping.fontes.vivareal import extrair_valores
+
+
+CONCORRENCIA = int(os.getenv("LOKAO_COLETOR_CONCORRENCIA", "6"))
+PRAZO_SEGUNDOS = float(os.getenv("LOKAO_COLETOR_PRAZO", "600"))
+# Limite por host durante a coleta em lote: esta taxa por thread, ou seja,
+# concorrencia x TAXA_POR_THREAD req/s. Mais concorrencia termina antes,
+# mas pesa mais no portal (risco de bloqueio do IP); o padrao de 0,5 deixa
+# cada thread com ~1 requisicao a cada 2 s.
+TAXA_POR_THREAD = float(os.getenv("LOKAO_COLETOR_RPS_POR_THREAD", "0.5"))
+TIPOS_PADRAO = ("casa", "terreno")
+
+
+def coletar_valores(
+    bairros,
+    tipos=TIPOS_PADRAO,
+    extrator=extrair_valores,
+    concorrencia=CONCORRENCIA,
+    prazo_segundos=PRAZO_SEGUNDOS,
+    progresso=None,
+    requisicoes_por_segundo=None,
+):
+    """
+    Coleta extrator(bairro, tipo) para cada par bairro x tipo num pool de
+    threads. As threads do pool usam baldes proprios no cliente HTTP
+    compartilhado, com requisicoes_por_segundo por host (padrao:
+    concorrencia x TAXA_POR_THREAD, rajada = concorrencia), para o tempo
+    total cair com a concorrencia. O limite do cliente para os demais usos
+    (e para outras coletas) nao muda, nem depois do prazo.
+
+    Ao fim do prazo, o que ainda nao terminou fica em "pendentes" e nao e
+    esperado. progresso(feitos, total, bairro, tipo, valor) e chamado a
+    cada coleta concluida. Retorna:
+    valores {(bairro, tipo): valor ou None}, falhas {(bairro, tipo): erro},
+    pendentes [(bairro, tipo)] e duracao_segundos.
+    """
+    pares = [(bairro, tipo) for bairro in dict.fromkeys(bairros) for tipo in tipos]
+    concorrencia = max(1, int(concorrencia))
+    taxa = requisicoes_por_segundo or concorrencia * TAXA_POR_THREAD
+    inicio = time.monotonic()
+    limite = inicio + prazo_segundos if prazo_segundos else None
+    valores, falhas = {}, {}
+
+    executor = ThreadPoolExecutor(
+        max_workers=concorrencia,
+        thread_name_prefix="coletor",
+        initializer=CLIENTE.usar_limite,
+        initargs=(LimiteTaxa(taxa, concorrencia),),
+    )
+    try:
+        futuros = {executor.submit(extrator, *par): par for par in pares}
+        abertos = set(futuros)
+        while abertos:
+            restante = None if limite is None else limite - time.monotonic()
+            if restante is not None and restante <= 0:
+                break
+            prontos, abertos = wait(
+                abertos,
+                timeout=restante,
+                return_when=FIRST_COMPLETED,
+            )
+            for futuro in prontos:
+                par = futuros[futuro]
+                try:
+                    valores[par] = futuro.result()
+                except Exception as exc:
+                    falhas[par] = str(exc) or type(exc).__name__
+                if progresso:
+                    progresso(
+                        len(valores) + len(falhas),
+                        len(pares),
+                        *par,
+                        valores.get(par),
+                    )
+    finally:
+        # Coletas em andamento nao sao interrompidas, so descartadas; seguem
+        # no limite proprio do pool ate terminar.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return {
+        "valores": valores,
+        "falhas": falhas,
+        "pendentes": [p for p in pares if p not in valores and p not in falhas],
+        "duracao_segundos": round(time.monotonic() - inicio, 2),
+    }
@@ -1,8 +1,9 @@
-import requests
 from bs4 import BeautifulSoup
 import statistics
 import re
 
+from app.services.scraping.cliente_http import obter
+
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
 }
@@ -24,7 +25,7 @@ def extrair_valores(bairro, tipo="casa"):
 
     url = f"https://www.vivareal.com.br/venda/mato-grosso/cuiaba/bairros/{bairro_url}/{tipo_url}/"
 
-    resp = requests.get(url, headers=HEADERS, timeout=10)
+    resp = obter(url, fonte="vivareal_bairro", headers=HEADERS, timeout=10)
     if resp.status_code != 200:
         return None
 
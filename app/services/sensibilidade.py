@@ -0,0 +1,268 @@
+import numpy as np
+
+from app.services.amortizacao import (
+    PRAZO_MAXIMO,
+    PRAZO_MINIMO,
+    TAXAS_REFERENCIA,
+    calcular_cronogramas,
+)
+from app.services.capacidade import resolver_capacidade
+from app.services.financeiro import (
+    CENARIOS_COMPRA,
+    CENARIOS_CONSTRUCAO,
+    ENTRADA_MINIMA,
+    custo_m2_metodologia,
+    tarifa_bancaria,
+)
+from app.services.pesos_score import (
+    DESEJADO_DESCONHECIDO,
+    NIVEIS_PADRAO,
+    classificar_score,
+    obter_tabela_pesos,
+)
+from app.services.ranking import AREA_REFERENCIA
+from app.services.score_urbano import _parse_float
+
+# Limite de pontos por eixo (a grade inteira e no maximo MAX_PONTOS^3).
+MAX_PONTOS = 25
+
+# Faixa de valores aceita por eixo (min, max), inclusive.
+LIMITES_EIXOS = {
+    "orcamento": (0.0, 1e9),
+    "area": (0.0, 100000.0),
+    "prazo": (PRAZO_MINIMO, PRAZO_MAXIMO),
+}
+
+
+def faixa_valores(texto, maximo=MAX_PONTOS, limites=None):
+    """
+    Valores de um eixo da grade: lista "a,b,c" ou faixa "inicio:fim:passo"
+    (fim incluso). Levanta ValueError se vazio, invalido, grande demais ou
+    fora de limites (min, max).
+    """
+    texto = str(texto or "").strip()
+    if not texto:
+        raise ValueError("eixo vazio")
+
+    if ":" in texto:
+        partes = [float(p) for p in texto.split(":")]
+        if (
+            len(partes) != 3
+            or not np.all(np.isfinite(partes))
+            or partes[2] <= 0
+            or partes[1] < partes[0]
+        ):
+            raise ValueError(f"faixa invalida: {texto}")
+        inicio, fim, passo = partes
+        # Passo minusculo estoura para inf; compara antes de virar int.
+        with np.errstate(over="ignore"):
+            intervalos = (fim - inicio) / passo
+        if not np.isfinite(intervalos) or intervalos + 1 > maximo:
+            raise ValueError(f"faixa com mais de {maximo} pontos: {texto}")
+        quantidade = int(np.floor(intervalos + 1e-9)) + 1
+        valores = inicio + passo * np.arange(quantidade)
+    else:
+        valores = np.array(
+            [float(p) for p in texto.split(",") if p.strip()],
+            dtype=np.float64,
+        )
+        if not len(valores) or len(valores) > maximo:
+            raise ValueError(f"lista com 1 a {maximo} valores: {texto}")
+
+    if not np.all(np.isfinite(valores)) or np.any(valores < 0):
+        raise ValueError(f"valores invalidos: {texto}")
+    if limites is not None:
+        minimo, maximo_valor = limites
+        if np.any(valores < minimo) or np.any(valores > maximo_valor):
+            raise ValueError(
+                f"valores fora de {minimo:g} a {maximo_valor:g}: {texto}"
+            )
+    return valores
+
+
+def _scores_grade(dados_bairro, orcamentos, tickets, padrao_desejado, financia):
+    """
+    Mesmas regras de calcular_score_urbano para cada par
+    (orcamento, ticket), via indices na tabela densa de pesos.
+    """
+    pesos = obter_tabela_pesos()
+    padrao_desejado = str(padrao_desejado or "").lower()
+    desejado = NIVEIS_PADRAO.get(
+        padrao_desejado,
+        DESEJADO_DESCONHECIDO if padrao_desejado else 0,
+    )
+    nivel_bairro = NIVEIS_PADRAO.get(
+        str(dados_bairro.get("padrao_predominante") or "").lower(),
+        0,
+    )
+    nivel_socio = NIVEIS_PADRAO.get(
+        str(dados_bairro.get("perfil_socioeconomico") or "").lower(),
+        0,
+    )
+
+    orc = orcamentos[:, None]
+    valor = tickets[None, :]
+    comparavel = (valor > 0) & (orc > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        relacao = orc / np.where(valor > 0, valor, 1.0)
+    faixa = np.where(
+        comparavel,
+        np.searchsorted(pesos.relacao_limites, relacao, side="right"),
+        -1,
+    )
+    folga = (valor > 0) & (orc >= valor * pesos.desalinhamento_fator)
+
+    celulas = pesos.indice_celula(
+        nivel_bairro,
+        desejado,
+        nivel_socio,
+        faixa,
+        folga.astype(np.intp),
+        int(bool(financia)),
+    )
+    return pesos.celulas_score[celulas]
+
+
+def calcular_grade(
+    dados_bairro,
+    orcamentos,
+    areas,
+    prazos,
+    valor_imovel=0.0,
+    padrao_desejado="",
+    financia=False,
+    renda=0.0,
+    sistema="SAC",
+    cub=0.0,
+):
+    """
+    Grade de cenarios orcamento x area x prazo numa unica passada
+    vetorizada, com as regras do score urbano, de analisar_financeiro e
+    das metodologias construtivas.
+
+    Sem valor_imovel, o ticket de cada area e valor_m2_medio do bairro x
+    area (mesma leitura do ranking). Os arrays seguem a ordem dos eixos:
+    [orcamento][area], [area][prazo], [cenario][area] etc.; o total de
+    construcao e [cenario][metodologia][area] e a area maxima por
+    metodologia, [metodologia][cenario][orcamento].
+    """
+    orcamentos = np.asarray(orcamentos, dtype=np.float64)
+    areas = np.asarray(areas, dtype=np.float64)
+    prazos = np.maximum(np.asarray(prazos, dtype=np.int64), 1)
+    valor_imovel = _parse_float(valor_imovel)
+    renda = _parse_float(renda)
+    financia = bool(financia)
+
+    if valor_imovel > 0:
+        tickets = np.full(len(areas), valor_imovel)
+    else:
+        valor_m2 = _parse_float(dados_bairro.get("valor_m2_medio"))
+        tickets = valor_m2 * np.where(areas > 0, areas, AREA_REFERENCIA)
+
+    scores = _scores_grade(
+        dados_bairro,
+        orcamentos,
+        tickets,
+        padrao_desejado,
+        financia,
+    )
+    classes = {int(s): classificar_score(int(s)) for s in np.unique(scores)}
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percentual_ticket = np.where(
+            orcamentos[:, None] > 0,
+            tickets[None, :] / orcamentos[:, None] * 100,
+            0.0,
+        )
+
+    # Compra: total por cenario e saldo frente ao orcamento.
+    fatores = np.array(
+        [
+            1 + p["itbi"] + p["cartorio"] + p["adequacoes"] + p["reserva"]
+            for p in CENARIOS_COMPRA.values()
+        ]
+    )
+    tarifas = np.array(
+        [tarifa_bancaria(p, financia) for p in CENARIOS_COMPRA.values()]
+    )
+    total_compra = np.where(
+        tickets[None, :] > 0,
+        tickets[None, :] * fatores[:, None] + tarifas[:, None],
+        0.0,
+    )
+    saldo_compra = orcamentos[None, :, None] - total_compra[:, None, :]
+
+    # Construcao: custo por metodologia (mesma area e custo/m2 da tabela
+    # de metodologias do relatorio) e total por cenario sobre esse custo.
+    metodologias = custo_m2_metodologia(cub, padrao_desejado)
+    m2 = np.array([m["m2"] for m in metodologias])
+    area_ref = np.where(areas > 0, areas, AREA_REFERENCIA)
+    custo_metodologia = m2[:, None] * area_ref[None, :]
+    fatores_obra = np.array(
+        [1 + sum(p.values()) for p in CENARIOS_CONSTRUCAO.values()]
+    )
+    total_construcao = fatores_obra[:, None, None] * custo_metodologia[None]
+    # Area maxima pelo mesmo solver do relatorio e de /api/capacidade
+    # (com projetos, aprovacoes, infraestrutura e contingencia).
+    area_max = np.stack(
+        [
+            resolver_capacidade(
+                orcamento,
+                [],
+                cub=cub,
+                padrao=padrao_desejado,
+            )["area_maxima_construcao"]
+            for orcamento in orcamentos
+        ],
+        axis=-1,
+    )
+
+    resultado = {
+        "eixos": {
+            "orcamento": orcamentos.tolist(),
+            "area": areas.tolist(),
+            "prazo_meses": prazos.tolist(),
+        },
+        "ticket": tickets.tolist(),
+        "score": scores.tolist(),
+        "classificacao": [[classes[int(s)] for s in linha] for linha in scores],
+        "percentual_ticket_orcamento": percentual_ticket.tolist(),
+        "cenarios_compra": list(CENARIOS_COMPRA),
+        "total_compra": total_compra.tolist(),
+        "saldo_compra": saldo_compra.tolist(),
+        "metodologias": [m["metodologia"] for m in metodologias],
+        "custo_metodologia": custo_metodologia.tolist(),
+        "area_max_metodologia": area_max.tolist(),
+        "cenarios_construcao": list(CENARIOS_CONSTRUCAO),
+        "total_construcao": total_construcao.tolist(),
+    }
+
+    if financia:
+        saldo = tickets * (1 - ENTRADA_MINIMA)
+        parcela_simples = saldo[:, None] / prazos[None, :]
+        # Primeira parcela com juros e linear no principal: cronograma
+        # unitario por prazo, escalado pelo saldo de cada area.
+        s = 1 if str(sistema or "").upper() == "PRICE" else 0
+        unitario = calcular_cronogramas(
+            1.0,
+            [TAXAS_REFERENCIA[1]],
+            prazos,
+        )["primeira_parcela"][s, 0]
+        primeira = saldo[:, None] * unitario[None, :]
+        resultado.update(
+            {
+                "sistema": "PRICE" if s else "SAC",
+                "taxa_anual": TAXAS_REFERENCIA[1],
+                "entrada_minima": (tickets * ENTRADA_MINIMA).tolist(),
+                "parcela_estimada": parcela_simples.tolist(),
+                "primeira_parcela": primeira.tolist(),
+            }
+        )
+        if renda > 0:
+            resultado["comprometimento_renda"] = (
+                parcela_simples / renda * 100
+            ).tolist()
+            resultado["comprometimento_primeira_parcela"] = (
+                primeira / renda * 100
+            ).tolist()
+    return resultado
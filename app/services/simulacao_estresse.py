@@ -0,0 +1,198 @@
+import time
+
+import numpy as np
+
+from app.services.amortizacao import (
+    LIMITE_COMPROMETIMENTO,
+    limitar_prazo,
+    taxa_mensal,
+)
+from app.services.memo import MemoLRU, chave_canonica
+
+
+# Premissas orientativas por indexador (taxas anuais): media de longo
+# prazo, volatilidade e juros fixos tipicos somados ao indexador.
+INDEXADORES = {
+    "TR": {"media": 0.010, "volatilidade": 0.010, "juros_fixos": 0.1049},
+    "IPCA": {"media": 0.045, "volatilidade": 0.020, "juros_fixos": 0.0545},
+    "Selic": {"media": 0.105, "volatilidade": 0.030, "juros_fixos": 0.0300},
+}
+
+# Persistencia mensal dos choques (reversao a media).
+PERSISTENCIA = 0.97
+CAMINHOS_PADRAO = 2000
+LOTE_CAMINHOS = 250
+ORCAMENTO_MS_PADRAO = 300
+PERCENTIS = (5, 50, 95)
+# Meses por bloco na recorrencia do AR(1): phi^-60 ~ 6, sem overflow.
+BLOCO_MESES = 60
+
+_MEMO = MemoLRU(max_itens=256, ttl_segundos=6 * 3600)
+
+
+def _caminhos_indexador(rng, premissa, caminhos, meses):
+    """
+    Correcao mensal por caminho (caminhos x meses): AR(1) em torno da
+    media, montado por blocos de meses com soma acumulada ponderada (laco
+    so entre blocos).
+    """
+    media = taxa_mensal(premissa["media"])
+    # Choque calibrado para o desvio estacionario da taxa anual.
+    sigma = premissa["volatilidade"] / 12 * np.sqrt(1 - PERSISTENCIA ** 2)
+    choques = rng.standard_normal((caminhos, meses)) * sigma
+    desvio = np.empty_like(choques)
+    anterior = np.zeros(caminhos)
+    for inicio in range(0, meses, BLOCO_MESES):
+        bloco = choques[:, inicio:inicio + BLOCO_MESES]
+        k = np.arange(bloco.shape[1])
+        # x_(s+j) = phi^(j+1) x_(s-1) + phi^j * cumsum(e_(s+k) * phi^-k)
+        desvio[:, inicio:inicio + bloco.shape[1]] = (
+            np.cumsum(bloco * PERSISTENCIA ** -k, axis=1) * PERSISTENCIA ** k
+            + anterior[:, None] * PERSISTENCIA ** (k + 1)
+        )
+        anterior = desvio[:, inicio + bloco.shape[1] - 1]
+    return np.maximum(media + desvio, 0.0)
+
+
+def _parcelas(principal, juros_fixos, correcao, prazo, sistema):
+    """
+    Parcelas (caminhos x meses) com saldo corrigido pelo indexador:
+    no SAC a amortizacao e o saldo corrigido / meses restantes; na PRICE
+    a parcela inicial e reajustada pelo indice acumulado.
+    """
+    i = taxa_mensal(juros_fixos)
+    acumulado = np.cumprod(1 + correcao, axis=1)
+    if sistema == "PRICE":
+        pmt = principal * i / (1 - (1 + i) ** -prazo) if i > 0 else principal / prazo
+        return pmt * acumulado
+    restantes = prazo - np.arange(prazo)
+    return principal * acumulado * (1 + i * restantes) / prazo
+
+
+def _simular(principal, renda, prazo, sistema, caminhos, orcamento_ms, semente):
+    inicio = time.perf_counter()
+    sementes = np.random.SeedSequence(semente)
+    lotes = sementes.spawn(max(1, -(-caminhos // LOTE_CAMINHOS)))
+
+    resultados = {}
+    for nome, premissa in INDEXADORES.items():
+        resultados[nome] = {"parcelas": [], "totais": []}
+
+    concluidos = 0
+    for lote in lotes:
+        # Estourou o orcamento: descarta a simulacao em vez de devolver
+        # menos caminhos (o resultado dependeria da carga da maquina).
+        if concluidos and (time.perf_counter() - inicio) * 1000 > orcamento_ms:
+            return None
+        tamanho = min(LOTE_CAMINHOS, caminhos - concluidos)
+        rng = np.random.default_rng(lote)
+        for nome, premissa in INDEXADORES.items():
+            correcao = _caminhos_indexador(rng, premissa, tamanho, prazo)
+            parcelas = _parcelas(
+                principal,
+                premissa["juros_fixos"],
+                correcao,
+                prazo,
+                sistema,
+            )
+            resultados[nome]["parcelas"].append(parcelas)
+            resultados[nome]["totais"].append(parcelas.sum(axis=1))
+        concluidos += tamanho
+
+    cenarios = []
+    for nome, dados in resultados.items():
+        parcelas = np.concatenate(dados["parcelas"])
+        totais = np.concatenate(dados["totais"])
+        maximas = parcelas.max(axis=1)
+        linha = {
+            "indexador": nome,
+            "juros_fixos": INDEXADORES[nome]["juros_fixos"],
+            "parcela_maxima": dict(
+                zip(
+                    (f"p{p}" for p in PERCENTIS),
+                    np.percentile(maximas, PERCENTIS).tolist(),
+                )
+            ),
+            "total_pago": dict(
+                zip(
+                    (f"p{p}" for p in PERCENTIS),
+                    np.percentile(totais, PERCENTIS).tolist(),
+                )
+            ),
+            # Faixa da parcela no primeiro mes de cada ano do contrato.
+            "faixa_parcela_anual": {
+                f"p{p}": valores.tolist()
+                for p, valores in zip(
+                    PERCENTIS,
+                    np.percentile(parcelas[:, ::12], PERCENTIS, axis=0),
+                )
+            },
+            "prob_acima_limite": None,
+        }
+        if renda > 0:
+            acima = (parcelas > renda * LIMITE_COMPROMETIMENTO / 100).any(axis=1)
+            linha["prob_acima_limite"] = float(acima.mean())
+        cenarios.append(linha)
+
+    return {
+        "sistema": sistema,
+        "prazo_meses": prazo,
+        "caminhos": concluidos,
+        "semente": semente,
+        "cenarios": cenarios,
+    }
+
+
+def simular_estresse(
+    principal,
+    renda=0.0,
+    prazo_meses=360,
+    sistema="SAC",
+    caminhos=CAMINHOS_PADRAO,
+    orcamento_ms=ORCAMENTO_MS_PADRAO,
+):
+    """
+    Monte Carlo de caminhos de TR, IPCA e Selic corrigindo o saldo.
+    Retorna faixas de percentis da parcela e do total pago e a
+    probabilidade de a parcela passar de 30% da renda (renda constante
+    em valores nominais, leitura conservadora).
+
+    A semente vem do hash das entradas e cada lote de caminhos tem
+    semente propria: mesma entrada, mesmo resultado, sempre com todos os
+    caminhos. Se o orcamento de tempo estourar, retorna None (nada vai
+    para o cache e a proxima chamada tenta de novo); resultados completos
+    ficam em cache por hash das entradas.
+    """
+    principal = float(principal or 0)
+    if principal <= 0:
+        return None
+    renda = float(renda or 0)
+    prazo = limitar_prazo(prazo_meses)
+    sistema = "PRICE" if str(sistema or "").upper() == "PRICE" else "SAC"
+    caminhos = max(1, int(caminhos))
+
+    chave = chave_canonica(
+        "estresse",
+        round(principal, 2),
+        round(renda, 2),
+        prazo,
+        sistema,
+        caminhos,
+        INDEXADORES,
+        PERSISTENCIA,
+    )
+    semente = int(chave[:16], 16)
+    resultado = _MEMO.obter(chave)
+    if resultado is None:
+        resultado = _simular(
+            principal,
+            renda,
+            prazo,
+            sistema,
+            caminhos,
+            orcamento_ms,
+            semente,
+        )
+        if resultado is not None:
+            _MEMO.guardar(chave, resultado)
+    return resultado
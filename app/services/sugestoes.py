@@ -1,3 +1,6 @@
+import heapq
+
+
 def _parse_float(valor):
     if valor is None:
         return 0.0
@@ -20,8 +23,92 @@ def _fmt_moeda(valor):
     return f"R$ {valor:,.0f}".replace(",", ".")
 
 
+_NIVEL_PADRAO = {"economico": 1, "baixo": 1, "medio": 2, "alto": 3}
+
+# Janela de comprometimento aceita e alvo de encaixe:
+# usar ate ~70% do orcamento para manter folga tecnica.
+COMPROMETIMENTO_MIN = 0.30
+COMPROMETIMENTO_MAX = 0.95
+COMPROMETIMENTO_ALVO = 0.70
+
+
+def _indice_m2(store):
+    """
+    Por nivel de padrao: (valores_m2, posicoes) ordenados por m2, so com
+    valor_m2 > 0. Preparado uma vez por store.
+    """
+    niveis = {}
+    for posicao, (registro, valor_m2) in enumerate(
+        zip(store.registros, store.valor_m2_medio)
+    ):
+        if valor_m2 <= 0:
+            continue
+        nivel = _NIVEL_PADRAO.get(
+            str(registro.get("padrao_predominante") or "").lower(),
+            0,
+        )
+        niveis.setdefault(nivel, []).append((valor_m2, posicao))
+
+    indice = {}
+    for nivel, itens in niveis.items():
+        itens.sort()
+        indice[nivel] = (
+            [valor for valor, _ in itens],
+            [posicao for _, posicao in itens],
+        )
+    return indice
+
+
+def _bisect(valores, limiar, chave, estrito=False):
+    """
+    Primeira posicao cuja chave(valor) e >= limiar (> limiar se estrito).
+    A chave precisa ser nao decrescente em `valores`.
+    """
+    lo, hi = 0, len(valores)
+    while lo < hi:
+        meio = (lo + hi) // 2
+        atual = chave(valores[meio])
+        if atual < limiar or (estrito and atual == limiar):
+            lo = meio + 1
+        else:
+            hi = meio
+    return lo
+
+
+def _faixas_nivel(valores, chave):
+    """
+    Dois fluxos de posicoes na janela de comprometimento, partindo do
+    alvo: para baixo (comp < alvo) e para cima (comp >= alvo). Em cada um
+    a distancia ao alvo e nao decrescente.
+    """
+    inicio = _bisect(valores, COMPROMETIMENTO_MIN, chave)
+    fim = _bisect(valores, COMPROMETIMENTO_MAX, chave, estrito=True)
+    alvo = max(inicio, min(fim, _bisect(valores, COMPROMETIMENTO_ALVO, chave)))
+    return range(alvo - 1, inicio - 1, -1), range(alvo, fim)
+
+
+def _avancar(heap, fluxo, valores, posicoes, comprometimento):
+    """
+    Empilha o proximo item do fluxo com chave (dist, -comp, posicao).
+    """
+    for i in fluxo:
+        comp = comprometimento(valores[i])
+        heapq.heappush(
+            heap,
+            (
+                abs(COMPROMETIMENTO_ALVO - comp),
+                -comp,
+                posicoes[i],
+                fluxo,
+                valores,
+                posicoes,
+            ),
+        )
+        return
+
+
 def gerar_sugestoes(
-    df,
+    store,
     dados_bairro,
     score,
     orcamento,
@@ -31,6 +118,7 @@ def gerar_sugestoes(
 ):
     """
     Sugestoes com foco em poder financeiro e margem de seguranca.
+    `store` e o BairroStore da base (sem pandas).
     """
     score_valor = (score or {}).get("valor", 0)
     if score_valor >= 75:
@@ -38,69 +126,63 @@ def gerar_sugestoes(
 
     orcamento = _parse_float(orcamento)
     area = _parse_float(area)
-    if orcamento <= 0:
+    if orcamento <= 0 or limite <= 0:
         return []
 
     bairro_atual = dados_bairro.get("bairro")
-    padrao_desejado = str(padrao or "").lower()
-    ordem = {"economico": 1, "baixo": 1, "medio": 2, "alto": 3}
-    nivel_desejado = ordem.get(padrao_desejado, 0)
-
-    candidatos = []
-    for _, row in df.iterrows():
-        bairro = row.get("bairro")
-        if bairro == bairro_atual:
-            continue
-
-        padrao_bairro = str(row.get("padrao_predominante") or "").lower()
-        nivel_bairro = ordem.get(padrao_bairro, 0)
+    nivel_desejado = _NIVEL_PADRAO.get(str(padrao or "").lower(), 0)
 
+    if nivel_desejado:
         # Mantem proximidade de padrao, mas sem forcar bairro muito abaixo.
-        if (
-            nivel_desejado
-            and nivel_bairro
-            and abs(nivel_bairro - nivel_desejado) > 1
-        ):
+        niveis = (0, nivel_desejado - 1, nivel_desejado, nivel_desejado + 1)
+    else:
+        niveis = tuple(_NIVEL_PADRAO.values()) + (0,)
+
+    area_ref = area if area > 0 else 180.0
+
+    def comprometimento(valor_m2):
+        return valor_m2 * area_ref / orcamento
+
+    # Evita bairros inviaveis e bairros com ticket muito distante: cada
+    # nivel vira dois fluxos ordenados pela distancia ao alvo, mesclados
+    # por heap a partir do ponto alvo.
+    indice = store.derivado("indice_m2", _indice_m2)
+    heap = []
+    for nivel in set(niveis):
+        if nivel not in indice:
             continue
+        valores, posicoes = indice[nivel]
+        for faixa in _faixas_nivel(valores, comprometimento):
+            fluxo = iter(faixa)
+            _avancar(heap, fluxo, valores, posicoes, comprometimento)
 
-        valor_m2 = _parse_float(row.get("valor_m2_medio"))
-        if valor_m2 <= 0:
-            continue
-
-        area_ref = area if area > 0 else 180.0
-        custo_estimado = valor_m2 * area_ref
-        comprometimento = custo_estimado / orcamento
-        folga = 1 - comprometimento
-
-        # Evita bairros inviaveis e bairros com ticket muito distante.
-        if comprometimento > 0.95:
-            continue
-        if comprometimento < 0.30:
+    registros = store.registros
+    candidatos = []
+    corte = None
+    while heap:
+        dist, comp_neg, posicao, fluxo, valores, posicoes = heapq.heappop(heap)
+        if corte is not None and dist > corte:
+            break
+        _avancar(heap, fluxo, valores, posicoes, comprometimento)
+        if registros[posicao].get("bairro") == bairro_atual:
             continue
+        candidatos.append((dist, comp_neg, posicao))
+        if corte is None and len(candidatos) >= limite:
+            # Empates na distancia de corte ainda entram no desempate.
+            corte = dist
 
-        # Alvo de encaixe:
-        # usar ate ~70% do orcamento para manter folga tecnica.
-        distancia_alvo = abs(0.70 - comprometimento)
-        candidatos.append(
-            {
-                "bairro": bairro,
-                "padrao": padrao_bairro or "nao informado",
-                "custo": custo_estimado,
-                "comp": comprometimento,
-                "folga": folga,
-                "dist": distancia_alvo,
-            }
-        )
-
-    candidatos.sort(key=lambda c: (c["dist"], -c["comp"]))
+    candidatos.sort()
 
     sugestoes = []
-    for c in candidatos[:limite]:
+    for _, comp_neg, posicao in candidatos[:limite]:
+        comp = -comp_neg
+        folga = 1 - comp
         sugestoes.append(
             (
-                f"{c['bairro']} - Custo estimado de {_fmt_moeda(c['custo'])} "
-                f"para a area informada, comprometendo {c['comp']*100:.1f}% "
-                f"do orçamento e mantendo folga de {c['folga']*100:.1f}%."
+                f"{registros[posicao].get('bairro')} - Custo estimado de "
+                f"{_fmt_moeda(store.valor_m2_medio[posicao] * area_ref)} "
+                f"para a area informada, comprometendo {comp*100:.1f}% "
+                f"do orçamento e mantendo folga de {folga*100:.1f}%."
             )
         )
 
@@ -1,5 +1,8 @@
 # app/services/sugestoes_bairros.py
 
+from app.services.bairro_store import BairroStore
+from app.services.indice_bairros import obter_indice_bairros
+
 
 def _to_float(valor):
     if valor is None:
@@ -20,22 +23,28 @@ def gerar_sugestoes_bairros(**kwargs):
     porem com melhor compatibilidade financeira.
 
     Aceita **kwargs para garantir compatibilidade arquitetural
-    e evitar quebras no routes.
+    e evitar quebras no routes. A base vem em `store` (BairroStore);
+    `df` (DataFrame) segue aceito por compatibilidade.
     """
 
+    store = kwargs.get("store")
     df = kwargs.get("df")
     bairro_atual = kwargs.get("bairro_atual")
     orcamento = _to_float(kwargs.get("orcamento"))
     limite = kwargs.get("limite", 5)
 
-    if df is None or bairro_atual is None:
-        return []
-    if "bairro" not in df.columns:
+    if store is None and df is not None:
+        if "bairro" not in df.columns:
+            return []
+        store = BairroStore.de_registros(df.to_dict("records"))
+    if store is None or bairro_atual is None:
         return []
-    if bairro_atual not in df["bairro"].values:
+
+    atual = obter_indice_bairros(store).buscar(bairro_atual)
+    if atual is None:
         return []
 
-    atual = df[df["bairro"] == bairro_atual].iloc[0]
+    bairro_atual = atual.get("bairro")
     regiao_atual = atual.get("regiao")
     perfil_atual = atual.get("perfil_socioeconomico")
     padrao_atual = (atual.get("padrao_predominante") or atual.get("padrao_urbano") or "").lower()
@@ -45,7 +54,7 @@ def gerar_sugestoes_bairros(**kwargs):
     score_padrao_atual = padrao_map.get(padrao_atual, 0)
 
     candidatos = []
-    for _, row in df.iterrows():
+    for row in store.registros:
         if row.get("bairro") == bairro_atual:
             continue
         if regiao_atual and row.get("regiao") != regiao_atual:
@@ -1,5 +1,6 @@
-import pandas as pd
-from pathlib import Path
+import math
+
+from app.services.indice_bairros import buscar_bairro
 
 
 # ==============================
@@ -53,20 +54,16 @@ def obter_dados_urbanos(bairro: str) -> dict:
     aplicando inferência regional quando necessário.
     """
 
-    base_dir = Path(__file__).resolve().parents[2]
-    caminho = base_dir / "data" / "bairros_cuiaba.csv"
-
-    df = pd.read_csv(caminho)
-
-    linha = df[df["bairro"].str.lower() == bairro.lower()].iloc[0]
+    linha = buscar_bairro(bairro) or {}
 
-    regiao = linha.get("regiao", "").strip()
+    regiao = str(linha.get("regiao") or "").strip()
 
     inferencia = INFERENCIAS_REGIAO.get(regiao, {})
 
     def resolver(campo, texto_padrao):
         valor = linha.get(campo)
-        if pd.isna(valor) or str(valor).strip() == "":
+        vazio = isinstance(valor, float) and math.isnan(valor)
+        if valor is None or vazio or str(valor).strip() == "":
             return inferencia.get(campo, texto_padrao)
         return str(valor)
 
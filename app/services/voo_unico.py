@@ -0,0 +1,59 @@
+import threading
+
+
+class _Voo:
+    __slots__ = ("evento", "resultado", "erro")
+
+    def __init__(self):
+        self.evento = threading.Event()
+        self.resultado = None
+        self.erro = None
+
+
+class VooUnico:
+    """
+    Uma execucao em andamento por chave, por processo (single-flight):
+    quem chega enquanto ela roda espera e recebe o mesmo resultado (ou a
+    mesma excecao) em vez de repetir o trabalho.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._voos = {}
+        self._executados = 0
+        self._compartilhados = 0
+
+    def executar(self, chave, funcao, *args, **kwargs):
+        with self._lock:
+            voo = self._voos.get(chave)
+            lider = voo is None
+            if lider:
+                voo = self._voos[chave] = _Voo()
+                self._executados += 1
+            else:
+                self._compartilhados += 1
+
+        if not lider:
+            voo.evento.wait()
+            if voo.erro is not None:
+                raise voo.erro
+            return voo.resultado
+
+        try:
+            voo.resultado = funcao(*args, **kwargs)
+        except BaseException as exc:
+            voo.erro = exc
+            raise
+        finally:
+            with self._lock:
+                self._voos.pop(chave, None)
+            voo.evento.set()
+        return voo.resultado
+
+    def estatisticas(self):
+        with self._lock:
+            return {
+                "em_andamento": len(self._voos),
+                "executados": self._executados,
+                "compartilhados": self._compartilhados,
+            }
@@ -0,0 +1,50 @@
+import argparse
+import sys
+import pathlib
+
+# Permite rodar direto: python scripts/atualizar_base.py [--concorrencia 8]
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from app.services.scraping.atualizador_base import CAMINHO, atualizar_base
+from app.services.scraping.coletor import (
+    CONCORRENCIA,
+    PRAZO_SEGUNDOS,
+    TAXA_POR_THREAD,
+)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(
+        description="Recoleta o m2 dos bairros vencidos na base CSV.",
+    )
+    parser.add_argument("--caminho", default=str(CAMINHO))
+    parser.add_argument("--concorrencia", type=int, default=CONCORRENCIA)
+    parser.add_argument(
+        "--prazo",
+        type=float,
+        default=PRAZO_SEGUNDOS,
+        help="segundos ate desistir das coletas restantes",
+    )
+    parser.add_argument(
+        "--rps",
+        type=float,
+        default=None,
+        help="requisicoes/s por host (padrao: concorrencia x "
+        f"{TAXA_POR_THREAD:g})",
+    )
+    args = parser.parse_args(argv)
+    try:
+        resumo = atualizar_base(
+            args.caminho,
+            concorrencia=args.concorrencia,
+            prazo_segundos=args.prazo,
+            requisicoes_por_segundo=args.rps,
+        )
+    except (OSError, ValueError, KeyError) as exc:
+        print(f"Atualizacao cancelada: {exc}")
+        return 1
+    return 0 if not resumo["falhas"] and not resumo["pendentes"] else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
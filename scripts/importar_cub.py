@@ -0,0 +1,38 @@
+import sys
+import pathlib
+
+# Permite rodar direto: python scripts/importar_cub.py tabela.csv [outra.pdf ...]
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from app.services.cub_ingestao import importar_cub
+
+
+def main(argv):
+    if not argv:
+        print("Uso: python scripts/importar_cub.py ARQUIVO [ARQUIVO ...]")
+        print("Formatos: .csv, .xlsx (openpyxl), .pdf (pdftotext) ou .txt")
+        return 1
+    try:
+        resumo = importar_cub([pathlib.Path(a) for a in argv])
+    except (OSError, ValueError) as exc:
+        print(f"Importacao cancelada: {exc}")
+        return 1
+    print(
+        f"Serie gravada em {resumo['destino']}: "
+        f"{resumo['competencias']} competencias, "
+        f"importadas {', '.join(resumo['importadas'])}"
+    )
+    if resumo["interpoladas"]:
+        print(f"Interpoladas: {', '.join(resumo['interpoladas'])}")
+    if resumo["descartadas"]:
+        print(
+            "Descartadas (sem os tres padroes): "
+            f"{', '.join(resumo['descartadas'])}"
+        )
+    for aviso in resumo["avisos"]:
+        print(f"Aviso: {aviso}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
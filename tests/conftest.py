@@ -0,0 +1,5 @@
+import sys
+import pathlib
+
+# Permite rodar `pytest` da raiz sem instalar o pacote.
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
@@ -0,0 +1,54 @@
+import pytest
+
+from app.main import create_app
+
+
+@pytest.fixture
+def cliente():
+    return create_app().test_client()
+
+
+@pytest.mark.parametrize(
+    "consulta",
+    [
+        "orcamento=1&prazo=100000000&financiar=1",
+        "orcamento=1e12",
+        "orcamento=500000&area=1e9",
+        "orcamento=500000&prazo=0:1e400:1",
+        "orcamento=0:1e9:1e-300",
+        "orcamento=500000&area=0:1:1e-320",
+    ],
+)
+def test_sensibilidade_recusa_eixos_fora_da_faixa(cliente, consulta):
+    resposta = cliente.get(f"/api/sensibilidade?{consulta}")
+    assert resposta.status_code == 400
+    assert resposta.get_json()["ok"] is False
+
+
+def test_sensibilidade_aceita_prazo_maximo(cliente):
+    resposta = cliente.get(
+        "/api/sensibilidade?orcamento=500000&area=100&prazo=420&financiar=1"
+    )
+    assert resposta.status_code == 200
+    assert resposta.get_json()["eixos"]["prazo_meses"] == [420]
+
+
+@pytest.mark.parametrize(
+    "consulta",
+    [
+        "orcamento=500000&financiar=1&renda=20000&prazo=50000000",
+        "orcamento=500000&financiar=1&prazo=421",
+        "orcamento=1e12",
+    ],
+)
+def test_capacidade_recusa_prazo_ou_orcamento_fora_da_faixa(cliente, consulta):
+    resposta = cliente.get(f"/api/capacidade?{consulta}")
+    assert resposta.status_code == 400
+    assert resposta.get_json()["ok"] is False
+
+
+def test_capacidade_aceita_prazo_maximo(cliente):
+    resposta = cliente.get(
+        "/api/capacidade?orcamento=500000&financiar=1&renda=20000&prazo=420"
+    )
+    assert resposta.status_code == 200
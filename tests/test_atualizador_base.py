@@ -0,0 +1,68 @@
+import json
+
+from app.services.scraping import atualizador_base
+
+CSV = (
+    "bairro,regiao,ativo,valor_m2_medio,origem_valor,observacoes\n"
+    'Centro,Central,TRUE,4000,planilha,"Uso misto, comercio"\n'
+    "Jardim,Leste,TRUE,5000,planilha,\n"
+    "Lento,Sul,FALSE,3000,planilha,"
+)
+
+
+def _coletor(valores, pendentes=()):
+    def coletar(bairros, tipos, **kwargs):
+        return {
+            "valores": {(b, t): valores.get(b) for b in bairros for t in tipos
+                        if b not in pendentes},
+            "falhas": {},
+            "pendentes": [(b, t) for b in bairros for t in tipos if b in pendentes],
+            "duracao_segundos": 0.0,
+        }
+
+    return coletar
+
+
+def test_atualiza_valor_m2_medio_sem_reformatar(tmp_path, monkeypatch):
+    caminho = tmp_path / "bairros.csv"
+    caminho.write_bytes(CSV.encode("utf-8"))
+    monkeypatch.setattr(
+        atualizador_base,
+        "coletar_valores",
+        _coletor({"Centro": 4321.5, "Jardim": None}, pendentes=("Lento",)),
+    )
+
+    resumo = atualizador_base.atualizar_base(caminho, progresso=None)
+
+    esperado = CSV.replace(
+        "Centro,Central,TRUE,4000,planilha",
+        "Centro,Central,TRUE,4321.50,scraping",
+    )
+    assert caminho.read_text(encoding="utf-8") == esperado
+    datas = json.loads(
+        atualizador_base.caminho_datas(caminho).read_text(encoding="utf-8")
+    )
+    assert set(datas) == {"Centro", "Jardim"}
+    assert resumo["atualizados"] == 2
+    assert resumo["pendentes"] == [("Lento", "casa")]
+
+
+def test_bairros_recentes_nao_sao_recoletados(tmp_path, monkeypatch):
+    caminho = tmp_path / "bairros.csv"
+    caminho.write_bytes(CSV.encode("utf-8"))
+    monkeypatch.setattr(
+        atualizador_base,
+        "coletar_valores",
+        _coletor({"Centro": 1.0, "Jardim": 1.0, "Lento": 1.0}),
+    )
+    atualizador_base.atualizar_base(caminho, progresso=None)
+    texto = caminho.read_text(encoding="utf-8")
+
+    monkeypatch.setattr(
+        atualizador_base,
+        "coletar_valores",
+        lambda *a, **k: (_ for _ in ()).throw(AssertionError("recoletou")),
+    )
+    resumo = atualizador_base.atualizar_base(caminho, progresso=None)
+    assert resumo["atualizados"] == 0
+    assert caminho.read_text(encoding="utf-8") == texto
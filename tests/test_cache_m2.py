@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+from app.services.cache_m2 import CacheM2
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CacheM2(tmp_path / "m2.sqlite3", validade_horas=24)
+
+
+def test_wal_e_acerto_apos_gravar(cache):
+    modo = cache._conexao().execute("PRAGMA journal_mode").fetchone()[0]
+    assert modo == "wal"
+    assert cache.obter("Savassi", "apartamento") == {}
+
+    cache.gravar_sucesso("Savassi", "apartamento", 12500, "zap", "2026-01-10T08:00:00")
+    assert cache.obter("Savassi", "apartamento") == {
+        "bairro": "Savassi",
+        "tipo": "apartamento",
+        "valor": 12500.0,
+        "fonte": "zap",
+        "coletado_em": "2026-01-10T08:00:00",
+        "expira_em": "2026-01-11T08:00:00",
+    }
+    # Outra instancia (outro worker) le o mesmo arquivo.
+    outro = CacheM2(cache.caminho)
+    assert outro.obter("Savassi", "apartamento")["valor"] == 12500.0
+
+
+def test_falha_mantem_ultimo_valor(cache):
+    cache.gravar_sucesso("Savassi", "casa", 9000, "zap", "2026-01-10T08:00:00")
+    cache.gravar_falha("Savassi", "casa", "olx", "2026-01-12T08:00:00", 6)
+    registro = cache.obter("Savassi", "casa")
+    assert registro["valor"] == 9000.0
+    assert registro["status"] == "falha"
+    assert registro["fonte"] == "zap"
+    assert registro["expira_em"] == "2026-01-11T08:00:00"
+
+    cache.gravar_falha("Lourdes", "casa", "olx", "2026-01-12T08:00:00", 6)
+    registro = cache.obter("Lourdes", "casa")
+    assert "valor" not in registro
+    assert registro["expira_em"] == "2026-01-12T14:00:00"
+
+    cache.gravar_sucesso("Savassi", "casa", 9100, "olx", "2026-01-13T08:00:00")
+    assert "status" not in cache.obter("Savassi", "casa")
+    assert cache.estatisticas()["registros"] == 2
+    assert cache.estatisticas()["falhas"] == 1
+
+
+def test_vencidos_em_ordem_de_expiracao(cache):
+    cache.gravar_sucesso("A", "casa", 1, "zap", "2026-01-10T08:00:00")
+    cache.gravar_sucesso("B", "casa", 1, "zap", "2026-01-09T08:00:00")
+    cache.gravar_sucesso("C", "casa", 1, "zap", "2026-01-20T08:00:00")
+
+    agora = "2026-01-12T00:00:00"
+    assert cache.vencidos(agora=agora) == [("B", "casa"), ("A", "casa")]
+    assert cache.vencidos(limite=1, agora=agora) == [("B", "casa")]
+
+
+def test_json_legado_migrado_uma_vez(tmp_path):
+    legado = tmp_path / "mercado_m2_cache.json"
+    legado.write_text(
+        json.dumps(
+            {
+                "Savassi|apartamento": {
+                    "valor": 12000,
+                    "fonte": "zap",
+                    "coletado_em": "2026-01-10T08:00:00",
+                },
+                "Lourdes|casa": {
+                    "status": "falha",
+                    "falha_em": "2026-01-10T08:00:00",
+                    "cooldown_horas": 12,
+                },
+                "sem-separador": {"valor": 1},
+            }
+        ),
+        encoding="utf-8",
+    )
+    cache = CacheM2(tmp_path / "m2.sqlite3", json_legado=legado, validade_horas=24)
+    assert cache.obter("Savassi", "apartamento")["expira_em"] == "2026-01-11T08:00:00"
+    assert cache.obter("Lourdes", "casa")["expira_em"] == "2026-01-10T20:00:00"
+    assert cache.estatisticas() == {
+        "caminho": str(cache.caminho),
+        "registros": 2,
+        "falhas": 1,
+    }
+
+    # Reabrir com o JSON alterado nao reimporta: o esquema ja esta na versao.
+    legado.write_text(json.dumps({"Novo|casa": {"valor": 1}}), encoding="utf-8")
+    reaberto = CacheM2(cache.caminho, json_legado=legado)
+    assert reaberto.obter("Novo", "casa") == {}
+    assert reaberto.estatisticas()["registros"] == 2
@@ -0,0 +1,6 @@
+from app.services.capacidade import ticket_maximo_renda
+
+
+def test_ticket_maximo_renda_limita_prazo():
+    assert ticket_maximo_renda(20000, 50000000) == ticket_maximo_renda(20000, 420)
+    assert ticket_maximo_renda(20000, 420) > ticket_maximo_renda(20000, 360)
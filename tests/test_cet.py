@@ -0,0 +1,85 @@
+import json
+
+import numpy as np
+import pytest
+
+from app.services import cet
+from app.services.amortizacao import calcular_cronogramas
+
+
+def _tabela(**banco):
+    dados = {
+        "instituicao": "Banco Teste",
+        "taxa_anual": 0.11,
+        "prazo_maximo": 420,
+        "sistemas": ["SAC", "PRICE"],
+        **banco,
+    }
+    return cet.compilar_bancos(json.dumps({"bancos": [dados]}))
+
+
+@pytest.fixture
+def usar_tabela(monkeypatch):
+    def aplicar(tabela):
+        cet._MEMO_CET.limpar()
+        monkeypatch.setattr(cet, "obter_tabela_bancos", lambda: tabela)
+        monkeypatch.setattr(cet, "versao_bancos", lambda: id(tabela))
+
+    yield aplicar
+    cet._MEMO_CET.limpar()
+
+
+def _cet_bissecao(pagamentos, liquido):
+    """
+    TIR mensal por bissecao, independente do Newton do modulo.
+    """
+    t = np.arange(1, len(pagamentos) + 1)
+    baixo, alto = 0.0, 1.0
+    for _ in range(200):
+        meio = (baixo + alto) / 2
+        if (pagamentos / (1 + meio) ** t).sum() > liquido:
+            baixo = meio
+        else:
+            alto = meio
+    return (1 + meio) ** 12 - 1
+
+
+def test_sem_custos_cet_igual_a_taxa(usar_tabela):
+    usar_tabela(_tabela())
+    linhas = cet.comparar_bancos(300000, valor_imovel=400000, prazos=[360])
+    assert {l["sistema"] for l in linhas} == {"SAC", "PRICE"}
+    for linha in linhas:
+        assert linha["cet_anual"] == pytest.approx(0.11, abs=1e-9)
+
+
+@pytest.mark.parametrize("principal", [7400, 12400, 250000])
+def test_cet_com_tarifas_confere_com_bissecao(usar_tabela, principal):
+    usar_tabela(
+        _tabela(
+            seguro_mip_mensal=0.0002,
+            seguro_dfi_mensal=0.0001,
+            tarifa_mensal=25,
+            tarifas_iniciais=3000,
+        )
+    )
+    valor_imovel = principal / 0.8
+    linhas = cet.comparar_bancos(principal, valor_imovel=valor_imovel, prazos=[360])
+
+    cron = calcular_cronogramas(principal, [0.11], [360])
+    for linha in linhas:
+        s = 0 if linha["sistema"] == "SAC" else 1
+        pagamentos = (
+            cron["parcelas"][s, 0, 0]
+            + cron["saldo_devedor"][s, 0, 0] * 0.0002
+            + valor_imovel * 0.0001
+            + 25
+        )
+        esperado = _cet_bissecao(pagamentos, principal - 3000)
+        assert linha["cet_anual"] == pytest.approx(esperado, abs=1e-8)
+
+
+def test_cet_nao_depende_de_faixa(usar_tabela):
+    usar_tabela(_tabela(tarifas_iniciais=3000))
+    a = cet.comparar_bancos(7400, prazos=[360])
+    b = cet.comparar_bancos(7600, prazos=[360])
+    assert a[0]["cet_anual"] != pytest.approx(b[0]["cet_anual"], abs=1e-4)
@@ -0,0 +1,141 @@
+import time
+from email.utils import formatdate
+
+import pytest
+import requests
+
+from app.services.scraping import cliente_http
+from app.services.scraping.cliente_http import BaldeTokens, ClienteScraping
+
+
+class _Resposta:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class _SessaoFalsa:
+    """
+    Devolve (ou levanta) os itens de `roteiro` em ordem, um por GET.
+    """
+
+    def __init__(self, roteiro):
+        self.roteiro = list(roteiro)
+        self.chamadas = []
+
+    def get(self, url, **kwargs):
+        self.chamadas.append((url, kwargs))
+        item = self.roteiro.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+
+@pytest.fixture
+def esperas(monkeypatch):
+    registradas = []
+    monkeypatch.setattr(cliente_http.time, "sleep", registradas.append)
+    return registradas
+
+
+def _cliente(roteiro, tentativas=3):
+    cliente = ClienteScraping(
+        requisicoes_por_segundo=1000,
+        rajada=100,
+        tentativas=tentativas,
+        espera_base=0,
+    )
+    sessao = _SessaoFalsa(roteiro)
+    cliente._sessao_atual = lambda: sessao
+    return cliente, sessao
+
+
+def test_retenta_status_retentaveis(esperas):
+    cliente, sessao = _cliente([_Resposta(503), _Resposta(429), _Resposta(200)])
+    resposta = cliente.get("https://portal.exemplo/m2", fonte="portal", timeout=4)
+
+    assert resposta.status_code == 200
+    assert len(sessao.chamadas) == 3
+    assert sessao.chamadas[0] == ("https://portal.exemplo/m2", {"timeout": 4})
+    assert esperas == [0, 0]
+
+
+def test_nao_retenta_erro_do_cliente(esperas):
+    cliente, sessao = _cliente([_Resposta(404), _Resposta(200)])
+    assert cliente.get("https://portal.exemplo/x").status_code == 404
+    assert len(sessao.chamadas) == 1
+
+
+def test_respeita_retry_after(esperas):
+    data_http = formatdate(time.time() + 20, usegmt=True)
+    cliente, _ = _cliente(
+        [
+            _Resposta(429, {"Retry-After": "7"}),
+            _Resposta(503, {"Retry-After": data_http}),
+            _Resposta(200),
+        ]
+    )
+    cliente.espera_maxima = 15
+    assert cliente.get("https://portal.exemplo/x").status_code == 200
+    # Segundos literais; data HTTP limitada por espera_maxima.
+    assert esperas == [7.0, 15]
+
+
+def test_devolve_ultima_resposta_quando_esgota(esperas):
+    ultima = _Resposta(502)
+    cliente, _ = _cliente([_Resposta(503), ultima], tentativas=2)
+    assert cliente.get("https://portal.exemplo/x") is ultima
+
+
+def test_levanta_ultima_excecao(esperas):
+    erro = requests.ConnectionError("recusada")
+    cliente, _ = _cliente([requests.Timeout("lento"), erro], tentativas=2)
+    with pytest.raises(requests.ConnectionError) as exc:
+        cliente.get("https://portal.exemplo/x")
+    assert exc.value is erro
+
+
+def test_excecao_seguida_de_resposta(esperas):
+    cliente, _ = _cliente([requests.Timeout("lento"), _Resposta(200)])
+    assert cliente.get("https://portal.exemplo/x").status_code == 200
+
+
+def test_metricas_por_fonte(esperas):
+    cliente, _ = _cliente(
+        [
+            _Resposta(503),
+            _Resposta(200),
+            requests.Timeout("lento"),
+            _Resposta(200),
+            _Resposta(200),
+        ]
+    )
+    cliente.get("https://a.exemplo/1", fonte="portal_a")
+    cliente.get("https://a.exemplo/2", fonte="portal_a")
+    cliente.get("https://B.exemplo/1")
+
+    metricas = cliente.metricas()
+    assert set(metricas) == {"portal_a", "b.exemplo"}
+    assert metricas["portal_a"]["tentativas"] == 4
+    assert metricas["portal_a"]["status"] == {"503": 1, "200": 2, "erro": 1}
+    assert metricas["b.exemplo"]["status"] == {"200": 1}
+    assert metricas["portal_a"]["latencia_max_ms"] >= 0
+
+
+def test_um_balde_por_host():
+    cliente = ClienteScraping()
+    assert cliente._balde("a.exemplo") is cliente._balde("a.exemplo")
+    assert cliente._balde("a.exemplo") is not cliente._balde("b.exemplo")
+
+
+def test_balde_libera_rajada_e_depois_a_taxa():
+    balde = BaldeTokens(taxa=20, capacidade=3)
+    inicio = time.monotonic()
+    for _ in range(3):
+        balde.consumir()
+    assert time.monotonic() - inicio < 0.03
+
+    for _ in range(2):
+        balde.consumir()
+    # Dois tokens a 20/s: ~0,1 s depois de esgotada a rajada.
+    assert time.monotonic() - inicio >= 0.09
@@ -0,0 +1,82 @@
+import threading
+import time
+
+from app.services.scraping import coletor
+from app.services.scraping.cliente_http import CLIENTE, obter
+
+
+def test_coleta_escala_com_concorrencia():
+    def extrator(bairro, tipo):
+        time.sleep(0.05)
+        return 1000.0
+
+    bairros = [f"b{i}" for i in range(20)]
+    inicio = time.monotonic()
+    resultado = coletor.coletar_valores(bairros, extrator=extrator, concorrencia=20)
+    assert time.monotonic() - inicio < 0.5
+    assert len(resultado["valores"]) == 40
+    assert not resultado["falhas"] and not resultado["pendentes"]
+
+
+def test_taxa_por_host_acompanha_concorrencia():
+    vistos = []
+
+    def extrator(bairro, tipo):
+        balde = CLIENTE._balde("portal.exemplo")
+        vistos.append((balde.taxa, balde.capacidade))
+        return None
+
+    anterior = CLIENTE._balde("portal.exemplo")
+    coletor.coletar_valores(["a"], extrator=extrator, concorrencia=8)
+    assert vistos[0] == (8 * coletor.TAXA_POR_THREAD, 8)
+    assert CLIENTE._balde("portal.exemplo") is anterior
+
+
+def test_limite_do_pool_sobrevive_ao_prazo():
+    liberar = threading.Event()
+    vistos = []
+
+    def extrator(bairro, tipo):
+        liberar.wait(2)
+        vistos.append(CLIENTE._balde("portal.exemplo").taxa)
+        return 1.0
+
+    resultado = coletor.coletar_valores(
+        ["lento"],
+        tipos=("casa",),
+        extrator=extrator,
+        concorrencia=4,
+        prazo_segundos=0.05,
+    )
+    assert resultado["pendentes"] == [("lento", "casa")]
+
+    # Outra coleta em paralelo nao troca o limite da que ficou rodando.
+    coletor.coletar_valores(
+        ["b"],
+        tipos=("casa",),
+        extrator=lambda *_: None,
+        concorrencia=1,
+    )
+    liberar.set()
+    for _ in range(100):
+        if vistos:
+            break
+        time.sleep(0.02)
+    assert vistos == [4 * coletor.TAXA_POR_THREAD]
+    assert CLIENTE._balde("portal.exemplo").taxa == CLIENTE.requisicoes_por_segundo
+
+
+def test_prazo_devolve_pendentes():
+    def extrator(bairro, tipo):
+        time.sleep(1 if bairro == "lento" else 0)
+        return 1.0
+
+    resultado = coletor.coletar_valores(
+        ["rapido", "lento"],
+        tipos=("casa",),
+        extrator=extrator,
+        concorrencia=2,
+        prazo_segundos=0.3,
+    )
+    assert resultado["valores"] == {("rapido", "casa"): 1.0}
+    assert resultado["pendentes"] == [("lento", "casa")]
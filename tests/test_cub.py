@@ -0,0 +1,76 @@
+import json
+
+import pytest
+
+from app.services.cub import SerieCub
+from app.services.cub_ingestao import importar_cub, mesclar_serie
+
+
+def _base():
+    return {
+        "cidade": "Cuiaba-MT",
+        "series": [
+            {"competencia": "2025-05", "economico": 2100, "medio": 2900, "alto": 3800},
+        ],
+    }
+
+
+def test_serie_sem_valor_usa_ultimo_conhecido():
+    serie = SerieCub(
+        {
+            "series": [
+                {"competencia": "2025-05", "economico": 2100, "medio": 2900},
+                {
+                    "competencia": "2025-06",
+                    "economico": 2200,
+                    "origem": {"economico": "importado"},
+                },
+            ]
+        }
+    )
+    assert serie.valores("2025-07", ["economico", "medio", "alto"]) == [
+        (2200.0, "2025-06", "importado"),
+        (2900.0, "2025-05", "manual"),
+        (0.0, "", ""),
+    ]
+
+
+def test_serie_sem_dado_anterior_nao_vira_manual():
+    serie = SerieCub({"series": [{"competencia": "2025-06", "economico": 2200}]})
+    assert serie.valores("2025-07", "medio") == [(0.0, "", "")]
+
+
+def test_mesclar_limita_a_competencias_com_tres_padroes():
+    nova = mesclar_serie(
+        _base(),
+        {
+            "2025-07": {"economico": 2300, "medio": 3100, "alto": 4000},
+            "2025-08": {"economico": 2350},
+        },
+    )
+    competencias = [item["competencia"] for item in nova["series"]]
+    assert competencias == ["2025-05", "2025-06", "2025-07"]
+    assert nova["descartadas"] == ["2025-08"]
+    for item in nova["series"]:
+        assert all(item[p] > 0 for p in ("economico", "medio", "alto"))
+    assert nova["series"][1]["origem"]["medio"] == "interpolado"
+
+
+def test_mesclar_sem_competencia_comum():
+    with pytest.raises(ValueError):
+        mesclar_serie({"series": []}, {"2025-06": {"economico": 2200}})
+
+
+def test_importar_nao_grava_descartadas(tmp_path):
+    destino = tmp_path / "cub.json"
+    destino.write_text(json.dumps(_base()), encoding="utf-8")
+    tabela = tmp_path / "cub.csv"
+    tabela.write_text(
+        "competencia,economico,medio,alto\n2025-06,2150,2950,3850\n2025-07,2200,,\n",
+        encoding="utf-8",
+    )
+    resumo = importar_cub([tabela], destino=destino)
+    gravada = json.loads(destino.read_text(encoding="utf-8"))
+    assert resumo["descartadas"] == ["2025-07"]
+    assert "descartadas" not in gravada
+    assert [i["competencia"] for i in gravada["series"]] == ["2025-05", "2025-06"]
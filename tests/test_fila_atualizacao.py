@@ -0,0 +1,52 @@
+import threading
+
+from app.services.fila_atualizacao import FilaAtualizacao
+
+
+def test_chave_repetida_e_descartada_enquanto_pendente():
+    fila = FilaAtualizacao(max_itens=4)
+    liberar = threading.Event()
+    feitos = []
+
+    assert fila.agendar("a", liberar.wait, 2)
+    assert not fila.agendar("a", feitos.append, "duplicado")
+    liberar.set()
+    fila.aguardar()
+
+    assert fila.agendar("a", feitos.append, "de novo")
+    fila.aguardar()
+    assert feitos == ["de novo"]
+    estatisticas = fila.estatisticas()
+    assert estatisticas["duplicados"] == 1
+    assert estatisticas["concluidos"] == 2
+
+
+def test_excecao_conta_como_falha():
+    fila = FilaAtualizacao()
+
+    def quebra():
+        raise RuntimeError("portal fora")
+
+    fila.agendar("a", quebra)
+    fila.aguardar()
+    assert fila.estatisticas()["falhas"] == 1
+    assert not fila.pendente("a")
+
+
+def test_base_exception_libera_a_chave(monkeypatch):
+    # A thread morre com SystemExit; o hook evita o aviso no stderr.
+    monkeypatch.setattr(threading, "excepthook", lambda args: None)
+    fila = FilaAtualizacao()
+
+    def encerra():
+        raise SystemExit
+
+    fila.agendar("a", encerra)
+    fila.aguardar()
+    assert not fila.pendente("a")
+    assert fila.estatisticas()["falhas"] == 1
+
+    feitos = []
+    assert fila.agendar("a", feitos.append, 1)
+    fila.aguardar()
+    assert feitos == [1]
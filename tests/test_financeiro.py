@@ -0,0 +1,76 @@
+import warnings
+
+import pytest
+
+from app.services.amortizacao import (
+    PRAZO_MAXIMO,
+    calcular_cronogramas,
+    limitar_prazo,
+)
+from app.services.financeiro import analisar_financeiro
+
+
+@pytest.mark.parametrize(
+    "entrada, esperado",
+    [
+        (360, 360),
+        ("240", 240),
+        (1, 1),
+        (421, PRAZO_MAXIMO),
+        (100000, PRAZO_MAXIMO),
+        (50000000, PRAZO_MAXIMO),
+        ("1e300", PRAZO_MAXIMO),
+        (0, 360),
+        (-5, 360),
+        ("", 360),
+        (None, 360),
+        ("abc", 360),
+    ],
+)
+def test_limitar_prazo(entrada, esperado):
+    assert limitar_prazo(entrada) == esperado
+
+
+def test_cronograma_recusa_prazo_acima_do_maximo():
+    with pytest.raises(ValueError):
+        calcular_cronogramas(100000, [0.1], [PRAZO_MAXIMO + 1])
+
+
+def test_analisar_financeiro_limita_prazo():
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        resultado = analisar_financeiro(
+            orcamento=500000,
+            valor_imovel=400000,
+            renda=20000,
+            financiar=True,
+            prazo_meses=50000000,
+        )
+    assert resultado["parcela_estimada"] == pytest.approx(
+        calcular_cronogramas(320000, [0.1149], [PRAZO_MAXIMO])[
+            "primeira_parcela"
+        ][0, 0, 0]
+    )
+    prazos = {linha["prazo_meses"] for linha in resultado["bancos"]}
+    assert max(prazos) <= PRAZO_MAXIMO
+
+
+@pytest.mark.parametrize("sistema, s", [("SAC", 0), ("price", 1), ("", 0)])
+def test_parcela_estimada_segue_o_cronograma(sistema, s):
+    resultado = analisar_financeiro(
+        orcamento=600000,
+        valor_imovel=500000,
+        renda=15000,
+        financiar=True,
+        prazo_meses=360,
+        sistema=sistema,
+    )
+    primeira = calcular_cronogramas(400000, [0.1149], [360])[
+        "primeira_parcela"
+    ][s, 0, 0]
+    assert resultado["parcela_sistema"] == ("PRICE" if s else "SAC")
+    assert resultado["parcela_estimada"] == pytest.approx(primeira)
+    assert resultado["comprometimento_renda_estimado"] == pytest.approx(
+        primeira / 15000 * 100
+    )
+    assert resultado["parcela_estimada"] > 400000 / 360
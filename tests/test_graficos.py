@@ -0,0 +1,64 @@
+import os
+
+from app.services import graficos
+
+
+def test_limpar_graficos_mantem_os_mais_recentes(tmp_path):
+    for i in range(6):
+        caminho = tmp_path / f"grafico_score_{i}.png"
+        caminho.write_bytes(b"png")
+        os.utime(caminho, (1000 + i, 1000 + i))
+    outro = tmp_path / "logo.png"
+    outro.write_bytes(b"png")
+
+    graficos._limpar_graficos(tmp_path, maximo=3)
+
+    restantes = sorted(p.name for p in tmp_path.glob("grafico_*.png"))
+    assert restantes == [f"grafico_score_{i}.png" for i in (3, 4, 5)]
+    assert outro.exists()
+
+
+def test_grafico_limitado_em_static(tmp_path, monkeypatch):
+    monkeypatch.setattr(graficos, "_static_dir", lambda: tmp_path)
+    monkeypatch.setattr(graficos, "MAX_GRAFICOS", 2)
+    for orcamento in (100, 200, 300, 400):
+        url = graficos.gerar_grafico_financeiro(
+            orcamento=orcamento,
+            valor_imovel=50,
+        )
+        assert (tmp_path / url.rsplit("/", 1)[1]).exists()
+    assert len(list(tmp_path.glob("grafico_*.png"))) == 2
+
+
+def test_memo_do_relatorio_recria_graficos_apagados(tmp_path, monkeypatch):
+    from app.api import routes
+    from app.main import create_app
+
+    monkeypatch.setattr(graficos, "_static_dir", lambda: tmp_path)
+    dados = {
+        "bairro": "Bairro Fora da Base",
+        "tipo_imovel": "casa",
+        "padrao": "medio",
+        "orcamento": "600000",
+        "valor_imovel": "450000",
+        "area": "150",
+    }
+    with create_app().test_request_context("/relatorio", data=dados):
+        entradas = routes._entradas_relatorio("")
+        calculado = routes._calcular_relatorio_memo(
+            entradas,
+            routes._versoes_relatorio(),
+        )
+    assert "grafico_score_url" not in calculado
+
+    urls = [
+        routes._com_graficos(calculado)[chave]
+        for chave in ("grafico_score_url", "grafico_financeiro_url")
+    ]
+    for url in urls:
+        (tmp_path / url.rsplit("/", 1)[1]).unlink()
+
+    contexto = routes._com_graficos(calculado)
+    for chave, url in zip(("grafico_score_url", "grafico_financeiro_url"), urls):
+        assert contexto[chave] == url
+        assert (tmp_path / url.rsplit("/", 1)[1]).exists()
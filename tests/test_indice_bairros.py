@@ -0,0 +1,25 @@
+from app.services.indice_bairros import (
+    IndiceBairros,
+    resolver_bairro,
+    sugerir_bairros,
+)
+
+
+def _indice(*nomes):
+    return IndiceBairros([{"bairro": nome} for nome in nomes])
+
+
+def test_prefixo_curto_nao_resolve_sozinho():
+    assert resolver_bairro("bos") is None
+    assert "Bosque da Saúde" in sugerir_bairros("bos")
+
+
+def test_prefixo_com_quatro_caracteres_resolve():
+    assert resolver_bairro("bosq")["bairro"] == "Bosque da Saúde"
+
+
+def test_prefixo_de_palavra_inteira_resolve():
+    indice = _indice("Boa Esperança", "Duque de Caxias")
+    assert indice.nome_oficial("boa") == "Boa Esperança"
+    assert indice.nome_oficial("duq") is None
+    assert indice.sugerir("duq") == ["Duque de Caxias"]
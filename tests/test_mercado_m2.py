@@ -0,0 +1,75 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.services import mercado_m2
+from app.services.cache_m2 import CacheM2
+from app.services.fila_atualizacao import FilaAtualizacao
+from app.services.voo_unico import VooUnico
+
+
+def _horas_atras(horas):
+    return (datetime.now() - timedelta(hours=horas)).isoformat(timespec="seconds")
+
+
+@pytest.fixture
+def portal(tmp_path, monkeypatch):
+    """
+    Cache, fila e portal isolados; o portal segura a coleta ate liberar.
+    """
+    monkeypatch.setattr(mercado_m2, "CACHE_M2", CacheM2(tmp_path / "m2.sqlite3"))
+    monkeypatch.setattr(mercado_m2, "FILA_M2", FilaAtualizacao(nome="teste-m2"))
+    monkeypatch.setattr(mercado_m2, "VOO_M2", VooUnico())
+    estado = {"chamadas": [], "liberar": threading.Event(), "valor": 13000.0}
+
+    def buscar(bairro, tipo_imovel, timeout):
+        estado["chamadas"].append((bairro, tipo_imovel))
+        estado["liberar"].wait(5)
+        return estado["valor"]
+
+    monkeypatch.setattr(mercado_m2, "buscar_valor_m2_viva_real", buscar)
+    return estado
+
+
+def _contexto(bairro="Savassi"):
+    return mercado_m2.obter_contexto_m2(
+        {"bairro": bairro, "valor_m2_medio": "9000"}, bairro, "casa"
+    )
+
+
+def test_vencido_servido_na_hora_e_recoletado_em_segundo_plano(portal):
+    mercado_m2.CACHE_M2.gravar_sucesso(
+        "savassi", "casa", 11000, "Base Lokao", _horas_atras(200)
+    )
+
+    # A coleta esta presa no portal e a resposta sai com o valor vencido.
+    assert _contexto()["valor"] == 11000.0
+    assert _contexto()["valor"] == 11000.0
+    assert mercado_m2.FILA_M2.pendente(("savassi", "casa"))
+
+    portal["liberar"].set()
+    mercado_m2.FILA_M2.aguardar()
+    assert portal["chamadas"] == [("Savassi", "casa")]
+    assert mercado_m2.FILA_M2.estatisticas()["duplicados"] == 1
+    assert _contexto()["valor"] == 13000.0
+
+
+def test_sem_cache_usa_planilha_e_agenda(portal):
+    assert _contexto()["valor"] == 9000.0
+    portal["liberar"].set()
+    mercado_m2.FILA_M2.aguardar()
+    assert mercado_m2.CACHE_M2.obter("savassi", "casa")["valor"] == 13000.0
+
+
+def test_recente_ou_falha_em_cooldown_nao_agendam(portal):
+    mercado_m2.CACHE_M2.gravar_sucesso(
+        "savassi", "casa", 11000, "Base Lokao", _horas_atras(1)
+    )
+    mercado_m2.CACHE_M2.gravar_falha(
+        "lourdes", "casa", "falha_coleta", _horas_atras(1), 6
+    )
+
+    assert _contexto()["valor"] == 11000.0
+    assert _contexto("Lourdes")["valor"] == 9000.0
+    assert mercado_m2.FILA_M2.estatisticas()["agendados"] == 0
@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+from app.services import pesos_score
+from app.services.pesos_score import CatalogoPesos
+
+
+def _regras():
+    return pesos_score._PESOS_PATH.read_text(encoding="utf-8")
+
+
+def _tocar(caminho, passo):
+    stat = caminho.stat()
+    os.utime(caminho, ns=(stat.st_atime_ns, stat.st_mtime_ns + passo))
+
+
+def test_arquivo_de_regras_compila():
+    tabela = pesos_score.compilar_pesos(_regras())
+    assert tabela.base == 20
+    assert len(tabela.padrao) == 4
+
+
+def test_um_unico_arquivo_de_pesos():
+    assert pesos_score._PESOS_PATH.name == "pesos_score_urbano.csv"
+    pastas = pesos_score._PESOS_PATH.parent
+    assert sorted(p.name for p in pastas.glob("*score*.csv")) == [
+        "pesos_score_urbano.csv"
+    ]
+    assert "perfil_urbano,baixo,,10," in _regras()
+
+
+def test_versao_acompanha_o_arquivo(tmp_path):
+    caminho = tmp_path / "regras.csv"
+    caminho.write_text(_regras(), encoding="utf-8")
+    catalogo = CatalogoPesos(caminho)
+    versao = catalogo.versao()
+    assert versao == (caminho.stat().st_mtime_ns, caminho.stat().st_size)
+
+    _tocar(caminho, 1_000_000)
+    assert catalogo.versao() != versao
+
+
+def test_primeira_carga_invalida_levanta(tmp_path):
+    caminho = tmp_path / "regras.csv"
+    caminho.write_text("criterio,baixo,medio,alto\nperfil_urbano,10,15,20\n")
+    with pytest.raises(ValueError):
+        CatalogoPesos(caminho).tabela()
+
+    with pytest.raises(OSError):
+        CatalogoPesos(tmp_path / "inexistente.csv").tabela()
+
+
+def test_edicao_invalida_mantem_ultima_tabela(tmp_path):
+    caminho = tmp_path / "regras.csv"
+    caminho.write_text(_regras(), encoding="utf-8")
+    catalogo = CatalogoPesos(caminho)
+    valida = catalogo.tabela()
+
+    caminho.write_text("criterio,codigo,limite,pontos,explicacao\n")
+    _tocar(caminho, 1_000_000)
+    assert catalogo.tabela() is valida
+
+    caminho.write_text(
+        _regras().replace("base,base,,20,", "base,base,,30,"),
+        encoding="utf-8",
+    )
+    _tocar(caminho, 2_000_000)
+    assert catalogo.tabela().base == 30
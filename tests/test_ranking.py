@@ -0,0 +1,82 @@
+import itertools
+
+import pytest
+
+from app.services.loader import carregar_store_bairros
+from app.services.ranking import AREA_REFERENCIA, calcular_scores, ranquear_bairros
+from app.services.score_urbano import calcular_score_urbano
+
+
+@pytest.fixture(scope="module")
+def store():
+    return carregar_store_bairros()
+
+
+def _scores_referencia(store, orcamento, valor_imovel, area, padrao, financia):
+    """
+    Uma chamada de calcular_score_urbano por linha, com o mesmo ticket
+    que o ranking usa (valor_imovel ou valor_m2 x area).
+    """
+    resultados = []
+    for i, registro in enumerate(store.registros):
+        ticket = valor_imovel or store.valor_m2_medio[i] * (area or AREA_REFERENCIA)
+        resultados.append(
+            calcular_score_urbano(
+                registro,
+                orcamento=orcamento,
+                valor_imovel=ticket,
+                padrao_desejado=padrao,
+                financia=financia,
+            )
+        )
+    return resultados
+
+
+def test_vetorizado_igual_ao_score_por_bairro(store):
+    casos = itertools.product(
+        (0, 300000, 900000, 2500000),
+        (0, 650000),
+        (0, 90),
+        ("", "economico", "medio", "alto", "outro"),
+        (False, True),
+    )
+    for orcamento, valor_imovel, area, padrao, financia in casos:
+        scores, _ = calcular_scores(
+            store,
+            orcamento,
+            valor_imovel=valor_imovel,
+            area=area,
+            padrao_desejado=padrao,
+            financia=financia,
+        )
+        esperado = _scores_referencia(
+            store, orcamento, valor_imovel, area, padrao, financia
+        )
+        assert [int(s) for s in scores] == [r["valor"] for r in esperado], (
+            orcamento,
+            valor_imovel,
+            area,
+            padrao,
+            financia,
+        )
+
+
+@pytest.mark.parametrize("limite", [1, 7, 10_000])
+def test_top_n_estavel_nos_empates(store, limite):
+    ranking = ranquear_bairros(
+        store, 900000, padrao_desejado="medio", financia=True, limite=limite
+    )
+    esperado = _scores_referencia(store, 900000, 0, 0, "medio", True)
+    ordem = sorted(range(len(store)), key=lambda i: -esperado[i]["valor"])
+
+    assert len(ranking) == min(limite, len(store))
+    assert [item["bairro"] for item in ranking] == [
+        store.registros[i].get("bairro") for i in ordem[:limite]
+    ]
+    for item, i in zip(ranking, ordem):
+        assert item["score"] == esperado[i]["valor"]
+        assert item["classificacao"] == esperado[i]["classificacao"]
+
+
+def test_limite_invalido(store):
+    assert ranquear_bairros(store, 900000, limite=0) == []
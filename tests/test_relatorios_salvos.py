@@ -0,0 +1,61 @@
+import gzip
+import hashlib
+
+import pytest
+
+from app.services import relatorios_salvos
+from app.services.relatorios_salvos import carregar_relatorio, salvar_relatorio
+
+
+@pytest.fixture(autouse=True)
+def pasta(tmp_path, monkeypatch):
+    monkeypatch.setattr(relatorios_salvos, "PASTA", tmp_path)
+    return tmp_path
+
+
+def _contexto(score=72):
+    return {
+        "bairro": "Savassi",
+        "orcamento": "R$ 900.000,00",
+        "score": {"valor": score, "explicacoes": ["Orçamento compatível."]},
+        "cenarios": [1.5, 2.25],
+    }
+
+
+def test_ida_e_volta(pasta):
+    meta = salvar_relatorio("abc_123", _contexto(), {"bairros": [1, 2]})
+    assert carregar_relatorio("abc_123") == _contexto()
+
+    arquivo = pasta / meta["arquivo"]
+    assert arquivo.name == f"{meta['sha256']}.json.gz"
+    bruto = gzip.decompress(arquivo.read_bytes())
+    assert hashlib.sha256(bruto).hexdigest() == meta["sha256"]
+    assert meta["versoes"] == {"bairros": [1, 2]}
+
+
+def test_contextos_iguais_compartilham_arquivo(pasta):
+    a = salvar_relatorio("token-a", _contexto(), {})
+    b = salvar_relatorio("token-b", dict(reversed(_contexto().items())), {})
+    c = salvar_relatorio("token-c", _contexto(score=40), {})
+
+    assert a["arquivo"] == b["arquivo"] != c["arquivo"]
+    assert len(list(pasta.glob("*.json.gz"))) == 2
+
+
+def test_token_salvo_uma_unica_vez():
+    salvar_relatorio("abc", _contexto(), {})
+    assert salvar_relatorio("abc", _contexto(score=10), {}) is None
+    assert carregar_relatorio("abc") == _contexto()
+
+
+def test_token_invalido_ou_ausente():
+    assert salvar_relatorio("../fora", _contexto(), {}) is None
+    assert carregar_relatorio("../fora") is None
+    assert carregar_relatorio("") is None
+    assert carregar_relatorio("nunca-salvo") is None
+
+
+def test_conteudo_adulterado_e_descartado(pasta):
+    meta = salvar_relatorio("abc", _contexto(), {})
+    (pasta / meta["arquivo"]).write_bytes(gzip.compress(b'{"bairro":"x"}'))
+    assert carregar_relatorio("abc") is None
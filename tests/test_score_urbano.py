@@ -0,0 +1,111 @@
+import itertools
+
+from app.services.score_urbano import calcular_score_urbano
+
+_ORDEM = {"economico": 1, "baixo": 1, "medio": 2, "alto": 3}
+_FAIXAS = (
+    (1.8, 25, "Orçamento com folga alta para aquisição e custos acessórios."),
+    (1.4, 22, "Orçamento com folga confortável para o ticket analisado."),
+    (1.1, 18, "Orçamento compatível com margem moderada de segurança."),
+    (1.0, 14, "Orçamento compatível, com folga reduzida."),
+    (0.85, 6, "Orçamento próximo do valor do imóvel."),
+    (0.0, -20, "Orçamento insuficiente para o valor do imóvel."),
+)
+
+
+def _score_referencia(padrao_bairro, perfil, desejado, orcamento, valor, financia):
+    """
+    Cadeia de if/elif anterior a tabela de pesos, condensada.
+    """
+    nivel_bairro = _ORDEM.get(padrao_bairro, 0)
+    nivel_desejado = _ORDEM.get(desejado, 0)
+    nivel_socio = _ORDEM.get(perfil, 0)
+    score = 20
+    explicacoes = []
+
+    pontos, texto = {
+        "alto": (25, "Bairro de padrão urbano elevado."),
+        "medio": (18, "Bairro de padrão urbano intermediário."),
+    }.get(padrao_bairro, (10, "Bairro de padrão urbano mais econômico/popular."))
+    score += pontos
+    explicacoes.append(texto)
+
+    if desejado:
+        if nivel_desejado and nivel_bairro:
+            pontos, texto = (
+                (20, "Padrão desejado totalmente compatível com o bairro."),
+                (
+                    -8,
+                    "Padrão desejado parcialmente desalinhado com a "
+                    "predominância do bairro.",
+                ),
+                (-16, "Padrão desejado distante da predominância urbana local."),
+            )[min(abs(nivel_desejado - nivel_bairro), 2)]
+            score += pontos
+            explicacoes.append(texto)
+        else:
+            explicacoes.append(
+                "Padrão do bairro não totalmente identificado "
+                "para comparação fina."
+            )
+
+    if valor > 0 and orcamento > 0:
+        relacao = orcamento / valor
+        limite, pontos, texto = next(f for f in _FAIXAS if relacao >= f[0])
+        score += pontos
+        explicacoes.append(texto)
+
+    bairro_abaixo = (0 < nivel_bairro < nivel_desejado) or (
+        0 < nivel_socio < nivel_desejado
+    )
+    if valor > 0 and orcamento >= valor * 1.5 and nivel_desejado >= 3 and bairro_abaixo:
+        score -= 6
+        explicacoes.append(
+            "Há desalinhamento de posicionamento: capacidade financeira "
+            "alta em bairro de predominancia socioeconomica inferior ao "
+            "padrão desejado."
+        )
+    if financia:
+        score -= 4
+        explicacoes.append(
+            "Financiamento reduz a margem de segurança financeira "
+            "de longo prazo."
+        )
+    score = max(0, min(100, score))
+    if score >= 80:
+        classe = "Excelente compatibilidade"
+    elif score >= 65:
+        classe = "Boa compatibilidade"
+    elif score >= 45:
+        classe = "Compatibilidade limitada"
+    else:
+        classe = "Baixa compatibilidade"
+    return score, classe, explicacoes
+
+
+def test_tabela_densa_igual_as_regras_originais():
+    padroes = ("", "economico", "baixo", "medio", "alto", "outro")
+    # Relacoes orcamento/valor nas bordas de cada faixa e nos vizinhos.
+    relacoes = (0.5, 0.8499, 0.85, 0.99, 1.0, 1.1, 1.39, 1.4, 1.5, 1.79, 1.8, 3.0)
+    pares = [(0, 0), (500000, 0), (0, 400000)] + [
+        (round(400000 * r, 2), 400000) for r in relacoes
+    ]
+    for bairro, perfil, desejado, (orcamento, valor), financia in itertools.product(
+        padroes, padroes, padroes, pares, (False, True)
+    ):
+        resultado = calcular_score_urbano(
+            {"padrao_predominante": bairro, "perfil_socioeconomico": perfil},
+            orcamento=orcamento,
+            valor_imovel=valor,
+            padrao_desejado=desejado,
+            financia=financia,
+        )
+        esperado = _score_referencia(
+            bairro, perfil, desejado, orcamento, valor, financia
+        )
+        obtido = (
+            resultado["valor"],
+            resultado["classificacao"],
+            resultado["explicacoes"],
+        )
+        assert obtido == esperado, (bairro, perfil, desejado, orcamento, valor, financia)
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from app.services.capacidade import resolver_capacidade
+from app.services.financeiro import CENARIOS_CONSTRUCAO
+from app.services.sensibilidade import (
+    LIMITES_EIXOS,
+    calcular_grade,
+    faixa_valores,
+)
+
+
+def test_faixa_lista_e_intervalo():
+    assert faixa_valores("360,420").tolist() == [360, 420]
+    assert faixa_valores("100:300:100").tolist() == [100, 200, 300]
+
+
+@pytest.mark.parametrize(
+    "eixo, texto",
+    [
+        ("prazo", "100000000"),
+        ("prazo", "0"),
+        ("prazo", "400:500:50"),
+        ("orcamento", "1e12"),
+        ("area", "1e7"),
+    ],
+)
+def test_faixa_fora_dos_limites(eixo, texto):
+    with pytest.raises(ValueError):
+        faixa_valores(texto, limites=LIMITES_EIXOS[eixo])
+
+
+@pytest.mark.parametrize("texto", ["0:1e400:1", "a,b", "", "1:0:1", "1:2:0"])
+def test_faixa_invalida(texto):
+    with pytest.raises(ValueError):
+        faixa_valores(texto)
+
+
+def test_faixa_dentro_dos_limites():
+    valores = faixa_valores("1,420", limites=LIMITES_EIXOS["prazo"])
+    assert np.array_equal(valores, [1, 420])
+
+
+@pytest.mark.parametrize("texto", ["0:1e9:1e-300", "0:1:1e-320"])
+def test_faixa_passo_minusculo(texto):
+    with pytest.raises(ValueError):
+        faixa_valores(texto)
+
+
+def test_total_construcao_sobre_custo_das_metodologias():
+    grade = calcular_grade(
+        {"bairro": "Teste", "valor_m2_medio": 5000},
+        np.array([500000.0]),
+        np.array([0.0, 120.0]),
+        np.array([360]),
+        padrao_desejado="medio",
+        cub=2500.0,
+    )
+    custo = np.array(grade["custo_metodologia"])
+    total = np.array(grade["total_construcao"])
+    assert custo[0].tolist() == [2500.0 * 180, 2500.0 * 120]
+    assert total.shape == (3, len(grade["metodologias"]), 2)
+    base = grade["cenarios_construcao"].index("Base")
+    fator = 1 + sum(CENARIOS_CONSTRUCAO["Base"].values())
+    assert np.allclose(total[base], custo * fator)
+
+
+def test_area_maxima_igual_a_capacidade():
+    orcamentos = np.array([300000.0, 800000.0])
+    grade = calcular_grade(
+        {"bairro": "Teste", "valor_m2_medio": 5000},
+        orcamentos,
+        np.array([0.0]),
+        np.array([360]),
+        padrao_desejado="alto",
+        cub=2800.0,
+    )
+    area_max = np.array(grade["area_max_metodologia"])
+    for k, orcamento in enumerate(orcamentos):
+        capacidade = resolver_capacidade(orcamento, [], cub=2800.0, padrao="alto")
+        assert np.allclose(
+            area_max[:, :, k],
+            capacidade["area_maxima_construcao"],
+        )
@@ -0,0 +1,56 @@
+import numpy as np
+
+from app.services import simulacao_estresse
+from app.services.amortizacao import PRAZO_MAXIMO, taxa_mensal
+from app.services.simulacao_estresse import (
+    INDEXADORES,
+    PERSISTENCIA,
+    _caminhos_indexador,
+    simular_estresse,
+)
+
+
+def test_ar1_em_blocos_igual_a_recorrencia():
+    premissa = INDEXADORES["IPCA"]
+    obtido = _caminhos_indexador(np.random.default_rng(7), premissa, 20, 150)
+
+    rng = np.random.default_rng(7)
+    sigma = premissa["volatilidade"] / 12 * np.sqrt(1 - PERSISTENCIA ** 2)
+    choques = rng.standard_normal((20, 150)) * sigma
+    desvio = np.zeros(20)
+    esperado = np.empty((20, 150))
+    for t in range(150):
+        desvio = PERSISTENCIA * desvio + choques[:, t]
+        esperado[:, t] = desvio
+    esperado = np.maximum(taxa_mensal(premissa["media"]) + esperado, 0.0)
+
+    np.testing.assert_allclose(obtido, esperado, atol=1e-15)
+
+
+def test_ar1_finito_em_horizonte_longo():
+    caminhos = _caminhos_indexador(
+        np.random.default_rng(1),
+        INDEXADORES["Selic"],
+        4,
+        30000,
+    )
+    assert np.isfinite(caminhos).all()
+
+
+def test_simulacao_limita_prazo():
+    resultado = simular_estresse(300000, renda=10000, prazo_meses=10 ** 9)
+    assert resultado["prazo_meses"] == PRAZO_MAXIMO
+
+
+def test_simulacao_interrompida_nao_vai_para_o_cache():
+    simulacao_estresse._MEMO.limpar()
+    args = dict(renda=9000, prazo_meses=240, caminhos=1000)
+    assert simular_estresse(250000, orcamento_ms=0, **args) is None
+
+    completo = simular_estresse(250000, orcamento_ms=10 ** 6, **args)
+    assert completo["caminhos"] == 1000
+    assert simular_estresse(250000, orcamento_ms=0, **args) is completo
+
+    simulacao_estresse._MEMO.limpar()
+    refeito = simular_estresse(250000, orcamento_ms=10 ** 6, **args)
+    assert refeito["cenarios"] == completo["cenarios"]
@@ -0,0 +1,121 @@
+import itertools
+
+import pytest
+
+from app.services.loader import carregar_store_bairros
+from app.services.sugestoes import _fmt_moeda, _parse_float, gerar_sugestoes
+
+
+def _sugestoes_referencia(
+    registros,
+    dados_bairro,
+    score,
+    orcamento,
+    area,
+    padrao,
+    limite=5,
+):
+    """
+    Laco original (iterrows sobre a base), sobre registros em vez do
+    DataFrame: a versao indexada tem que devolver exatamente isto.
+    """
+    if (score or {}).get("valor", 0) >= 75:
+        return []
+    orcamento = _parse_float(orcamento)
+    area = _parse_float(area)
+    if orcamento <= 0:
+        return []
+
+    bairro_atual = dados_bairro.get("bairro")
+    ordem = {"economico": 1, "baixo": 1, "medio": 2, "alto": 3}
+    nivel_desejado = ordem.get(str(padrao or "").lower(), 0)
+
+    candidatos = []
+    for row in registros:
+        if row.get("bairro") == bairro_atual:
+            continue
+        nivel_bairro = ordem.get(
+            str(row.get("padrao_predominante") or "").lower(),
+            0,
+        )
+        if (
+            nivel_desejado
+            and nivel_bairro
+            and abs(nivel_bairro - nivel_desejado) > 1
+        ):
+            continue
+        valor_m2 = _parse_float(row.get("valor_m2_medio"))
+        if valor_m2 <= 0:
+            continue
+        custo = valor_m2 * (area if area > 0 else 180.0)
+        comp = custo / orcamento
+        if comp > 0.95 or comp < 0.30:
+            continue
+        candidatos.append((abs(0.70 - comp), -comp, row.get("bairro"), custo, comp))
+
+    candidatos.sort(key=lambda c: (c[0], c[1]))
+    return [
+        f"{bairro} - Custo estimado de {_fmt_moeda(custo)} "
+        f"para a area informada, comprometendo {comp*100:.1f}% "
+        f"do orçamento e mantendo folga de {(1 - comp)*100:.1f}%."
+        for _, _, bairro, custo, comp in candidatos[:limite]
+    ]
+
+
+@pytest.fixture(scope="module")
+def store():
+    return carregar_store_bairros()
+
+
+def test_igual_ao_laco_original_na_base(store):
+    bairros = [None, *store.nomes_ordenados[::17]]
+    casos = itertools.product(
+        bairros,
+        (150000, 400000, 900000, 2500000),
+        (0, 70, 180, 450),
+        ("", "economico", "medio", "alto", "outro"),
+        (1, 5, 12),
+    )
+    for bairro, orcamento, area, padrao, limite in casos:
+        dados = {"bairro": bairro}
+        args = ({"valor": 40}, orcamento, area, padrao, limite)
+        assert gerar_sugestoes(store, dados, *args) == _sugestoes_referencia(
+            store.registros, dados, *args
+        ), (bairro, orcamento, area, padrao, limite)
+
+
+def test_score_alto_ou_sem_orcamento(store):
+    assert gerar_sugestoes(store, {}, {"valor": 80}, 500000, 100, "") == []
+    assert gerar_sugestoes(store, {}, {"valor": 10}, 0, 100, "") == []
+
+
+def _store_sintetico():
+    from app.services.bairro_store import BairroStore
+
+    valores = [300, 299, 950, 951, 700, 700, 600, 800, 650, 750, 0, 420, 880]
+    padroes = ["medio", "alto", "economico", "medio", "alto", "medio",
+               "", "medio", "alto", "economico", "medio", "alto", "medio"]
+    linhas = [
+        [f"B{i:02d}", "Centro", valor, padrao]
+        for i, (valor, padrao) in enumerate(zip(valores, padroes))
+    ]
+    return BairroStore(
+        ["bairro", "regiao", "valor_m2_medio", "padrao_predominante"],
+        linhas,
+    )
+
+
+@pytest.mark.parametrize("padrao", ["", "economico", "medio", "alto"])
+@pytest.mark.parametrize("limite", [1, 2, 3, 4, 20])
+def test_janela_e_empates_na_busca_binaria(padrao, limite):
+    """
+    Bordas da janela (0,30 e 0,95 inclusas), empates na distancia ao alvo
+    (700/700 e 600/800) e corte do limite no meio de um empate.
+    """
+    store = _store_sintetico()
+    for atual in (None, "B04", "B07"):
+        dados = {"bairro": atual}
+        args = ({"valor": 10}, 1000, 1, padrao, limite)
+        assert gerar_sugestoes(store, dados, *args) == _sugestoes_referencia(
+            store.registros, dados, *args
+        )
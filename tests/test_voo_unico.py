@@ -0,0 +1,157 @@
+import threading
+import time
+
+import pytest
+
+from app.services import mercado_m2
+from app.services.cache_m2 import CacheM2
+from app.services.voo_unico import VooUnico
+
+
+def _esperar(condicao, prazo=5):
+    limite = time.monotonic() + prazo
+    while not condicao():
+        assert time.monotonic() < limite, "timeout"
+        time.sleep(0.005)
+
+
+def _em_paralelo(funcao, n):
+    resultados = [None] * n
+    erros = [None] * n
+
+    def chamar(i):
+        try:
+            resultados[i] = funcao()
+        except Exception as exc:
+            erros[i] = exc
+
+    threads = [threading.Thread(target=chamar, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    return threads, resultados, erros
+
+
+def test_chamadas_simultaneas_executam_uma_vez():
+    voo = VooUnico()
+    liberar = threading.Event()
+    chamadas = []
+
+    def coletar():
+        chamadas.append(1)
+        liberar.wait(5)
+        return 12500.0
+
+    threads, resultados, erros = _em_paralelo(
+        lambda: voo.executar(("savassi", "casa"), coletar), 6
+    )
+    _esperar(lambda: voo.estatisticas()["compartilhados"] == 5)
+    liberar.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert chamadas == [1]
+    assert resultados == [12500.0] * 6
+    assert erros == [None] * 6
+    assert voo.estatisticas() == {
+        "em_andamento": 0,
+        "executados": 1,
+        "compartilhados": 5,
+    }
+    # Terminado o voo, a proxima chamada executa de novo.
+    assert voo.executar(("savassi", "casa"), lambda: 1) == 1
+
+
+def test_excecao_compartilhada():
+    voo = VooUnico()
+    liberar = threading.Event()
+
+    def falhar():
+        liberar.wait(5)
+        raise RuntimeError("portal fora")
+
+    threads, _, erros = _em_paralelo(lambda: voo.executar("k", falhar), 3)
+    _esperar(lambda: voo.estatisticas()["compartilhados"] == 2)
+    liberar.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert [str(e) for e in erros] == ["portal fora"] * 3
+    assert voo.estatisticas()["em_andamento"] == 0
+
+
+def test_lease_bloqueia_outro_dono(tmp_path):
+    cache = CacheM2(tmp_path / "m2.sqlite3")
+    assert cache.adquirir_lease("savassi", "casa", "w1", 30)
+    assert cache.lease_ativo("savassi", "casa")
+    assert not cache.adquirir_lease("savassi", "casa", "w2", 30)
+
+    # So o dono libera.
+    cache.liberar_lease("savassi", "casa", "w2")
+    assert not cache.adquirir_lease("savassi", "casa", "w2", 30)
+    cache.liberar_lease("savassi", "casa", "w1")
+    assert not cache.lease_ativo("savassi", "casa")
+    assert cache.adquirir_lease("savassi", "casa", "w2", 30)
+
+
+def test_lease_vencido_e_assumido(tmp_path):
+    cache = CacheM2(tmp_path / "m2.sqlite3")
+    assert cache.adquirir_lease("savassi", "casa", "morto", -1)
+    assert not cache.lease_ativo("savassi", "casa")
+    assert cache.adquirir_lease("savassi", "casa", "w2", 30)
+
+
+@pytest.fixture
+def coleta(tmp_path, monkeypatch):
+    """
+    mercado_m2 com cache e single-flight novos e um portal falso que
+    segura a coleta ate o teste liberar.
+    """
+    monkeypatch.setattr(mercado_m2, "CACHE_M2", CacheM2(tmp_path / "m2.sqlite3"))
+    monkeypatch.setattr(mercado_m2, "VOO_M2", VooUnico())
+    monkeypatch.setattr(mercado_m2, "INTERVALO_LEASE", 0.01)
+    portal = {"chamadas": 0, "liberar": threading.Event()}
+
+    def buscar(bairro, tipo_imovel, timeout):
+        portal["chamadas"] += 1
+        portal["liberar"].wait(5)
+        return 11000.0
+
+    monkeypatch.setattr(mercado_m2, "buscar_valor_m2_viva_real", buscar)
+    return portal
+
+
+def test_atualizar_m2_coleta_uma_vez_por_chave(coleta):
+    threads, resultados, _ = _em_paralelo(
+        lambda: mercado_m2.atualizar_m2("Savassi", "Casa", cache_horas=0), 5
+    )
+    _esperar(lambda: mercado_m2.VOO_M2.estatisticas()["compartilhados"] == 4)
+    coleta["liberar"].set()
+    for thread in threads:
+        thread.join(5)
+
+    assert coleta["chamadas"] == 1
+    assert resultados == [11000.0] * 5
+    assert mercado_m2.CACHE_M2.obter("savassi", "casa")["valor"] == 11000.0
+    assert not mercado_m2.CACHE_M2.lease_ativo("savassi", "casa")
+
+
+def test_atualizar_m2_espera_lease_de_outro_worker(coleta):
+    cache = mercado_m2.CACHE_M2
+    assert cache.adquirir_lease("savassi", "casa", "outro-worker", 30)
+    assert mercado_m2.atualizar_m2("Savassi", "casa") is None
+
+    def outro_worker():
+        time.sleep(0.05)
+        cache.gravar_sucesso(
+            "savassi", "casa", 9800, "Base Lokao",
+            time.strftime("%Y-%m-%dT%H:%M:%S"),
+        )
+        cache.liberar_lease("savassi", "casa", "outro-worker")
+
+    thread = threading.Thread(target=outro_worker)
+    thread.start()
+    valor = mercado_m2.atualizar_m2("Savassi", "casa", espera_segundos=5)
+    thread.join(5)
+
+    assert valor == 9800.0
+    assert coleta["chamadas"] == 0